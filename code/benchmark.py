@@ -0,0 +1,737 @@
+import argparse
+import ast
+import time
+
+from engines import ENGINES, Generation, SamplingConfig, get_engine
+from memory import MemorySampler, get_process_memory_mb
+from metrics import mean, percentile
+from profiling import PROFILER_TOOLS, RequestProfiler
+from repetition import RepetitionDetector, repetition_columns, token_stop_condition
+from prompt_datasets import add_dataset_arguments, as_records, dataset_from_args, dataset_hash_of
+from prompt_prep import PREPARED_DIR, ChatTemplate, engine_prompt, prepare_prompts, prompt_format
+from response_cache import CachedAdapter, ResponseCache
+from results import open_result_writer, run_metadata
+from stats import mad_outliers, summarize_trials
+from tokens import TokenCounter, counts_mismatch
+from warmup import DEFAULT_MAX_ROUNDS, DEFAULT_TOLERANCE, DEFAULT_WINDOW, WarmupController, warm_up
+
+RESULT_FIELDS = [
+    "engine",
+    "dataset_hash",
+    "prompt_id",
+    "category",
+    "prompt",
+    "prompt_word_count",
+    "prompt_token_count",
+    "output",
+    "output_token_count",
+    "true_prompt_tokens",
+    "true_output_tokens",
+    "token_count_mismatch",
+    "repetition_loop",
+    "repetition_stopped",
+    "decode_tokens_saved",
+    "cache_hit",
+    "trial",
+    "duration_s",
+    "tokens_per_sec",
+    "total_gpu_mem_after_load_mb",
+    "peak_gpu_mem_during_run_mb",
+    "cpu_memory_used_mb",
+]
+
+BATCH_RESULT_FIELDS = [
+    "engine",
+    "batch_size",
+    "dataset_hash",
+    "prompt_id",
+    "category",
+    "prompt",
+    "prompt_word_count",
+    "prompt_token_count",
+    "output",
+    "output_token_count",
+    "true_prompt_tokens",
+    "true_output_tokens",
+    "token_count_mismatch",
+    "repetition_loop",
+    "repetition_stopped",
+    "decode_tokens_saved",
+    "cache_hit",
+    "latency_s",
+    "ttft_ms",
+    "tokens_per_sec",
+    "batch_duration_s",
+    "batch_tokens_per_sec",
+    "peak_gpu_mem_during_run_mb",
+    "cpu_memory_used_mb",
+]
+
+STREAM_RESULT_FIELDS = [
+    "engine",
+    "dataset_hash",
+    "prompt_id",
+    "category",
+    "prompt",
+    "prompt_word_count",
+    "prompt_token_count",
+    "output",
+    "output_token_count",
+    "true_prompt_tokens",
+    "true_output_tokens",
+    "token_count_mismatch",
+    "repetition_loop",
+    "repetition_stopped",
+    "decode_tokens_saved",
+    "cache_hit",
+    "trial",
+    "ttft_ms",
+    "itl_mean_ms",
+    "itl_p50_ms",
+    "itl_p99_ms",
+    "prefill_tokens_per_sec",
+    "decode_tokens_per_sec",
+    "e2e_latency_s",
+    "peak_gpu_mem_during_run_mb",
+    "cpu_memory_used_mb",
+]
+
+BATCH_SIZES = (1, 4, 8, 16, 32)
+MEMORY_SAMPLE_INTERVAL_S = 0.05
+DEFAULT_RESULTS_PATH = "benchmark_results.sqlite"
+
+
+def clean_output(text: str) -> str:
+    return text.strip()
+
+
+def true_prompt_counts(token_counter, records):
+    if token_counter is None:
+        return [None] * len(records)
+    # Pre-tokenized prompts already hold their true count; rendered templates carry their own BOS.
+    counts = iter(token_counter.count_batch(
+        [record.prompt for record in records if record.token_ids is None], add_special_tokens=True
+    ))
+    return [len(record.token_ids) if record.token_ids is not None else next(counts) for record in records]
+
+
+def token_columns(token_counter, true_prompt_tokens, engine_prompt_tokens, output_text, engine_output_tokens):
+    if token_counter is None:
+        return {"true_prompt_tokens": None, "true_output_tokens": None, "token_count_mismatch": None}
+    true_output_tokens = token_counter.count(output_text)
+    return {
+        "true_prompt_tokens": true_prompt_tokens,
+        "true_output_tokens": true_output_tokens,
+        "token_count_mismatch": (
+            counts_mismatch(engine_prompt_tokens, true_prompt_tokens)
+            or counts_mismatch(engine_output_tokens, true_output_tokens)
+        ),
+    }
+
+
+def report_mismatches(rows):
+    mismatched = [row["prompt_id"] for row in rows if row["token_count_mismatch"]]
+    if mismatched:
+        print(f"WARNING: engine token counts disagree with the tokenizer for {len(mismatched)} rows: {mismatched[:10]}")
+
+
+def finish_memory_sampler(sampler, writer):
+    sampler.stop()
+    sampler.print_report()
+    writer.write_memory_samples(sampler.samples)
+
+
+def trial_schedule(num_records, trials):
+    """(trial, record index) pairs: every trial covers all prompts before the next starts.
+
+    Each pass starts one prompt later, so slow drift (thermals, fragmentation)
+    is spread across prompts instead of landing on the same ones every time.
+    """
+    return [
+        (trial, (trial + i) % num_records)
+        for trial in range(trials)
+        for i in range(num_records)
+    ]
+
+
+def engine_rows(rows):
+    """Rows the engine actually served; response cache hits would skew latency and throughput."""
+    return [row for row in rows if not row["cache_hit"]]
+
+
+def report_cache_hits(rows):
+    hits = len(rows) - len(engine_rows(rows))
+    if hits:
+        print(f"  Response cache hits: {hits}/{len(rows)} rows, left out of the latency and throughput figures")
+
+
+def report_trials(rows, metric):
+    """Print the run median of per-prompt medians with a bootstrap CI, and flag outlier trials."""
+    rows = engine_rows(rows)
+    if not rows:
+        return None
+    by_prompt = {}
+    for row in rows:
+        by_prompt.setdefault(row["prompt_id"], []).append(row[metric])
+    medians = [summarize_trials(values)["median"] for values in by_prompt.values()]
+    summary = summarize_trials(medians)
+    outliers = sum(int(mad_outliers(values).sum()) for values in by_prompt.values())
+    print(f"  {metric} median over prompts: {summary['median']:.2f} "
+          f"(95% CI {summary['ci_low']:.2f} - {summary['ci_high']:.2f})")
+    print(f"  Outlier trials (modified z > 3.5 within a prompt): {outliers}/{len(rows)}")
+    return summary
+
+
+def report_repetition(rows):
+    looped = sum(1 for row in rows if row["repetition_loop"])
+    stopped = sum(1 for row in rows if row["repetition_stopped"])
+    saved = sum(row["decode_tokens_saved"] for row in rows)
+    print(f"  Repetition loops: {looped}/{len(rows)} outputs, {stopped} stopped early, {saved} decode tokens saved")
+
+
+def repetition_stop_mode(adapter, stop_repetition):
+    """Where repetition loops get cut: "engine" through stop_condition, "harness" by closing a stream, or None."""
+    if not stop_repetition:
+        return None
+    return "engine" if adapter.supports_stop_condition else "harness"
+
+
+def load_and_report(adapter):
+    print("Measuring baseline memory usage...")
+    cpu_mem_initial = get_process_memory_mb()
+
+    print(f"Loading model ({adapter.name}): {adapter.model_path}...")
+    load_start = time.perf_counter_ns()
+    adapter.load()
+    load_s = (time.perf_counter_ns() - load_start) / 1e9
+
+    mem_after_load = adapter.memory_report()
+    mem_after_load["load_s"] = load_s
+    cpu_load_cost = mem_after_load["cpu_mem_mb"] - cpu_mem_initial
+
+    print("-" * 50)
+    print("Model Loading Memory Report:")
+    print(f"  Load Time: {load_s:.2f} s")
+    print(f"  CPU Memory Cost to Load: {cpu_load_cost:.2f} MB")
+    print(f"  Initial GPU Memory Allocated: {mem_after_load['gpu_mem_mb']:.2f} MB")
+    print("-" * 50)
+    return mem_after_load
+
+
+def run_benchmark(adapter, prompts, output_path, params=None, token_counter=None,
+                  memory_interval_s=MEMORY_SAMPLE_INTERVAL_S, tags=None, warmup=None, trials=1, profiler=None,
+                  stop_repetition=False):
+    params = params or SamplingConfig()
+    profiler = profiler or RequestProfiler(enabled=False)
+    records = as_records(prompts)
+    prompt_counts = true_prompt_counts(token_counter, records)
+    dataset_hash = dataset_hash_of(prompts)
+    stop_mode = repetition_stop_mode(adapter, stop_repetition)
+    if stop_mode == "harness":
+        # Engines that cannot stop a sequence themselves (vLLM V1) are streamed and cut here instead.
+        adapter.streaming = True
+    sampler = MemorySampler(memory_interval_s).start()
+    sampler.set_phase("load")
+    mem_after_load = load_and_report(adapter)
+    gpu_mem_after_load = mem_after_load["gpu_mem_mb"]
+
+    print(f"Using {len(records)} prompts (dataset {dataset_hash}). Starting benchmark...")
+    sampler.set_phase("warmup")
+    warmup_summary = warm_up(adapter, records, params, warmup)
+    sampler.set_phase("run")
+
+    rows = []
+    peak_gpu_mem_mb = gpu_mem_after_load
+    if stop_mode == "engine":
+        adapter.stop_condition = token_stop_condition()
+    run_meta = run_metadata(adapter, "closed_loop", params, dataset_hash, load_s=mem_after_load["load_s"],
+                            warmup=warmup_summary, trials=trials, stop_repetition=stop_repetition,
+                            repetition_stop=stop_mode, **(tags or {}))
+    schedule = trial_schedule(len(records), trials)
+    with open_result_writer(output_path, RESULT_FIELDS, run_meta) as writer:
+
+        for n, (trial, i) in enumerate(schedule):
+            record = records[i]
+            profiler.before_request(n)
+            lap = profiler.lap()
+            stopped_early = False
+            if stop_mode == "harness":
+                result = measure_stream(adapter, engine_prompt(adapter, record), params, detector=RepetitionDetector())
+                duration = result["e2e_latency_s"]
+                gen = Generation(result["text"], result["output_token_count"], result["prompt_token_count"],
+                                 cache_hit=result["cache_hit"])
+                stopped_early = result["stopped_early"]
+            else:
+                start = time.perf_counter_ns()
+                gen = adapter.generate(engine_prompt(adapter, record), params)
+                duration = (time.perf_counter_ns() - start) / 1e9
+            lap = profiler.record("generate", lap)
+
+            mem = adapter.memory_report()
+            peak_gpu_mem_mb = max(peak_gpu_mem_mb, mem["gpu_mem_mb"], sampler.peak("gpu_tree_mb", "run"))
+            tps = gen.output_token_count / duration if duration > 0 else 0.0
+            lap = profiler.record("memory_poll", lap)
+
+            counts = token_columns(
+                token_counter, prompt_counts[i], gen.prompt_token_count, gen.text, gen.output_token_count
+            )
+            lap = profiler.record("token_count", lap)
+            repetition = repetition_columns(gen.text, gen.output_token_count, params.max_tokens,
+                                            stopped_early=stopped_early, engine_stop=stop_mode == "engine")
+            lap = profiler.record("repetition_check", lap)
+            row = {
+                "engine": adapter.name,
+                "dataset_hash": dataset_hash,
+                "prompt_id": record.id,
+                "category": record.category,
+                "prompt": record.prompt,
+                "prompt_word_count": len(record.prompt.split()),
+                "prompt_token_count": gen.prompt_token_count,
+                "output": clean_output(gen.text),
+                "output_token_count": gen.output_token_count,
+                **counts,
+                **repetition,
+                "cache_hit": gen.cache_hit,
+                "trial": trial,
+                "duration_s": duration,
+                "tokens_per_sec": tps,
+                "total_gpu_mem_after_load_mb": gpu_mem_after_load,
+                "peak_gpu_mem_during_run_mb": peak_gpu_mem_mb,
+                "cpu_memory_used_mb": mem["cpu_mem_mb"],
+            }
+            rows.append(row)
+            lap = profiler.record("row_build", lap)
+            writer.write(row)
+            lap = profiler.record("result_write", lap)
+
+            print(f"  Processed prompt {n+1}/{len(schedule)}... ({tps:.2f} tokens/sec)")
+            profiler.record("log", lap)
+            profiler.after_request(n)
+
+        profiler.finish()
+        adapter.close()
+        finish_memory_sampler(sampler, writer)
+        if profiler.enabled:
+            writer.write_phase_timings(profiler.breakdown())
+
+    report_mismatches(rows)
+    print("-" * 50)
+    print("Benchmark Complete!")
+    report_repetition(rows)
+    report_cache_hits(rows)
+    if trials > 1:
+        report_trials(rows, "tokens_per_sec")
+    profiler.print_report()
+    print(f"Results saved to {output_path}")
+    print(f"Final Peak GPU Memory: {peak_gpu_mem_mb:.2f} MB")
+    print("-" * 50)
+    return rows
+
+
+def run_batch_benchmark(adapter, prompts, output_path, params=None, batch_sizes=BATCH_SIZES, token_counter=None,
+                        memory_interval_s=MEMORY_SAMPLE_INTERVAL_S, tags=None, warmup=None, stop_repetition=False):
+    params = params or SamplingConfig()
+    records = as_records(prompts)
+    prompt_counts = true_prompt_counts(token_counter, records)
+    dataset_hash = dataset_hash_of(prompts)
+    sampler = MemorySampler(memory_interval_s).start()
+    sampler.set_phase("load")
+    mem_after_load = load_and_report(adapter)
+    gpu_mem_after_load = mem_after_load["gpu_mem_mb"]
+
+    print(f"Using {len(records)} prompts at batch sizes {list(batch_sizes)}. Starting benchmark...")
+    sampler.set_phase("warmup")
+    warmup_summary = warm_up(adapter, records, params, warmup)
+    sampler.set_phase("run")
+
+    rows = []
+    summary = []
+    peak_gpu_mem_mb = gpu_mem_after_load
+    stop_mode = repetition_stop_mode(adapter, stop_repetition)
+    if stop_mode == "engine":
+        adapter.stop_condition = token_stop_condition()
+    elif stop_mode == "harness":
+        # A blocking batch call cannot be cut per request, so loops are only flagged.
+        print(f"WARNING: {adapter.name} cannot stop sequences inside the engine; batched loops run to max_tokens")
+        stop_mode = None
+    run_meta = run_metadata(adapter, "batch", params, dataset_hash, load_s=mem_after_load["load_s"],
+                            batch_sizes=list(batch_sizes), warmup=warmup_summary, stop_repetition=stop_repetition,
+                            repetition_stop=stop_mode, **(tags or {}))
+    with open_result_writer(output_path, BATCH_RESULT_FIELDS, run_meta) as writer:
+
+        for batch_size in batch_sizes:
+            total_output_tokens = 0
+            total_duration = 0.0
+            for batch_start in range(0, len(records), batch_size):
+                batch = records[batch_start:batch_start + batch_size]
+                batch_prompt_counts = prompt_counts[batch_start:batch_start + batch_size]
+                start = time.perf_counter_ns()
+                gens = adapter.generate_batch([engine_prompt(adapter, record) for record in batch], params)
+                batch_duration = (time.perf_counter_ns() - start) / 1e9
+                total_duration += batch_duration
+
+                mem = adapter.memory_report()
+                peak_gpu_mem_mb = max(peak_gpu_mem_mb, mem["gpu_mem_mb"], sampler.peak("gpu_tree_mb", "run"))
+                batch_tokens = sum(gen.output_token_count for gen in gens)
+                total_output_tokens += sum(gen.output_token_count for gen in gens if not gen.cache_hit)
+
+                for record, true_prompt_tokens, gen in zip(batch, batch_prompt_counts, gens):
+                    # Blocking batch calls only expose the batch wall time unless the
+                    # engine reports per-request timing.
+                    latency = gen.latency_s if gen.latency_s is not None else batch_duration
+                    tps = gen.output_token_count / latency if latency > 0 else 0.0
+                    row = {
+                        "engine": adapter.name,
+                        "batch_size": batch_size,
+                        "dataset_hash": dataset_hash,
+                        "prompt_id": record.id,
+                        "category": record.category,
+                        "prompt": record.prompt,
+                        "prompt_word_count": len(record.prompt.split()),
+                        "prompt_token_count": gen.prompt_token_count,
+                        "output": clean_output(gen.text),
+                        "output_token_count": gen.output_token_count,
+                        **token_columns(
+                            token_counter, true_prompt_tokens, gen.prompt_token_count, gen.text, gen.output_token_count
+                        ),
+                        **repetition_columns(gen.text, gen.output_token_count, params.max_tokens,
+                                             engine_stop=stop_mode == "engine"),
+                        "cache_hit": gen.cache_hit,
+                        "latency_s": latency,
+                        "ttft_ms": gen.ttft_s * 1000 if gen.ttft_s is not None else None,
+                        "tokens_per_sec": tps,
+                        "batch_duration_s": batch_duration,
+                        "batch_tokens_per_sec": batch_tokens / batch_duration if batch_duration > 0 else 0.0,
+                        "peak_gpu_mem_during_run_mb": peak_gpu_mem_mb,
+                        "cpu_memory_used_mb": mem["cpu_mem_mb"],
+                    }
+                    rows.append(row)
+                    writer.write(row)
+
+            aggregate_tps = total_output_tokens / total_duration if total_duration > 0 else 0.0
+            summary.append({
+                "batch_size": batch_size,
+                "requests": len(records),
+                "output_tokens": total_output_tokens,
+                "duration_s": total_duration,
+                "aggregate_tokens_per_sec": aggregate_tps,
+                "requests_per_sec": len(records) / total_duration if total_duration > 0 else 0.0,
+            })
+            print(f"  Batch size {batch_size}: {aggregate_tps:.2f} aggregate tokens/sec over {total_duration:.2f}s")
+
+        adapter.close()
+        finish_memory_sampler(sampler, writer)
+
+    report_mismatches(rows)
+    print("-" * 50)
+    print("Batch Benchmark Complete!")
+    report_repetition(rows)
+    report_cache_hits(rows)
+    print(f"{'batch':>6} {'tokens':>8} {'seconds':>9} {'tok/s':>10} {'req/s':>8}")
+    for entry in summary:
+        print(
+            f"{entry['batch_size']:>6} {entry['output_tokens']:>8} {entry['duration_s']:>9.2f} "
+            f"{entry['aggregate_tokens_per_sec']:>10.2f} {entry['requests_per_sec']:>8.2f}"
+        )
+    print(f"Results saved to {output_path}")
+    print(f"Final Peak GPU Memory: {peak_gpu_mem_mb:.2f} MB")
+    print("-" * 50)
+    return rows, summary
+
+
+def measure_stream(adapter, prompt, params, token_counter=None, detector=None):
+    chunks = []
+    stream = adapter.stream(prompt, params)
+    start = time.perf_counter_ns()
+    try:
+        for chunk in stream:
+            chunks.append((time.perf_counter_ns(), chunk))
+            if detector is not None and detector.feed(chunk.text):
+                break
+    finally:
+        # Closing a stream that was cut early aborts the request in the engine.
+        stream.close()
+    end = time.perf_counter_ns()
+
+    # Skip empty keep-alive chunks so TTFT marks the first real token.
+    chunks = [(ts, chunk) for ts, chunk in chunks if chunk.num_tokens > 0] or chunks
+    first_token_ns = chunks[0][0] if chunks else end
+    output_token_count = sum(chunk.num_tokens for _, chunk in chunks)
+
+    # A chunk carrying k tokens contributes k equal inter-token gaps.
+    itls = []
+    prev_ns = first_token_ns
+    for ts, chunk in chunks[1:]:
+        if chunk.num_tokens > 0:
+            itls.extend([(ts - prev_ns) / chunk.num_tokens / 1e6] * chunk.num_tokens)
+            prev_ns = ts
+
+    if isinstance(prompt, list):
+        prompt_token_count = len(prompt)
+    elif token_counter is not None:
+        prompt_token_count = token_counter.count_prompt(prompt)
+    else:
+        prompt_token_count = adapter.count_tokens(prompt)
+    ttft_s = (first_token_ns - start) / 1e9
+    decode_s = (end - first_token_ns) / 1e9
+    decode_tokens = output_token_count - (chunks[0][1].num_tokens if chunks else 0)
+    reported = [chunk.cached_tokens for _, chunk in chunks if chunk.cached_tokens is not None]
+    return {
+        "text": "".join(chunk.text for _, chunk in chunks),
+        "prompt_token_count": prompt_token_count,
+        "output_token_count": output_token_count,
+        "ttft_ms": ttft_s * 1000,
+        "itls_ms": itls,
+        "prefill_tokens_per_sec": prompt_token_count / ttft_s if ttft_s > 0 else 0.0,
+        "decode_tokens_per_sec": decode_tokens / decode_s if decode_s > 0 else 0.0,
+        "e2e_latency_s": (end - start) / 1e9,
+        "stopped_early": detector is not None and detector.triggered,
+        "cached_tokens": reported[-1] if reported else None,
+        "cache_hit": any(chunk.cache_hit for _, chunk in chunks),
+    }
+
+
+def run_streaming_benchmark(adapter, prompts, output_path, params=None, token_counter=None,
+                            memory_interval_s=MEMORY_SAMPLE_INTERVAL_S, tags=None, warmup=None, trials=1,
+                            profiler=None, stop_repetition=False):
+    params = params or SamplingConfig()
+    profiler = profiler or RequestProfiler(enabled=False)
+    adapter.streaming = True
+    records = as_records(prompts)
+    dataset_hash = dataset_hash_of(prompts)
+    sampler = MemorySampler(memory_interval_s).start()
+    sampler.set_phase("load")
+    mem_after_load = load_and_report(adapter)
+    gpu_mem_after_load = mem_after_load["gpu_mem_mb"]
+
+    print(f"Using {len(records)} prompts in streaming mode. Starting benchmark...")
+    sampler.set_phase("warmup")
+    warmup_summary = warm_up(adapter, records, params, warmup)
+    sampler.set_phase("run")
+
+    rows = []
+    all_itls = []
+    peak_gpu_mem_mb = gpu_mem_after_load
+    run_meta = run_metadata(adapter, "stream", params, dataset_hash, load_s=mem_after_load["load_s"],
+                            warmup=warmup_summary, trials=trials, stop_repetition=stop_repetition,
+                            repetition_stop="harness" if stop_repetition else None, **(tags or {}))
+    schedule = trial_schedule(len(records), trials)
+    with open_result_writer(output_path, STREAM_RESULT_FIELDS, run_meta) as writer:
+
+        for n, (trial, i) in enumerate(schedule):
+            record = records[i]
+            profiler.before_request(n)
+            lap = profiler.lap()
+            detector = RepetitionDetector() if stop_repetition else None
+            result = measure_stream(adapter, engine_prompt(adapter, record), params, token_counter, detector)
+            e2e_ns = int(result["e2e_latency_s"] * 1e9)
+            ttft_ns = int(result["ttft_ms"] * 1e6)
+            profiler.add("prefill", ttft_ns)
+            profiler.add("decode", e2e_ns - ttft_ns)
+            # What measure_stream does after the last chunk: joining text, ITLs, prompt token count.
+            lap = profiler.record("token_count", lap, exclude_ns=e2e_ns)
+
+            mem = adapter.memory_report()
+            peak_gpu_mem_mb = max(peak_gpu_mem_mb, mem["gpu_mem_mb"], sampler.peak("gpu_tree_mb", "run"))
+            itls = result["itls_ms"]
+            if not result["cache_hit"]:
+                all_itls.extend(itls)
+            lap = profiler.record("memory_poll", lap)
+
+            row = {
+                "engine": adapter.name,
+                "dataset_hash": dataset_hash,
+                "prompt_id": record.id,
+                "category": record.category,
+                "prompt": record.prompt,
+                "prompt_word_count": len(record.prompt.split()),
+                "prompt_token_count": result["prompt_token_count"],
+                "output": clean_output(result["text"]),
+                "output_token_count": result["output_token_count"],
+                **token_columns(
+                    token_counter, result["prompt_token_count"], None, result["text"], result["output_token_count"]
+                ),
+                **repetition_columns(result["text"], result["output_token_count"], params.max_tokens,
+                                     stopped_early=result["stopped_early"]),
+                "cache_hit": result["cache_hit"],
+                "trial": trial,
+                "ttft_ms": result["ttft_ms"],
+                "itl_mean_ms": mean(itls),
+                "itl_p50_ms": percentile(itls, 50),
+                "itl_p99_ms": percentile(itls, 99),
+                "prefill_tokens_per_sec": result["prefill_tokens_per_sec"],
+                "decode_tokens_per_sec": result["decode_tokens_per_sec"],
+                "e2e_latency_s": result["e2e_latency_s"],
+                "peak_gpu_mem_during_run_mb": peak_gpu_mem_mb,
+                "cpu_memory_used_mb": mem["cpu_mem_mb"],
+            }
+            rows.append(row)
+            lap = profiler.record("row_build", lap)
+            writer.write(row)
+            lap = profiler.record("result_write", lap)
+
+            print(
+                f"  Processed prompt {n+1}/{len(schedule)}... "
+                f"(TTFT {row['ttft_ms']:.1f} ms, decode {row['decode_tokens_per_sec']:.2f} tokens/sec)"
+            )
+            profiler.record("log", lap)
+            profiler.after_request(n)
+
+        profiler.finish()
+        adapter.close()
+        finish_memory_sampler(sampler, writer)
+        if profiler.enabled:
+            writer.write_phase_timings(profiler.breakdown())
+
+    report_mismatches(rows)
+    ttfts = [row["ttft_ms"] for row in engine_rows(rows)]
+    print("-" * 50)
+    print("Streaming Benchmark Complete!")
+    report_repetition(rows)
+    report_cache_hits(rows)
+    print(f"  TTFT p50/p99: {percentile(ttfts, 50):.1f} / {percentile(ttfts, 99):.1f} ms")
+    print(f"  ITL  p50/p99: {percentile(all_itls, 50):.2f} / {percentile(all_itls, 99):.2f} ms")
+    if trials > 1:
+        report_trials(rows, "ttft_ms")
+        report_trials(rows, "decode_tokens_per_sec")
+    profiler.print_report()
+    print(f"Results saved to {output_path}")
+    print(f"Final Peak GPU Memory: {peak_gpu_mem_mb:.2f} MB")
+    print("-" * 50)
+    return rows
+
+
+def parse_batch_sizes(value):
+    return [int(size) for size in value.split(",") if size]
+
+
+def parse_window(value):
+    start, _, end = value.partition(":")
+    return int(start), int(end)
+
+
+def parse_engine_args(pairs):
+    engine_kwargs = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition("=")
+        try:
+            engine_kwargs[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            engine_kwargs[key] = value
+    return engine_kwargs
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Benchmark an inference engine through its adapter.")
+    parser.add_argument("--engine", choices=sorted(ENGINES), required=True)
+    parser.add_argument("--model", default="fake")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH,
+                        help="SQLite result store, or a .csv path for a single-run CSV")
+    add_dataset_arguments(parser)
+    parser.add_argument("--tokenizer", default=None,
+                        help="HF tokenizer or .gguf path for true token counts; 'model' reuses --model")
+    parser.add_argument("--chat-template", default=None, metavar="TOKENIZER",
+                        help="apply this HF tokenizer's or .gguf file's chat template and pre-tokenize the prompts; "
+                             "'model' reuses --model")
+    parser.add_argument("--system-prompt", default=None, help="system message for --chat-template")
+    parser.add_argument("--prepared-dir", default=PREPARED_DIR,
+                        help="where templated, pre-tokenized prompts are cached")
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE",
+                        help="extra engine constructor argument, may be repeated")
+    parser.add_argument("--batch-sizes", type=parse_batch_sizes, default=None,
+                        help="comma-separated batch sizes, e.g. 1,4,8,16,32; enables batch mode")
+    parser.add_argument("--stream", action="store_true",
+                        help="measure TTFT and inter-token latency through the streaming API")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="serve repeated deterministic requests from an exact-match cache")
+    parser.add_argument("--response-cache-disk", default=None, help="SQLite file for the cache's disk tier")
+    parser.add_argument("--response-cache-ttl-s", type=float, default=None)
+    parser.add_argument("--response-cache-max-temperature", type=float, default=0.0,
+                        help="cache unseeded requests at or below this temperature")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--warmup", choices=["adaptive", "single"], default="adaptive",
+                        help="adaptive repeats warmup rounds until per-token latency settles")
+    parser.add_argument("--warmup-tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative spread of per-token latency across the window")
+    parser.add_argument("--warmup-window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--warmup-max-rounds", type=int, default=DEFAULT_MAX_ROUNDS)
+    parser.add_argument("--trials", type=int, default=1,
+                        help="run every prompt this many times, interleaved, for confidence intervals")
+    parser.add_argument("--stop-repetition", action="store_true",
+                        help="cut generations that fall into a repetition loop and count the decode tokens saved")
+    parser.add_argument("--profile-phases", action="store_true",
+                        help="time each loop phase (engine vs harness work) and store the breakdown")
+    parser.add_argument("--profiler", choices=PROFILER_TOOLS, default=None,
+                        help="attach a profiler to the --profile-window requests")
+    parser.add_argument("--profile-window", type=parse_window, default=(0, 5), metavar="START:END",
+                        help="request indices to profile, end exclusive")
+    parser.add_argument("--profile-output", default="benchmark_profile", help="output path prefix for the profiler")
+    parser.add_argument("--tag", action="append", metavar="KEY=VALUE",
+                        help="extra run metadata such as config_id, may be repeated")
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--temperature", type=float, default=0.3)
+    parser.add_argument("--top-p", type=float, default=0.5)
+    parser.add_argument("--repetition-penalty", type=float, default=1.1)
+    return parser
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.trials > 1 and args.batch_sizes:
+        parser.error("--trials is not supported with --batch-sizes")
+    if (args.profile_phases or args.profiler) and args.batch_sizes:
+        parser.error("profiling is not supported with --batch-sizes")
+
+    prompts = dataset_from_args(args)
+    template = None
+    if args.chat_template:
+        template = ChatTemplate(args.model if args.chat_template == "model" else args.chat_template,
+                                args.system_prompt)
+        prompts = prepare_prompts(prompts, template, args.prepared_dir)
+    token_counter = None
+    if args.tokenizer:
+        token_counter = TokenCounter(args.model if args.tokenizer == "model" else args.tokenizer)
+
+    adapter = get_engine(args.engine, args.model, **parse_engine_args(args.engine_arg))
+    adapter.templated_prompts = template is not None
+    response_cache = None
+    if args.response_cache:
+        response_cache = ResponseCache(
+            ttl_s=args.response_cache_ttl_s,
+            disk_path=args.response_cache_disk,
+            max_temperature=args.response_cache_max_temperature,
+        )
+        adapter = CachedAdapter(adapter, response_cache)
+    params = SamplingConfig(
+        max_tokens=args.max_tokens,
+        temperature=args.temperature,
+        top_p=args.top_p,
+        repetition_penalty=args.repetition_penalty,
+        seed=args.seed,
+    )
+    tags = parse_engine_args(args.tag)
+    if response_cache is not None:
+        tags["response_cache"] = True
+    if template is not None:
+        tags.update(prompt_format(template))
+    profiler = RequestProfiler(args.profile_phases, args.profiler, args.profile_window, args.profile_output)
+    warmup = None
+    if args.warmup == "adaptive":
+        warmup = WarmupController(args.warmup_tolerance, args.warmup_window, args.warmup_max_rounds)
+    if args.stream:
+        run_streaming_benchmark(adapter, prompts, args.output, params, token_counter, tags=tags, warmup=warmup,
+                                trials=args.trials, profiler=profiler, stop_repetition=args.stop_repetition)
+    elif args.batch_sizes:
+        run_batch_benchmark(adapter, prompts, args.output, params, args.batch_sizes, token_counter, tags=tags,
+                            warmup=warmup, stop_repetition=args.stop_repetition)
+    else:
+        run_benchmark(adapter, prompts, args.output, params, token_counter, tags=tags, warmup=warmup,
+                      trials=args.trials, profiler=profiler, stop_repetition=args.stop_repetition)
+    if response_cache is not None:
+        response_cache.print_report()
+        response_cache.close()
+
+
+if __name__ == "__main__":
+    main()
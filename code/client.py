@@ -1,9 +1,310 @@
-import mii
+import argparse
+import asyncio
+import json
+import time
 
-deployment_name = "Qwen/Qwen2-7B"
+import aiohttp
 
-generator = mii.pipeline(deployment_name)
+from engines import SamplingConfig
+from metrics import mean, percentile
+from prompt_datasets import add_dataset_arguments, as_records, dataset_from_args, dataset_hash_of
+from results import open_result_writer
 
-response = generator("Who is the president of the United States?", max_new_tokens=50)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-print("Response:", response)
+CLIENT_RESULT_FIELDS = [
+    "engine",
+    "dataset_hash",
+    "prompt_id",
+    "category",
+    "prompt",
+    "output",
+    "ok",
+    "error",
+    "start_ns",
+    "first_byte_ns",
+    "first_token_ns",
+    "end_ns",
+    "ttft_ms",
+    "e2e_latency_s",
+    "itl_mean_ms",
+    "itl_p99_ms",
+    "events",
+    "prompt_token_count",
+    "output_token_count",
+]
+
+LOOP_LAG_INTERVAL_S = 0.01
+
+
+class CompletionClient:
+    """Streaming client for OpenAI-compatible servers over one pooled aiohttp session.
+
+    Connections are kept alive and reused up to max_connections. SSE is parsed
+    from raw body chunks as they arrive; only the event timestamps, the text
+    and the final usage are kept per request. Timestamps are perf_counter_ns.
+    """
+
+    def __init__(self, base_url, model, max_connections=1024, keepalive_timeout_s=60.0, keep_text=True):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.keep_text = keep_text
+        self.parse_ns = 0
+        self.events = 0
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=max_connections,
+                limit_per_host=max_connections,
+                keepalive_timeout=keepalive_timeout_s,
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=30),
+        )
+
+    def _payload(self, prompt, params, chat):
+        payload = {
+            "model": self.model,
+            "max_tokens": params.max_tokens,
+            "temperature": params.temperature,
+            "top_p": params.top_p,
+            "repetition_penalty": params.repetition_penalty,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        if params.seed is not None:
+            payload["seed"] = params.seed
+        if chat:
+            payload["messages"] = [{"role": "user", "content": prompt}]
+        else:
+            payload["prompt"] = prompt
+        return payload
+
+    def _parse_event(self, data, record, now_ns, chat):
+        start = time.perf_counter_ns()
+        event = json.loads(data)
+        usage = event.get("usage")
+        if usage:
+            record["prompt_token_count"] = usage.get("prompt_tokens")
+            record["output_token_count"] = usage.get("completion_tokens")
+        choices = event.get("choices")
+        if choices:
+            choice = choices[0]
+            text = (choice.get("delta") or {}).get("content") if chat else choice.get("text")
+            if text:
+                if record["first_token_ns"] is None:
+                    record["first_token_ns"] = now_ns
+                record["token_ns"].append(now_ns)
+                if self.keep_text:
+                    record["texts"].append(text)
+        self.parse_ns += time.perf_counter_ns() - start
+        self.events += 1
+
+    async def stream_completion(self, prompt, params, chat=False):
+        """Send one streaming request and return its timing record; errors are recorded, not raised."""
+        url = self.base_url + ("/v1/chat/completions" if chat else "/v1/completions")
+        record = {
+            "start_ns": time.perf_counter_ns(), "first_byte_ns": None, "first_token_ns": None, "end_ns": None,
+            "token_ns": [], "texts": [], "prompt_token_count": None, "output_token_count": None,
+            "ok": False, "error": None,
+        }
+        try:
+            async with self._session.post(url, json=self._payload(prompt, params, chat)) as resp:
+                if resp.status != 200:
+                    record["error"] = f"HTTP {resp.status}: {(await resp.text())[:200]}"
+                    return record
+                buffer = b""
+                done = False
+                async for block in resp.content.iter_any():
+                    now_ns = time.perf_counter_ns()
+                    if record["first_byte_ns"] is None:
+                        record["first_byte_ns"] = now_ns
+                    buffer += block
+                    # Events end with a blank line; anything after the last one is a partial event.
+                    *events, buffer = buffer.split(b"\n\n")
+                    for raw in events:
+                        for line in raw.split(b"\n"):
+                            if not line.startswith(b"data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == b"[DONE]":
+                                done = True
+                            elif data.startswith(b'{"error"'):
+                                record["error"] = json.loads(data)["error"]["message"]
+                            else:
+                                self._parse_event(data, record, now_ns, chat)
+                    if done:
+                        break
+                record["ok"] = record["error"] is None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            record["error"] = repr(exc)
+        finally:
+            record["end_ns"] = time.perf_counter_ns()
+        if record["output_token_count"] is None:
+            record["output_token_count"] = len(record["token_ns"])
+        return record
+
+    async def close(self):
+        await self._session.close()
+
+
+async def _measure_loop_lag(lags_ms, stop):
+    # A busy client shows up as the event loop waking late from short sleeps.
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL_S)
+        lags_ms.append((time.perf_counter() - start - LOOP_LAG_INTERVAL_S) * 1000)
+
+
+async def run_clients(client, records, params, concurrency, chat=False):
+    """Closed loop: concurrency workers each send their next request as soon as the last one finishes."""
+    queue = asyncio.Queue()
+    for record in records:
+        queue.put_nowait(record)
+    results = []
+
+    async def worker():
+        while True:
+            try:
+                prompt_record = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result = await client.stream_completion(prompt_record.prompt, params, chat)
+            results.append((prompt_record, result))
+
+    lags_ms = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(lags_ms, stop))
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(records)))))
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.process_time() - cpu_start
+    stop.set()
+    await lag_task
+
+    overhead = {
+        "wall_s": wall_s,
+        "client_cpu_s": cpu_s,
+        "client_cpu_pct": cpu_s / wall_s * 100 if wall_s > 0 else 0.0,
+        "parse_us_per_event": client.parse_ns / client.events / 1000 if client.events else 0.0,
+        "loop_lag_p50_ms": percentile(lags_ms, 50),
+        "loop_lag_p99_ms": percentile(lags_ms, 99),
+    }
+    return results, overhead
+
+
+def timing_row(prompt_record, result, run_start_ns, endpoint, dataset_hash):
+    def rel(ns):
+        return ns - run_start_ns if ns is not None else None
+
+    token_ns = result["token_ns"]
+    itls = [(b - a) / 1e6 for a, b in zip(token_ns, token_ns[1:])]
+    return {
+        "engine": endpoint,
+        "dataset_hash": dataset_hash,
+        "prompt_id": prompt_record.id,
+        "category": prompt_record.category,
+        "prompt": prompt_record.prompt,
+        "output": "".join(result["texts"]),
+        "ok": result["ok"],
+        "error": result["error"],
+        "start_ns": rel(result["start_ns"]),
+        "first_byte_ns": rel(result["first_byte_ns"]),
+        "first_token_ns": rel(result["first_token_ns"]),
+        "end_ns": rel(result["end_ns"]),
+        "ttft_ms": (result["first_token_ns"] - result["start_ns"]) / 1e6 if result["first_token_ns"] else None,
+        "e2e_latency_s": (result["end_ns"] - result["start_ns"]) / 1e9,
+        "itl_mean_ms": mean(itls) if itls else None,
+        "itl_p99_ms": percentile(itls, 99) if itls else None,
+        "events": len(token_ns),
+        "prompt_token_count": result["prompt_token_count"],
+        "output_token_count": result["output_token_count"],
+    }
+
+
+def print_summary(rows, overhead):
+    completed = [row for row in rows if row["ok"]]
+    output_tokens = sum(row["output_token_count"] or 0 for row in completed)
+    ttfts = [row["ttft_ms"] for row in completed if row["ttft_ms"] is not None]
+    e2es = [row["e2e_latency_s"] for row in completed]
+    print("-" * 50)
+    print(f"Completed {len(completed)}/{len(rows)} requests in {overhead['wall_s']:.2f}s")
+    print(f"  Throughput: {len(completed) / overhead['wall_s']:.2f} req/s, "
+          f"{output_tokens / overhead['wall_s']:.2f} output tokens/s")
+    print(f"  TTFT p50/p99: {percentile(ttfts, 50):.1f} / {percentile(ttfts, 99):.1f} ms")
+    print(f"  E2E p50/p99: {percentile(e2es, 50):.3f} / {percentile(e2es, 99):.3f} s")
+    print("Client overhead:")
+    print(f"  CPU: {overhead['client_cpu_s']:.2f}s ({overhead['client_cpu_pct']:.1f}% of one core)")
+    print(f"  SSE parse: {overhead['parse_us_per_event']:.1f} us/event")
+    print(f"  Event loop lag p50/p99: {overhead['loop_lag_p50_ms']:.2f} / {overhead['loop_lag_p99_ms']:.2f} ms")
+    if overhead["client_cpu_pct"] > 80 or overhead["loop_lag_p99_ms"] > 5:
+        print("  WARNING: the client is near saturation; timings may include client-side queueing.")
+    errors = {row["error"] for row in rows if row["error"]}
+    for error in sorted(errors)[:5]:
+        print(f"  error: {error}")
+    print("-" * 50)
+
+
+async def _main(args, records, params):
+    client = CompletionClient(args.endpoint, args.model, args.max_connections, keep_text=not args.no_text)
+    try:
+        run_start_ns = time.perf_counter_ns()
+        results, overhead = await run_clients(client, records, params, args.concurrency, args.chat)
+    finally:
+        await client.close()
+    return run_start_ns, results, overhead
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent streaming client for OpenAI-compatible servers.")
+    parser.add_argument("--endpoint", required=True, help="base URL, e.g. http://localhost:8000")
+    parser.add_argument("--model", default="fake")
+    parser.add_argument("--chat", action="store_true", help="use /v1/chat/completions")
+    add_dataset_arguments(parser)
+    parser.add_argument("--num-requests", type=int, default=None, help="cycle the dataset up to this many requests")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-connections", type=int, default=1024)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--temperature", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-text", action="store_true", help="do not keep generated text")
+    parser.add_argument("--output", default="benchmark_results.sqlite")
+    args = parser.parse_args(argv)
+
+    dataset = dataset_from_args(args)
+    records = as_records(dataset)
+    if args.num_requests:
+        records = [records[i % len(records)] for i in range(args.num_requests)]
+    params = SamplingConfig(max_tokens=args.max_tokens, temperature=args.temperature, seed=args.seed)
+
+    if uvloop is not None:
+        uvloop.install()
+    run_start_epoch_ns = time.time_ns()
+    run_start_ns, results, overhead = asyncio.run(_main(args, records, params))
+
+    run_meta = {
+        "engine": args.endpoint,
+        "model": args.model,
+        "mode": "client",
+        "sampling_params": params.to_dict(),
+        "dataset_hash": dataset_hash_of(dataset),
+        "concurrency": args.concurrency,
+        "run_start_epoch_ns": run_start_epoch_ns,
+        "client_overhead": overhead,
+    }
+    rows = [
+        timing_row(prompt_record, result, run_start_ns, args.endpoint, run_meta["dataset_hash"])
+        for prompt_record, result in results
+    ]
+    with open_result_writer(args.output, CLIENT_RESULT_FIELDS, run_meta) as writer:
+        for row in rows:
+            writer.write(row)
+    print_summary(rows, overhead)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
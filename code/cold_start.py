@@ -0,0 +1,303 @@
+import argparse
+import glob
+import importlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import psutil
+
+from benchmark import parse_engine_args
+from engines import ENGINES, SamplingConfig, get_engine
+from memory import MemorySampler
+from metrics import mean
+from results import engine_version, host_info, open_result_writer
+from sweep import run_isolated
+
+RESULT_PREFIX = "COLD_START_RESULT "
+READ_BLOCK_BYTES = 16 * 1024 * 1024
+WEIGHT_PATTERNS = ("*.gguf", "*.safetensors", "*.bin", "*.pt")
+FIRST_REQUEST_PROMPT = "Explain what a prime number is."
+
+# Package each adapter imports inside load(); timed separately from the load itself.
+ENGINE_MODULES = {
+    "vllm": "vllm",
+    "aphrodite": "aphrodite",
+    "llama_cpp": "llama_cpp",
+    "lmdeploy": "lmdeploy",
+    "sglang": "sglang",
+    "mii": "mii",
+    "fake": None,
+}
+
+# Phase timings the engines print while loading, as (phase, regex, unit).
+LOG_PHASES = [
+    ("weights_s", r"Loading weights took ([\d.]+) ?s", "s"),
+    ("model_load_s", r"Model loading took [\d.]+ ?GiB(?: memory)? and ([\d.]+) ?s", "s"),
+    ("compile_s", r"torch\.compile takes ([\d.]+) ?s", "s"),
+    ("graph_capture_s", r"Graph capturing finished in ([\d.]+) ?secs?", "s"),
+    ("engine_init_s", r"init engine \(.*?\) took ([\d.]+) ?s", "s"),
+    ("engine_load_s", r"load time =\s+([\d.]+) ms", "ms"),
+]
+
+COLD_START_FIELDS = [
+    "engine",
+    "model",
+    "weights_format",
+    "weights_mb",
+    "cache",
+    "trial",
+    "status",
+    "startup_s",
+    "import_s",
+    "load_s",
+    "first_request_s",
+    "second_request_s",
+    "time_to_first_servable_s",
+    "process_wall_s",
+    "load_disk_read_mb",
+    "load_peak_rss_mb",
+    "load_peak_gpu_device_mb",
+    "page_cache_note",
+    *(phase for phase, _, _ in LOG_PHASES),
+]
+
+
+def weight_files(model_path):
+    """Local weight files behind a model path, GGUF file, or Hugging Face repo id."""
+    if os.path.isfile(model_path):
+        return [model_path]
+    directory = model_path
+    if not os.path.isdir(directory):
+        try:
+            from huggingface_hub import snapshot_download
+            directory = snapshot_download(model_path, local_files_only=True)
+        except Exception:
+            return []
+    for pattern in WEIGHT_PATTERNS:
+        files = sorted(glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+        if files:
+            return files
+    return []
+
+
+def weights_format(files):
+    extensions = {os.path.splitext(path)[1].lstrip(".") for path in files}
+    if not extensions:
+        return None
+    return ",".join(sorted(extensions))
+
+
+def evict_page_cache(files, drop_all=False):
+    """Ask the kernel to drop the weight files from the page cache; returns a note on how."""
+    if drop_all:
+        os.sync()
+        try:
+            with open("/proc/sys/vm/drop_caches", "w") as f_out:
+                f_out.write("3\n")
+            return "drop_caches"
+        except OSError as exc:
+            print(f"  Could not drop all caches ({exc}); falling back to fadvise")
+    for path in files:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return "fadvise" if files else "no local weights"
+
+
+def warm_page_cache(files):
+    buffer = bytearray(READ_BLOCK_BYTES)
+    for path in files:
+        with open(path, "rb", buffering=0) as f_in:
+            while f_in.readinto(buffer):
+                pass
+    return "read" if files else "no local weights"
+
+
+def _disk_read_bytes(process):
+    try:
+        return process.io_counters().read_bytes
+    except (AttributeError, psutil.AccessDenied):
+        return None
+
+
+def parse_log_phases(log_text):
+    phases = {}
+    for phase, pattern, unit in LOG_PHASES:
+        matches = re.findall(pattern, log_text)
+        if matches:
+            value = float(matches[-1])
+            phases[phase] = value / 1000 if unit == "ms" else value
+    return phases
+
+
+def measure_child(engine, model_path, engine_kwargs, spawn_epoch_s):
+    """Runs in a fresh process: time each step from process start to the first completed request."""
+    startup_s = time.time() - spawn_epoch_s
+    timings = {"startup_s": startup_s}
+    child_start = start = time.perf_counter()
+    if ENGINE_MODULES.get(engine):
+        importlib.import_module(ENGINE_MODULES[engine])
+    timings["import_s"] = time.perf_counter() - start
+
+    adapter = get_engine(engine, model_path, **engine_kwargs)
+    process = psutil.Process()
+    sampler = MemorySampler().start()
+    sampler.set_phase("load")
+    read_before = _disk_read_bytes(process)
+    start = time.perf_counter()
+    adapter.load()
+    timings["load_s"] = time.perf_counter() - start
+    read_after = _disk_read_bytes(process)
+    if read_before is not None and read_after is not None:
+        timings["load_disk_read_mb"] = (read_after - read_before) / (1024 * 1024)
+
+    # The first request pays for lazy initialisation (kernels, compile, allocator
+    # growth); the second shows what a request costs once the replica is warm.
+    sampler.set_phase("first_request")
+    params = SamplingConfig(max_tokens=16, temperature=0.0)
+    start = time.perf_counter()
+    adapter.generate(FIRST_REQUEST_PROMPT, params)
+    timings["first_request_s"] = time.perf_counter() - start
+    timings["time_to_first_servable_s"] = startup_s + time.perf_counter() - child_start
+    sampler.set_phase("second_request")
+    start = time.perf_counter()
+    adapter.generate(FIRST_REQUEST_PROMPT, params)
+    timings["second_request_s"] = time.perf_counter() - start
+
+    sampler.stop()
+    load_peaks = sampler.peaks().get("load", {})
+    timings["load_peak_rss_mb"] = load_peaks.get("rss_mb")
+    timings["load_peak_gpu_device_mb"] = load_peaks.get("gpu_device_mb")
+    adapter.close()
+    return timings
+
+
+def run_trial(target, cache, trial, files, timeout_s, drop_all=False):
+    engine, model_path, engine_args = target
+    note = evict_page_cache(files, drop_all) if cache == "cold" else warm_page_cache(files)
+    with tempfile.NamedTemporaryFile(prefix="cold_start_", suffix=".log", delete=False) as log:
+        log_path = log.name
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--spawn-epoch-s", repr(time.time()),
+               "--target", f"{engine}:{model_path}"]
+    for arg in engine_args:
+        command += ["--engine-arg", arg]
+    status, elapsed = run_isolated(command, timeout_s, log_path)
+
+    with open(log_path, encoding="utf-8", errors="replace") as f_in:
+        log_text = f_in.read()
+    os.remove(log_path)
+    row = {
+        "engine": engine,
+        "model": model_path,
+        "weights_format": weights_format(files),
+        "weights_mb": sum(os.path.getsize(path) for path in files) / (1024 * 1024),
+        "cache": cache,
+        "trial": trial,
+        "status": status,
+        "process_wall_s": elapsed,
+        "page_cache_note": note,
+        **parse_log_phases(log_text),
+    }
+    for line in log_text.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            row.update(json.loads(line[len(RESULT_PREFIX):]))
+    if status != "complete":
+        print("  " + "\n  ".join(log_text.splitlines()[-10:]))
+    return row
+
+
+def parse_target(value):
+    engine, _, model_path = value.partition(":")
+    if engine not in ENGINES or not model_path:
+        raise argparse.ArgumentTypeError(f"expected ENGINE:MODEL with ENGINE in {sorted(ENGINES)}, got {value!r}")
+    return engine, model_path
+
+
+def print_summary(rows):
+    print("-" * 50)
+    print("Cold Start Summary (mean over completed trials):")
+    keys = sorted({(row["engine"], row["model"]) for row in rows})
+    for engine, model_path in keys:
+        target_rows = [row for row in rows if (row["engine"], row["model"]) == (engine, model_path)]
+        print(f"  {engine} {model_path} ({target_rows[0]['weights_format']}, {target_rows[0]['weights_mb']:.0f} MB):")
+        for cache in ("cold", "warm"):
+            done = [row for row in target_rows if row["cache"] == cache and row["status"] == "complete"]
+            if not done:
+                continue
+            line = [f"    {cache}:"]
+            for key in ("startup_s", "import_s", "load_s", "first_request_s", "time_to_first_servable_s"):
+                line.append(f"{key} {mean([row[key] for row in done]):.2f}")
+            reads = [row["load_disk_read_mb"] for row in done if row.get("load_disk_read_mb") is not None]
+            if reads:
+                line.append(f"disk read {mean(reads):.0f} MB")
+            print(" ".join(line))
+            phases = [phase for phase, _, _ in LOG_PHASES if any(row.get(phase) is not None for row in done)]
+            if phases:
+                print("      engine phases: " + ", ".join(
+                    f"{phase} {mean([row[phase] for row in done if row.get(phase) is not None]):.2f}" for phase in phases
+                ))
+    print("-" * 50)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time model loading from a fresh process with a cold and a warm page cache."
+    )
+    parser.add_argument("--target", action="append", type=parse_target, required=True, metavar="ENGINE:MODEL",
+                        help="engine and model (directory, GGUF file or HF repo id); repeat to compare")
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE", default=[])
+    parser.add_argument("--cache", default="cold,warm", help="comma-separated page cache states to test")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--drop-caches", action="store_true",
+                        help="drop the whole page cache for cold trials (root only) instead of per-file fadvise")
+    parser.add_argument("--timeout-s", type=float, default=1800)
+    parser.add_argument("--output", default="benchmark_results.sqlite")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--spawn-epoch-s", type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        engine, model_path = args.target[0]
+        timings = measure_child(engine, model_path, parse_engine_args(args.engine_arg), args.spawn_epoch_s)
+        print(RESULT_PREFIX + json.dumps(timings), flush=True)
+        return
+
+    caches = [cache.strip() for cache in args.cache.split(",") if cache.strip()]
+    rows = []
+    for engine, model_path in args.target:
+        files = weight_files(model_path)
+        if not files:
+            print(f"No local weights found for {model_path}; page cache state cannot be controlled")
+        run_meta = {
+            "engine": engine,
+            "engine_version": engine_version(engine),
+            "model": model_path,
+            "mode": "cold_start",
+            "engine_kwargs": parse_engine_args(args.engine_arg),
+            "host": host_info(),
+            "caches": caches,
+            "trials": args.trials,
+        }
+        with open_result_writer(args.output, COLD_START_FIELDS, run_meta) as writer:
+            for trial in range(args.trials):
+                # Alternate states within a trial so drift (thermal, background I/O) hits both equally.
+                for cache in caches:
+                    row = run_trial((engine, model_path, args.engine_arg), cache, trial, files, args.timeout_s,
+                                    args.drop_caches)
+                    print(f"{engine} {cache} #{trial}: {row['status']}, time to first servable request "
+                          f"{row.get('time_to_first_servable_s', float('nan')):.2f}s")
+                    writer.write(row)
+                    rows.append(row)
+    print_summary(rows)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,797 @@
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Iterator, Optional
+
+from memory import get_gpu_memory_mb, get_process_memory_mb
+
+WARMUP_PROMPT = "Warmup prompt to initialize the system."
+
+# vLLM V1 Prometheus counters behind VLLMAdapter.speculation_stats().
+SPEC_DECODE_METRICS = {
+    "vllm:spec_decode_num_drafts": "draft_steps",
+    "vllm:spec_decode_num_draft_tokens": "draft_tokens",
+    "vllm:spec_decode_num_accepted_tokens": "accepted_tokens",
+}
+
+
+@dataclass
+class SamplingConfig:
+    max_tokens: int = 256
+    temperature: float = 0.3
+    top_p: float = 0.5
+    repetition_penalty: float = 1.1
+    seed: Optional[int] = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class Generation:
+    text: str
+    output_token_count: int
+    prompt_token_count: Optional[int] = None
+    latency_s: Optional[float] = None
+    ttft_s: Optional[float] = None
+    # Prompt tokens the engine reports serving from its prefix cache; None when it does not say.
+    cached_tokens: Optional[int] = None
+    # Served by the response cache without reaching the engine.
+    cache_hit: bool = False
+
+
+@dataclass
+class StreamChunk:
+    text: str
+    num_tokens: int = 1
+    cached_tokens: Optional[int] = None
+    cache_hit: bool = False
+
+
+def hf_login():
+    token = os.environ.get("HF_TOKEN")
+    if token:
+        from huggingface_hub import login
+        login(token=token)
+
+
+class EngineAdapter:
+    """Uniform surface the benchmark core drives; one subclass per engine.
+
+    Engine packages live in separate virtualenvs (see the *_requirements.txt
+    files), so each adapter imports its engine inside load().
+
+    stop_condition, when set, is a callable(output_token_ids) -> bool that
+    adapters with supports_stop_condition check after every token, stopping
+    the sequence inside the engine (see repetition.token_stop_condition).
+    Others ignore it, and callers cut the stream themselves.
+
+    Adapters with accepts_token_ids take a list of token ids wherever a prompt
+    string is accepted, so pre-tokenized prompts skip the engine's tokenizer.
+    templated_prompts is set when prompt strings already carry the model's
+    chat template, so engines that template text themselves must not do it again.
+    Only thread_safe adapters may be driven from several threads at once.
+    """
+
+    name = "base"
+    default_engine_kwargs = {}
+    stop_condition = None
+    supports_stop_condition = False
+    accepts_token_ids = False
+    templated_prompts = False
+    thread_safe = False
+
+    def __init__(self, model_path: str, streaming: bool = False, **engine_kwargs):
+        self.model_path = model_path
+        self.streaming = streaming
+        self.engine_kwargs = {**self.default_engine_kwargs, **engine_kwargs}
+
+    def load(self):
+        raise NotImplementedError
+
+    def warmup(self, params: SamplingConfig):
+        self.generate(WARMUP_PROMPT, params)
+
+    def generate(self, prompt: str, params: SamplingConfig) -> Generation:
+        raise NotImplementedError
+
+    def generate_batch(self, prompts, params: SamplingConfig):
+        # Engines without a batched entry point run the batch sequentially.
+        return [self.generate(prompt, params) for prompt in prompts]
+
+    def stream(self, prompt: str, params: SamplingConfig) -> Iterator[StreamChunk]:
+        # Engines without a native streaming API yield the completion as one chunk.
+        gen = self.generate(prompt, params)
+        yield StreamChunk(gen.text, gen.output_token_count)
+
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def speculation_stats(self) -> Optional[dict]:
+        """Cumulative speculative decoding counters (draft_steps, draft_tokens, accepted_tokens), or None.
+
+        accepted_tokens is None when the engine does not report it.
+        """
+        return None
+
+    def memory_report(self) -> dict:
+        return {
+            "cpu_mem_mb": get_process_memory_mb(),
+            "gpu_mem_mb": get_gpu_memory_mb(),
+        }
+
+    def close(self):
+        pass
+
+
+class VLLMAdapter(EngineAdapter):
+    name = "vllm"
+    accepts_token_ids = True
+    default_engine_kwargs = {
+        "dtype": "auto",
+        "gpu_memory_utilization": 0.25,
+        "enable_chunked_prefill": True,
+    }
+
+    def _import_engine(self):
+        from vllm import LLM, SamplingParams
+        return LLM, SamplingParams
+
+    def _import_async_engine(self):
+        from vllm import AsyncEngineArgs, AsyncLLMEngine
+        return AsyncLLMEngine, AsyncEngineArgs
+
+    def load(self):
+        hf_login()
+        LLM, self._sampling_params_cls = self._import_engine()
+        if self.streaming:
+            self._load_async_engine()
+        else:
+            self.llm = LLM(model=self.model_path, **self.engine_kwargs)
+
+    def _load_async_engine(self):
+        # The async engine needs a running event loop; keep one on a daemon thread so
+        # the synchronous harness can consume token streams.
+        AsyncEngine, AsyncEngineArgs = self._import_async_engine()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+        async def build():
+            return AsyncEngine.from_engine_args(AsyncEngineArgs(model=self.model_path, **self.engine_kwargs))
+
+        self.async_engine = asyncio.run_coroutine_threadsafe(build(), self._loop).result()
+
+    def _uses_v1(self):
+        try:
+            import vllm.envs as envs
+        except ImportError:
+            return True
+        # V0 is gone from recent releases, which no longer define the switch.
+        return bool(getattr(envs, "VLLM_USE_V1", True))
+
+    @property
+    def thread_safe(self):
+        # The async engine takes requests from any thread through its event loop; the offline LLM does not.
+        return self.streaming
+
+    @property
+    def supports_stop_condition(self):
+        # Per-request logits processors exist in the V0 engine's offline path only; V1 rejects them.
+        return not self.streaming and not self._uses_v1()
+
+    def _sampling_params(self, params):
+        kwargs = {}
+        if self.stop_condition is not None and self.supports_stop_condition:
+            kwargs["logits_processors"] = [self._stop_processor()]
+        return self._sampling_params_cls(
+            max_tokens=params.max_tokens,
+            temperature=params.temperature,
+            top_p=params.top_p,
+            repetition_penalty=params.repetition_penalty,
+            seed=params.seed,
+            **kwargs,
+        )
+
+    def _stop_processor(self):
+        eos_token_id = self._tokenizer().eos_token_id
+        stop_condition = self.stop_condition
+
+        def force_eos(token_ids, logits):
+            if token_ids and stop_condition(token_ids):
+                logits.fill_(float("-inf"))
+                logits[eos_token_id] = 0.0
+            return logits
+        return force_eos
+
+    @staticmethod
+    def _engine_prompt(prompt):
+        return {"prompt_token_ids": prompt} if isinstance(prompt, list) else prompt
+
+    def _to_generation(self, resp):
+        latency_s = None
+        ttft_s = None
+        metrics = getattr(resp, "metrics", None)
+        if metrics is not None and metrics.finished_time is not None:
+            latency_s = metrics.finished_time - metrics.arrival_time
+        if metrics is not None and metrics.first_token_time is not None:
+            ttft_s = metrics.first_token_time - metrics.arrival_time
+        return Generation(
+            text=resp.outputs[0].text,
+            output_token_count=len(resp.outputs[0].token_ids),
+            prompt_token_count=len(resp.prompt_token_ids),
+            latency_s=latency_s,
+            ttft_s=ttft_s,
+            cached_tokens=getattr(resp, "num_cached_tokens", None),
+        )
+
+    def generate(self, prompt, params):
+        if self.streaming:
+            chunks = list(self.stream(prompt, params))
+            return Generation(
+                text="".join(chunk.text for chunk in chunks),
+                output_token_count=sum(chunk.num_tokens for chunk in chunks),
+                cached_tokens=chunks[-1].cached_tokens if chunks else None,
+            )
+        return self.generate_batch([prompt], params)[0]
+
+    def stream(self, prompt, params):
+        chunks = queue.Queue()
+        done = object()
+
+        async def consume():
+            emitted_text = 0
+            emitted_tokens = 0
+            try:
+                request_id = uuid.uuid4().hex
+                async for out in self.async_engine.generate(
+                    self._engine_prompt(prompt), self._sampling_params(params), request_id
+                ):
+                    completion = out.outputs[0]
+                    chunks.put(StreamChunk(
+                        completion.text[emitted_text:],
+                        len(completion.token_ids) - emitted_tokens,
+                        # Reported by vLLM since 0.6.4 (V0 and V1); older versions and Aphrodite may lack it.
+                        getattr(out, "num_cached_tokens", None),
+                    ))
+                    emitted_text = len(completion.text)
+                    emitted_tokens = len(completion.token_ids)
+            finally:
+                chunks.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(consume(), self._loop)
+        try:
+            while (chunk := chunks.get()) is not done:
+                yield chunk
+        except GeneratorExit:
+            # Closing the stream early cancels the consumer, which aborts the request in the engine.
+            future.cancel()
+            raise
+        future.result()
+
+    def generate_batch(self, prompts, params):
+        if self.streaming:
+            return [self.generate(prompt, params) for prompt in prompts]
+        # One call lets the scheduler apply continuous batching and chunked prefill.
+        responses = self.llm.generate(
+            [self._engine_prompt(prompt) for prompt in prompts], self._sampling_params(params), use_tqdm=False
+        )
+        return [self._to_generation(resp) for resp in responses]
+
+    def _tokenizer(self):
+        if self.streaming:
+            return asyncio.run_coroutine_threadsafe(self.async_engine.get_tokenizer(), self._loop).result()
+        return self.llm.get_tokenizer()
+
+    def count_tokens(self, text):
+        return len(self._tokenizer().encode(text, add_special_tokens=False))
+
+    def speculation_stats(self):
+        # Needs disable_log_stats=False; the V0 engine and Aphrodite only log acceptance.
+        if self.streaming or not hasattr(self.llm, "get_metrics"):
+            return None
+        stats = {}
+        for metric in self.llm.get_metrics():
+            key = SPEC_DECODE_METRICS.get(metric.name)
+            if key is not None:
+                stats[key] = stats.get(key, 0) + metric.value
+        return stats or None
+
+    def close(self):
+        if self.streaming:
+            self.async_engine.shutdown_background_loop()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            del self.async_engine
+        else:
+            del self.llm
+
+
+class AphroditeAdapter(VLLMAdapter):
+    name = "aphrodite"
+
+    def _uses_v1(self):
+        # Aphrodite is built on the V0 engine.
+        return False
+
+    def _import_engine(self):
+        from aphrodite import LLM, SamplingParams
+        return LLM, SamplingParams
+
+    def _import_async_engine(self):
+        from aphrodite.engine.args_tools import AsyncEngineArgs
+        from aphrodite.engine.async_aphrodite import AsyncAphrodite
+        return AsyncAphrodite, AsyncEngineArgs
+
+
+class GGUFDraftModel:
+    """Greedy drafts from a smaller GGUF model (e.g. Gemma 1B for 4B) for Llama's draft_model hook.
+
+    Llama.generate reuses the longest matching prefix of the draft's context,
+    so each call only evaluates the tokens accepted since the last one.
+    """
+
+    def __init__(self, llm, num_pred_tokens):
+        self.llm = llm
+        self.num_pred_tokens = num_pred_tokens
+
+    def __call__(self, input_ids, **kwargs):
+        import numpy as np
+        proposed = []
+        for token in self.llm.generate(input_ids.tolist(), top_k=1, temp=0.0):
+            proposed.append(token)
+            if len(proposed) >= self.num_pred_tokens:
+                break
+        return np.array(proposed, dtype=np.intc)
+
+
+class CountingDraftModel:
+    """Counts what a llama-cpp-python draft model proposes.
+
+    Llama calls the draft once per target forward pass but does not report how
+    many drafted tokens it accepted; each pass emits its accepted tokens plus
+    one of its own, so acceptance follows from the output length.
+    """
+
+    def __init__(self, draft):
+        self.draft = draft
+        self.steps = 0
+        self.tokens = 0
+
+    def __call__(self, input_ids, **kwargs):
+        proposed = self.draft(input_ids, **kwargs)
+        self.steps += 1
+        self.tokens += len(proposed)
+        return proposed
+
+
+class LlamaCppAdapter(EngineAdapter):
+    """llama-cpp-python adapter.
+
+    prefix_cache_bytes is ours, not Llama's: a positive value attaches a
+    LlamaRAMCache of that size, which saves the KV state after each request and
+    restores the longest matching prefix; 0 resets the context before every
+    request so not even the previous prompt's tokens are reused. None keeps the
+    library default (reuse of the previous prompt only).
+
+    draft_model_path (a smaller GGUF) or prompt_lookup=True turn on speculative
+    decoding with draft_tokens proposed per step; both are ours too.
+    """
+
+    name = "llama_cpp"
+    supports_stop_condition = True
+    accepts_token_ids = True
+    # Llama() defaults to a 512-token context, shorter than the long dataset prompts plus max_tokens.
+    default_engine_kwargs = {"n_ctx": 4096}
+
+    def load(self):
+        from llama_cpp import Llama, LlamaRAMCache
+        kwargs = dict(self.engine_kwargs)
+        self._prefix_cache_bytes = kwargs.pop("prefix_cache_bytes", None)
+        draft_model_path = kwargs.pop("draft_model_path", None)
+        prompt_lookup = kwargs.pop("prompt_lookup", False)
+        draft_tokens = kwargs.pop("draft_tokens", 5)
+        self._draft = None
+        if draft_model_path:
+            # The draft shares the target's context size and placement so it can follow any prompt.
+            draft_kwargs = {key: kwargs[key] for key in ("n_ctx", "n_threads", "n_gpu_layers") if key in kwargs}
+            draft_llm = Llama(model_path=draft_model_path, verbose=False, **draft_kwargs)
+            self._draft = CountingDraftModel(GGUFDraftModel(draft_llm, draft_tokens))
+        elif prompt_lookup:
+            from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+            self._draft = CountingDraftModel(LlamaPromptLookupDecoding(num_pred_tokens=draft_tokens))
+        if self._draft is not None:
+            kwargs["draft_model"] = self._draft
+        self.llm = Llama(model_path=self.model_path, **kwargs)
+        if self._prefix_cache_bytes:
+            self.llm.set_cache(LlamaRAMCache(capacity_bytes=self._prefix_cache_bytes))
+
+    def _reset_if_uncached(self):
+        if self._prefix_cache_bytes == 0:
+            self.llm.reset()
+
+    def warmup(self, params):
+        self.llm(WARMUP_PROMPT, max_tokens=16)
+
+    def _call_kwargs(self, params, prompt):
+        kwargs = {
+            "max_tokens": params.max_tokens,
+            "temperature": params.temperature,
+            "top_p": params.top_p,
+            "repeat_penalty": params.repetition_penalty,
+            "echo": False,
+        }
+        if params.seed is not None:
+            kwargs["seed"] = params.seed
+        if self.stop_condition is not None:
+            from llama_cpp import StoppingCriteriaList
+            # input_ids holds the prompt too; only the generated tail is checked.
+            if isinstance(prompt, list):
+                prompt_tokens = len(prompt)
+            else:
+                prompt_tokens = len(self.llm.tokenize(prompt.encode("utf-8")))
+            stop_condition = self.stop_condition
+            kwargs["stopping_criteria"] = StoppingCriteriaList([
+                lambda input_ids, logits: stop_condition(input_ids[prompt_tokens:].tolist())
+            ])
+        return kwargs
+
+    def generate(self, prompt, params):
+        self._reset_if_uncached()
+        output = self.llm(prompt, **self._call_kwargs(params, prompt))
+        usage = output["usage"]
+        return Generation(
+            text=output["choices"][0]["text"],
+            output_token_count=usage["completion_tokens"],
+            prompt_token_count=usage["prompt_tokens"],
+        )
+
+    def stream(self, prompt, params):
+        # llama.cpp emits one chunk per sampled token.
+        self._reset_if_uncached()
+        for chunk in self.llm(prompt, stream=True, **self._call_kwargs(params, prompt)):
+            yield StreamChunk(chunk["choices"][0]["text"])
+
+    def count_tokens(self, text):
+        return len(self.llm.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def speculation_stats(self):
+        if self._draft is None:
+            return None
+        return {"draft_steps": self._draft.steps, "draft_tokens": self._draft.tokens, "accepted_tokens": None}
+
+    def close(self):
+        self.llm.close()
+
+
+class LMDeployAdapter(EngineAdapter):
+    """LMDeploy TurboMind pipeline adapter.
+
+    The pipeline only takes text and applies the model's chat template to it;
+    with templated_prompts that step is skipped (do_preprocess=False) so
+    pre-rendered prompts are not wrapped twice.
+    """
+
+    name = "lmdeploy"
+    default_engine_kwargs = {"cache_max_entry_count": 0.2}
+
+    def load(self):
+        from lmdeploy import pipeline, TurbomindEngineConfig, GenerationConfig
+        hf_login()
+        self._generation_config_cls = GenerationConfig
+        backend_config = TurbomindEngineConfig(**self.engine_kwargs)
+        self.pipe = pipeline(self.model_path, backend_config=backend_config)
+
+    def _gen_config(self, params):
+        return self._generation_config_cls(
+            max_new_tokens=params.max_tokens,
+            temperature=params.temperature,
+            top_p=params.top_p,
+            repetition_penalty=params.repetition_penalty,
+            random_seed=params.seed,
+        )
+
+    def generate(self, prompt, params):
+        return self.generate_batch([prompt], params)[0]
+
+    def generate_batch(self, prompts, params):
+        # stream_infer interleaves the whole batch's responses tagged with their prompt
+        # index, which gives each request its own first-token and finish time.
+        texts = [[] for _ in prompts]
+        output_tokens = [0] * len(prompts)
+        prompt_tokens = [None] * len(prompts)
+        first_token_ns = [None] * len(prompts)
+        finish_ns = [None] * len(prompts)
+
+        start_ns = time.perf_counter_ns()
+        for resp in self.pipe.stream_infer(prompts, gen_config=self._gen_config(params),
+                                           do_preprocess=not self.templated_prompts):
+            now_ns = time.perf_counter_ns()
+            i = resp.index
+            texts[i].append(resp.text)
+            if first_token_ns[i] is None and resp.generate_token_len > 0:
+                first_token_ns[i] = now_ns
+            output_tokens[i] = resp.generate_token_len
+            prompt_tokens[i] = resp.input_token_len
+            finish_ns[i] = now_ns
+
+        return [
+            Generation(
+                text="".join(texts[i]),
+                output_token_count=output_tokens[i],
+                prompt_token_count=prompt_tokens[i],
+                latency_s=(finish_ns[i] - start_ns) / 1e9 if finish_ns[i] is not None else None,
+                ttft_s=(first_token_ns[i] - start_ns) / 1e9 if first_token_ns[i] is not None else None,
+            )
+            for i in range(len(prompts))
+        ]
+
+    def stream(self, prompt, params):
+        emitted_tokens = 0
+        for resp in self.pipe.stream_infer([prompt], gen_config=self._gen_config(params),
+                                           do_preprocess=not self.templated_prompts):
+            yield StreamChunk(resp.text, resp.generate_token_len - emitted_tokens)
+            emitted_tokens = resp.generate_token_len
+
+    def count_tokens(self, text):
+        return len(self.pipe.tokenizer.encode(text, add_bos=False))
+
+    def close(self):
+        self.pipe.close()
+
+
+class SGLangAdapter(EngineAdapter):
+    name = "sglang"
+    accepts_token_ids = True
+    default_engine_kwargs = {
+        "max_running_requests": 8,
+        "max_total_tokens": 2048,
+        "trust_remote_code": True,
+        "mem_fraction_static": 0.25,
+    }
+
+    def load(self):
+        import sglang
+        self.engine = sglang.Engine(model_path=self.model_path, **self.engine_kwargs)
+
+    def _sampling_params(self, params):
+        return {
+            "max_new_tokens": params.max_tokens,
+            "temperature": params.temperature,
+            "top_p": params.top_p,
+            "repetition_penalty": params.repetition_penalty,
+        }
+
+    def _to_generation(self, resp):
+        meta = resp["meta_info"]
+        return Generation(
+            text=resp["text"],
+            output_token_count=meta["completion_tokens"],
+            prompt_token_count=meta["prompt_tokens"],
+            cached_tokens=meta.get("cached_tokens"),
+        )
+
+    @staticmethod
+    def _prompt_kwargs(prompts):
+        # Token ids go through input_ids instead of the text prompt argument.
+        if isinstance(prompts, list) and prompts and isinstance(prompts[0], (int, list)):
+            return {"input_ids": prompts}
+        return {"prompt": prompts}
+
+    def generate(self, prompt, params):
+        return self._to_generation(
+            self.engine.generate(sampling_params=self._sampling_params(params), **self._prompt_kwargs(prompt))
+        )
+
+    def generate_batch(self, prompts, params):
+        responses = self.engine.generate(sampling_params=self._sampling_params(params), **self._prompt_kwargs(prompts))
+        return [self._to_generation(resp) for resp in responses]
+
+    def stream(self, prompt, params):
+        emitted_text = 0
+        emitted_tokens = 0
+        for chunk in self.engine.generate(sampling_params=self._sampling_params(params), stream=True,
+                                          **self._prompt_kwargs(prompt)):
+            text = chunk["text"]
+            meta = chunk["meta_info"]
+            completion_tokens = meta["completion_tokens"]
+            yield StreamChunk(text[emitted_text:], completion_tokens - emitted_tokens, meta.get("cached_tokens"))
+            emitted_text = len(text)
+            emitted_tokens = completion_tokens
+
+    def close(self):
+        self.engine.shutdown()
+
+
+class MIIAdapter(EngineAdapter):
+    """DeepSpeed-MII pipeline adapter.
+
+    The pipeline takes text only and applies no chat template, so pre-rendered
+    prompts arrive as prompt_prep's BOS-less text and MII's tokenizer adds BOS.
+    """
+
+    name = "mii"
+
+    def load(self):
+        import mii
+        self.pipe = mii.pipeline(self.model_path, **self.engine_kwargs)
+
+    def generate(self, prompt, params):
+        return self.generate_batch([prompt], params)[0]
+
+    def generate_batch(self, prompts, params):
+        responses = self.pipe(
+            prompts,
+            max_new_tokens=params.max_tokens,
+            temperature=params.temperature,
+            top_p=params.top_p,
+        )
+        return [
+            Generation(
+                text=resp.generated_text,
+                output_token_count=resp.generated_length,
+                prompt_token_count=resp.prompt_length,
+            )
+            for resp in responses
+        ]
+
+    def count_tokens(self, text):
+        return len(self.pipe.tokenizer.encode(text))
+
+    def close(self):
+        self.pipe.destroy()
+
+
+class FakeAdapter(EngineAdapter):
+    """In-process engine with configurable latency for GPU-free runs of the harness."""
+
+    name = "fake"
+    supports_stop_condition = True
+    # Stands in for the continuous-batching engines when exercising concurrent harness paths.
+    thread_safe = True
+    accepts_token_ids = True
+    default_engine_kwargs = {
+        "load_s": 0.0,
+        "prefill_ms_per_token": 0.05,
+        "decode_ms_per_token": 2.0,
+        "output_tokens": None,
+        "enable_prefix_caching": False,
+        # The first cold_requests run cold_slowdown times slower, like kernels compiling on first use.
+        "cold_requests": 0,
+        "cold_slowdown": 3.0,
+        # After loop_after tokens the output repeats one word, like a degenerate generation.
+        "loop_after": None,
+        # Speculative decoding: each step drafts draft_tokens, accepting each with draft_acceptance.
+        "draft_tokens": 0,
+        "draft_acceptance": 0.6,
+        "draft_ms_per_token": 0.0,
+    }
+
+    def load(self):
+        time.sleep(self.engine_kwargs["load_s"])
+        self._seen_prompts = []
+        self._requests = 0
+        self._cached_tokens = 0
+        self._speculation = {"draft_steps": 0, "draft_tokens": 0, "accepted_tokens": 0}
+
+    def speculation_stats(self):
+        return dict(self._speculation) if self.engine_kwargs["draft_tokens"] else None
+
+    def _speculate(self, rng, remaining):
+        """Tokens one decode step emits: the accepted draft prefix plus the target's own token."""
+        draft_tokens = self.engine_kwargs["draft_tokens"]
+        if not draft_tokens:
+            return 1
+        accepted = 0
+        while accepted < draft_tokens and rng.random() < self.engine_kwargs["draft_acceptance"]:
+            accepted += 1
+        accepted = min(accepted, remaining - 1)
+        self._speculation["draft_steps"] += 1
+        self._speculation["draft_tokens"] += draft_tokens
+        self._speculation["accepted_tokens"] += accepted
+        return accepted + 1
+
+    def count_tokens(self, prompt):
+        return len(prompt) if isinstance(prompt, list) else len(prompt.split())
+
+    def _uncached_tokens(self, prompt):
+        words = list(prompt) if isinstance(prompt, list) else prompt.split()
+        self._cached_tokens = 0
+        if not self.engine_kwargs["enable_prefix_caching"]:
+            return len(words)
+        shared = 0
+        for seen in self._seen_prompts:
+            n = 0
+            for a, b in zip(words, seen):
+                if a != b:
+                    break
+                n += 1
+            shared = max(shared, n)
+        self._seen_prompts.append(words)
+        self._cached_tokens = shared
+        return len(words) - shared
+
+    def _output_tokens(self, params):
+        output_tokens = self.engine_kwargs["output_tokens"]
+        if output_tokens is None:
+            return params.max_tokens
+        return min(output_tokens, params.max_tokens)
+
+    def _tokens(self, prompt, params, timed=True):
+        """Yield one request's tokens; untimed, the caller accounts for prefill and decode time itself."""
+        sleep = time.sleep if timed else (lambda seconds: None)
+        self._requests += 1
+        slowdown = self.engine_kwargs["cold_slowdown"] if self._requests <= self.engine_kwargs["cold_requests"] else 1.0
+        sleep(self._uncached_tokens(prompt) * self.engine_kwargs["prefill_ms_per_token"] * slowdown / 1000)
+        loop_after = self.engine_kwargs["loop_after"]
+        step_ms = self.engine_kwargs["decode_ms_per_token"] + (
+            self.engine_kwargs["draft_tokens"] * self.engine_kwargs["draft_ms_per_token"]
+        )
+        rng = random.Random(self._requests)
+        output_tokens = self._output_tokens(params)
+        token_ids = []
+        step_tokens = 0
+        for i in range(output_tokens):
+            if step_tokens == 0:
+                step_tokens = self._speculate(rng, output_tokens - i)
+                sleep(step_ms * slowdown / 1000)
+            step_tokens -= 1
+            token_id = 0 if loop_after is not None and i >= loop_after else i + 1
+            token_ids.append(token_id)
+            yield f"tok{i} " if token_id else "and, "
+            if self.stop_condition is not None and self.stop_condition(token_ids):
+                return
+
+    def generate(self, prompt, params):
+        tokens = list(self._tokens(prompt, params))
+        return Generation(
+            text="".join(tokens),
+            output_token_count=len(tokens),
+            prompt_token_count=self.count_tokens(prompt),
+            cached_tokens=self._cached_tokens,
+        )
+
+    def generate_batch(self, prompts, params):
+        # Models continuous batching: prefill is paid per prompt, decode steps are shared.
+        # Each member runs the same token path as generate, so loops and stop_condition behave alike.
+        prompt_tokens = sum(self.count_tokens(prompt) for prompt in prompts)
+        time.sleep(prompt_tokens * self.engine_kwargs["prefill_ms_per_token"] / 1000)
+        outputs = [list(self._tokens(prompt, params, timed=False)) for prompt in prompts]
+        # The batch decodes until its longest member finishes.
+        steps = max((len(tokens) for tokens in outputs), default=0)
+        time.sleep(steps * self.engine_kwargs["decode_ms_per_token"] / 1000)
+        return [
+            Generation(
+                text="".join(tokens),
+                output_token_count=len(tokens),
+                prompt_token_count=self.count_tokens(prompt),
+            )
+            for prompt, tokens in zip(prompts, outputs)
+        ]
+
+    def stream(self, prompt, params):
+        for token in self._tokens(prompt, params):
+            yield StreamChunk(token, cached_tokens=self._cached_tokens)
+
+
+ENGINES = {
+    adapter.name: adapter
+    for adapter in (
+        VLLMAdapter,
+        AphroditeAdapter,
+        LlamaCppAdapter,
+        LMDeployAdapter,
+        SGLangAdapter,
+        MIIAdapter,
+        FakeAdapter,
+    )
+}
+
+
+def get_engine(name: str, model_path: str, **engine_kwargs) -> EngineAdapter:
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine {name!r}; choose from {sorted(ENGINES)}")
+    return ENGINES[name](model_path, **engine_kwargs)
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import socket
+
+import psutil
+
+from engines import LlamaCppAdapter
+from metrics import percentile
+from results import load_results, load_runs
+from sweep import config_id_of, expand_configs, run_sweep
+
+TUNED_CONFIGS_PATH = "llama_cpp_tuning.json"
+
+# GGML type ids accepted by Llama(type_k=..., type_v=...). llama.cpp only supports a
+# quantized V cache with flash attention, so those options turn it on.
+KV_CACHE_TYPES = {
+    "f16": {"type_k": 1, "type_v": 1},
+    "q8_0": {"type_k": 8, "type_v": 8, "flash_attn": True},
+    "q4_0": {"type_k": 2, "type_v": 2, "flash_attn": True},
+}
+
+# Higher is better unless listed here.
+LOWER_IS_BETTER = {"e2e_latency_s", "ttft_ms"}
+
+
+def thread_counts():
+    physical = psutil.cpu_count(logical=False) or 1
+    logical = psutil.cpu_count(logical=True) or physical
+    return sorted({max(1, physical // 4), max(1, physical // 2), physical, logical})
+
+
+def tuning_stages():
+    """Each stage varies one group of knobs with the others held at the best found so far."""
+    threads = thread_counts()
+    return [
+        ("n_threads", [{"n_threads": n, "n_threads_batch": n} for n in threads]),
+        ("n_threads_batch", [{"n_threads_batch": n} for n in threads]),
+        ("n_batch", [{"n_batch": n, "n_ubatch": min(n, 512)} for n in (128, 256, 512, 1024)]),
+        ("n_ubatch", [{"n_ubatch": n} for n in (64, 128, 256, 512)]),
+        ("n_ctx", [{"n_ctx": n} for n in (1024, 2048, 4096)]),
+        ("memory_mapping", [
+            {"use_mmap": True, "use_mlock": False},
+            {"use_mmap": True, "use_mlock": True},
+            {"use_mmap": False, "use_mlock": False},
+        ]),
+        ("flash_attn", [{"flash_attn": False}, {"flash_attn": True}]),
+        ("kv_cache_type", [dict(options, kv_cache_type=name) for name, options in KV_CACHE_TYPES.items()]),
+    ]
+
+
+def _engine_args(options):
+    # kv_cache_type is only a label for the report; Llama() takes type_k/type_v.
+    return {key: value for key, value in options.items() if key != "kv_cache_type"}
+
+
+def score_configs(store_path, config_ids, objective):
+    scores = {}
+    wanted = set(config_ids)
+    for run in load_runs(store_path):
+        if run["config_id"] not in wanted or run["status"] != "complete":
+            continue
+        values = [row[objective] for row in load_results(store_path, run["run_id"]) if row.get(objective) is not None]
+        if values:
+            # Later runs of the same config overwrite earlier ones.
+            scores[run["config_id"]] = percentile(values, 50)
+    return scores
+
+
+def tune(spec, store_path, objective="decode_tokens_per_sec", timeout_s=1800, cooldown_s=2.0):
+    # Start from the adapter's context size so the early stages can fit the long prompts.
+    best = {"verbose": False, **LlamaCppAdapter.default_engine_kwargs}
+    history = []
+    lower_is_better = objective in LOWER_IS_BETTER
+    for stage, options in tuning_stages():
+        candidates = [{**best, **_engine_args(option)} for option in options]
+        stage_spec = {**spec, "configs": [{"engine_args": args} for args in candidates]}
+        print(f"Stage {stage}: {len(candidates)} candidates")
+        run_sweep(stage_spec, store_path, timeout_s=timeout_s, resume=True, cooldown_s=cooldown_s)
+
+        config_ids = [config_id_of(config) for config in expand_configs(stage_spec)]
+        scores = score_configs(store_path, config_ids, objective)
+        scored = [(scores[config_id], option, args) for config_id, option, args in zip(config_ids, options, candidates)
+                  if config_id in scores]
+        if not scored:
+            print(f"  no candidate of stage {stage} completed; keeping {best}")
+            continue
+        score, option, best = (min if lower_is_better else max)(scored, key=lambda item: item[0])
+        history.append({"stage": stage, "choice": option, objective: score,
+                        "candidates": [{"option": o, objective: s} for s, o, _ in scored]})
+        print(f"  best {stage}: {option} ({objective} p50 {score:.2f})")
+    return best, history
+
+
+def host_key():
+    return f"{socket.gethostname()}|{psutil.cpu_count(logical=False)}c/{psutil.cpu_count(logical=True)}t"
+
+
+def save_tuned_config(path, model, engine_args, objective, history):
+    tuned = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f_in:
+            tuned = json.load(f_in)
+    tuned.setdefault(host_key(), {})[os.path.basename(model)] = {
+        "engine_args": engine_args,
+        "objective": objective,
+        "stages": history,
+    }
+    with open(path, "w", encoding="utf-8") as f_out:
+        json.dump(tuned, f_out, indent=2)
+
+
+def load_tuned_config(model, path=TUNED_CONFIGS_PATH):
+    """Best llama.cpp engine args recorded for this host and model, or {} if never tuned here."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f_in:
+        tuned = json.load(f_in)
+    return tuned.get(host_key(), {}).get(os.path.basename(model), {}).get("engine_args", {})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune llama.cpp CPU settings for this host, one knob group at a time.")
+    parser.add_argument("--model", required=True, help="GGUF model path")
+    parser.add_argument("--engine", default="llama_cpp", help=argparse.SUPPRESS)
+    parser.add_argument("--dataset", default="core_v1")
+    parser.add_argument("--sample", type=int, default=8, help="prompts per candidate")
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--objective", default="decode_tokens_per_sec",
+                        choices=["decode_tokens_per_sec", "prefill_tokens_per_sec", "ttft_ms", "e2e_latency_s"])
+    parser.add_argument("--output", default="llama_cpp_tuning.sqlite", help="SQLite store for every candidate run")
+    parser.add_argument("--tuned-configs", default=TUNED_CONFIGS_PATH, help="JSON file of best configs per host")
+    parser.add_argument("--timeout-s", type=float, default=1800)
+    parser.add_argument("--cooldown-s", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    spec = {
+        "sweep_name": "llama_cpp_tuning",
+        "engine": args.engine,
+        "model": args.model,
+        "mode": "stream",
+        "dataset": args.dataset,
+        "sample": args.sample,
+        "base": {"sampling": {"max_tokens": args.max_tokens}},
+    }
+    best, history = tune(spec, args.output, args.objective, args.timeout_s, args.cooldown_s)
+    save_tuned_config(args.tuned_configs, args.model, best, args.objective, history)
+
+    print("-" * 50)
+    print(f"Best llama.cpp configuration for {host_key()}:")
+    for key, value in best.items():
+        print(f"  {key}: {value}")
+    print(f"Saved to {args.tuned_configs}")
+
+
+if __name__ == "__main__":
+    main()
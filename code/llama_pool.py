@@ -0,0 +1,357 @@
+import argparse
+import csv
+import glob
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from engines import SamplingConfig, get_engine
+from metrics import percentile
+from prompt_datasets import add_dataset_arguments, dataset_from_args
+
+LIVENESS_POLL_S = 1.0
+
+POOL_SUMMARY_FIELDS = [
+    "instances",
+    "threads_per_instance",
+    "requests",
+    "failed",
+    "wall_s",
+    "aggregate_tokens_per_sec",
+    "requests_per_sec",
+    "ttft_p50_ms",
+    "ttft_p99_ms",
+    "e2e_p50_s",
+    "e2e_p99_s",
+    "scaling_vs_one_instance",
+]
+
+
+def _parse_cpulist(text):
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        cpus.extend(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+def numa_nodes():
+    """CPU lists of the host's NUMA nodes restricted to our affinity, or [] when not exposed."""
+    allowed = os.sched_getaffinity(0)
+    nodes = []
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")):
+        with open(path) as f_in:
+            cpus = [cpu for cpu in _parse_cpulist(f_in.read()) if cpu in allowed]
+        if cpus:
+            nodes.append(cpus)
+    return nodes
+
+
+def max_instances(per_numa_node=False):
+    """Largest instance count that gets cores of its own: one per NUMA node, or one per allowed CPU."""
+    if per_numa_node:
+        return len(numa_nodes()) or 1
+    return len(os.sched_getaffinity(0))
+
+
+def core_sets(instances, per_numa_node=False):
+    """Split the allowed CPUs into one contiguous set per instance.
+
+    Sets never straddle NUMA nodes when the instance count divides evenly
+    across them, so each worker's threads and KV cache stay node-local.
+    """
+    nodes = numa_nodes() or [sorted(os.sched_getaffinity(0))]
+    if per_numa_node:
+        if instances > len(nodes):
+            print(f"WARNING: {instances} instances on {len(nodes)} NUMA node(s); instances will share cores")
+        return [nodes[i % len(nodes)] for i in range(instances)]
+    available = sum(len(node) for node in nodes)
+    if instances > available:
+        raise ValueError(f"{instances} instances need at least one CPU each; only {available} are available")
+    if instances % len(nodes) != 0:
+        nodes = [sorted(cpu for node in nodes for cpu in node)]
+    per_node = instances // len(nodes)
+    sets = []
+    for node in nodes:
+        size = max(1, len(node) // per_node)
+        for i in range(per_node):
+            sets.append(node[i * size:(i + 1) * size] or node[-1:])
+    return sets
+
+
+def _worker_main(worker_id, cores, engine, model_path, engine_kwargs, requests, results):
+    from benchmark import measure_stream
+
+    os.sched_setaffinity(0, cores)
+    kwargs = dict(engine_kwargs)
+    if engine == "llama_cpp":
+        # Every worker maps the same GGUF file, so the page cache holds one copy of the weights.
+        kwargs.setdefault("use_mmap", True)
+        kwargs.setdefault("n_threads", len(cores))
+        kwargs.setdefault("n_threads_batch", len(cores))
+        kwargs.setdefault("verbose", False)
+    adapter = get_engine(engine, model_path, **kwargs)
+    try:
+        adapter.load()
+        adapter.warmup(SamplingConfig(max_tokens=16))
+    except Exception as exc:
+        results.put(("failed", worker_id, repr(exc)))
+        return
+    results.put(("ready", worker_id, None))
+
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        request_id, prompt, params = item
+        try:
+            result = measure_stream(adapter, prompt, SamplingConfig(**params))
+            result.pop("itls_ms")
+            results.put(("done", request_id, result))
+        except Exception as exc:
+            results.put(("error", request_id, repr(exc)))
+    adapter.close()
+
+
+class LlamaPool:
+    """N single-stream engine processes behind a least-outstanding-tokens router.
+
+    llama.cpp's Llama object serves one request at a time, so concurrency comes
+    from separate processes, each pinned to its own cores. A request's cost is
+    its estimated prompt tokens plus max_tokens; the router sends it to the
+    worker with the least cost still outstanding.
+    """
+
+    def __init__(self, model_path, instances, engine="llama_cpp", per_numa_node=False, **engine_kwargs):
+        self.model_path = model_path
+        self.instances = instances
+        self.engine = engine
+        self.engine_kwargs = engine_kwargs
+        self.cores = core_sets(instances, per_numa_node)
+        threads = sum(engine_kwargs.get("n_threads") or len(cores) for cores in self.cores)
+        available = len(os.sched_getaffinity(0))
+        if threads > available:
+            print(f"WARNING: {instances} instances run {threads} threads on {available} CPUs; "
+                  f"throughput will suffer from oversubscription")
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._queues = []
+        self._processes = []
+        self._outstanding = [0] * instances
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._collector = None
+        self._dead = set()
+        self._stopping = False
+
+    def start(self, timeout_s=600):
+        for worker_id, cores in enumerate(self.cores):
+            requests = self._ctx.Queue()
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, cores, self.engine, self.model_path, self.engine_kwargs, requests, self._results),
+                daemon=True,
+            )
+            process.start()
+            self._queues.append(requests)
+            self._processes.append(process)
+
+        deadline = time.monotonic() + timeout_s
+        ready = 0
+        while ready < self.instances:
+            if time.monotonic() > deadline:
+                self.stop()
+                raise TimeoutError(f"Only {ready}/{self.instances} workers loaded within {timeout_s:.0f}s")
+            try:
+                kind, worker_id, detail = self._results.get(timeout=LIVENESS_POLL_S)
+            except queue.Empty:
+                # A worker that crashes while loading never reports back.
+                for worker_id, process in enumerate(self._processes):
+                    if not process.is_alive():
+                        self.stop()
+                        raise RuntimeError(f"Worker {worker_id} exited with code {process.exitcode} while loading")
+                continue
+            if kind == "failed":
+                self.stop()
+                raise RuntimeError(f"Worker {worker_id} failed to load: {detail}")
+            ready += 1
+
+        self._collector = threading.Thread(target=self._collect, name="pool-collector", daemon=True)
+        self._collector.start()
+        return self
+
+    def _collect(self):
+        while True:
+            try:
+                item = self._results.get(timeout=LIVENESS_POLL_S)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if item is None:
+                return
+            kind, request_id, detail = item
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+                if entry is None:
+                    continue
+                future, worker_id, cost, submitted = entry
+                self._outstanding[worker_id] -= cost
+            if kind == "done":
+                # The worker times from when it picks the request up; count the wait in the pool too.
+                e2e_s = time.perf_counter() - submitted
+                queued_s = max(e2e_s - detail["e2e_latency_s"], 0.0)
+                future.set_result({
+                    **detail,
+                    "ttft_ms": detail["ttft_ms"] + queued_s * 1000,
+                    "e2e_latency_s": e2e_s,
+                    "queued_s": queued_s,
+                    "worker": worker_id,
+                })
+            else:
+                future.set_exception(RuntimeError(detail))
+
+    def _check_workers(self):
+        """Fail the outstanding requests of workers that died so callers do not wait forever."""
+        if self._stopping:
+            return
+        failed = []
+        with self._lock:
+            for worker_id, process in enumerate(self._processes):
+                if worker_id not in self._dead and not process.is_alive():
+                    print(f"WARNING: worker {worker_id} exited with code {process.exitcode}")
+                    self._dead.add(worker_id)
+            for request_id, (future, worker_id, _, _) in list(self._pending.items()):
+                if worker_id in self._dead:
+                    del self._pending[request_id]
+                    failed.append((future, worker_id))
+        for future, worker_id in failed:
+            future.set_exception(RuntimeError(f"worker {worker_id} died before finishing the request"))
+
+    def submit(self, prompt, params) -> Future:
+        cost = int(len(prompt.split()) * 1.3) + params.max_tokens
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            alive = [i for i in range(self.instances) if i not in self._dead]
+            if not alive:
+                raise RuntimeError("every pool worker has died")
+            worker_id = min(alive, key=lambda i: self._outstanding[i])
+            self._outstanding[worker_id] += cost
+            self._pending[request_id] = (future, worker_id, cost, time.perf_counter())
+        self._queues[worker_id].put((request_id, prompt, params.to_dict()))
+        return future
+
+    def stop(self):
+        self._stopping = True
+        for requests in self._queues:
+            requests.put(None)
+        for process in self._processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        if self._collector is not None:
+            self._results.put(None)
+            self._collector.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def run_pool_benchmark(model_path, prompts, params, instance_counts, engine="llama_cpp", per_numa_node=False,
+                       **engine_kwargs):
+    summaries = []
+    # Check every count up front so an oversized one cannot abort the sweep after others were measured.
+    limit = max_instances(per_numa_node)
+    oversized = [count for count in instance_counts if count > limit]
+    if oversized:
+        unit = "NUMA node(s)" if per_numa_node else "CPU(s)"
+        print(f"WARNING: skipping instance counts {oversized}; only {limit} {unit} available")
+    for instances in [count for count in instance_counts if count <= limit]:
+        print(f"Starting {instances} {engine} instance(s)...")
+        with LlamaPool(model_path, instances, engine, per_numa_node, **engine_kwargs) as pool:
+            print("  cores: " + " | ".join(f"{cores[0]}-{cores[-1]}" for cores in pool.cores))
+            start = time.perf_counter()
+            futures = [pool.submit(prompt, params) for prompt in prompts]
+            results, failed = [], 0
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except RuntimeError:
+                    failed += 1
+            wall_s = time.perf_counter() - start
+
+        output_tokens = sum(result["output_token_count"] for result in results)
+        ttfts = [result["ttft_ms"] for result in results]
+        e2es = [result["e2e_latency_s"] for result in results]
+        summary = {
+            "instances": instances,
+            "threads_per_instance": len(pool.cores[0]),
+            "requests": len(prompts),
+            "failed": failed,
+            "wall_s": wall_s,
+            "aggregate_tokens_per_sec": output_tokens / wall_s if wall_s > 0 else 0.0,
+            "requests_per_sec": len(results) / wall_s if wall_s > 0 else 0.0,
+            "ttft_p50_ms": percentile(ttfts, 50),
+            "ttft_p99_ms": percentile(ttfts, 99),
+            "e2e_p50_s": percentile(e2es, 50),
+            "e2e_p99_s": percentile(e2es, 99),
+        }
+        # Throughput in units of the first configuration's per-instance rate.
+        first = summaries[0] if summaries else summary
+        per_instance = first["aggregate_tokens_per_sec"] / first["instances"]
+        summary["scaling_vs_one_instance"] = summary["aggregate_tokens_per_sec"] / per_instance if per_instance else 0.0
+        summaries.append(summary)
+        print(
+            f"  {summary['aggregate_tokens_per_sec']:.2f} aggregate tokens/sec, "
+            f"e2e p99 {summary['e2e_p99_s']:.2f}s, {failed} failed"
+        )
+    return summaries
+
+
+def write_pool_summary(summaries, output_csv_path):
+    with open(output_csv_path, "w", newline="", encoding="utf-8") as f_out:
+        writer = csv.DictWriter(f_out, fieldnames=POOL_SUMMARY_FIELDS, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        for summary in summaries:
+            writer.writerow({
+                key: f"{value:.4f}" if isinstance(value, float) else value
+                for key, value in summary.items()
+            })
+
+
+def main(argv=None):
+    from benchmark import parse_engine_args
+
+    parser = argparse.ArgumentParser(description="Serve a GGUF model from N pinned llama.cpp processes.")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--engine", default="llama_cpp", help=argparse.SUPPRESS)
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE")
+    parser.add_argument("--instances", default="1,2,4", help="comma-separated instance counts to compare")
+    parser.add_argument("--per-numa-node", action="store_true", help="give each instance a whole NUMA node")
+    add_dataset_arguments(parser)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--output", default="llama_pool_results.csv")
+    args = parser.parse_args(argv)
+
+    prompts = [record.prompt for record in dataset_from_args(args)]
+    instance_counts = [int(count) for count in args.instances.split(",") if count]
+    summaries = run_pool_benchmark(
+        args.model, prompts, SamplingConfig(max_tokens=args.max_tokens), instance_counts,
+        args.engine, args.per_numa_node, **parse_engine_args(args.engine_arg),
+    )
+    write_pool_summary(summaries, args.output)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
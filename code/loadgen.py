@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import csv
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark import load_and_report, measure_stream, parse_engine_args
+from client import CompletionClient
+from engines import ENGINES, SamplingConfig, get_engine
+from metrics import percentile
+from prompt_datasets import add_dataset_arguments, dataset_from_args
+
+SUMMARY_FIELDS = [
+    "target",
+    "schedule",
+    "offered_rps",
+    "requests",
+    "completed",
+    "failed",
+    "duration_s",
+    "achieved_rps",
+    "output_tokens_per_sec",
+    "goodput_rps",
+    "queue_delay_p50_ms",
+    "queue_delay_p99_ms",
+    "ttft_p50_ms",
+    "ttft_p99_ms",
+    "e2e_p50_s",
+    "e2e_p99_s",
+]
+
+
+def constant_arrivals(rate, num_requests, seed=0):
+    return [i / rate for i in range(num_requests)]
+
+
+def poisson_arrivals(rate, num_requests, seed=0):
+    rng = random.Random(seed)
+    arrivals = []
+    now = 0.0
+    for _ in range(num_requests):
+        arrivals.append(now)
+        now += rng.expovariate(rate)
+    return arrivals
+
+
+def burst_arrivals(rate, num_requests, seed=0, burst_size=8):
+    # Bursts of burst_size simultaneous requests, spaced to keep the mean rate.
+    return [(i // burst_size) * burst_size / rate for i in range(num_requests)]
+
+
+ARRIVAL_SCHEDULES = {
+    "constant": constant_arrivals,
+    "poisson": poisson_arrivals,
+    "burst": burst_arrivals,
+}
+
+
+def load_trace(path):
+    """Read a JSONL trace of {"timestamp": seconds, "prompt": optional str} records."""
+    with open(path, encoding="utf-8") as f_in:
+        records = [json.loads(line) for line in f_in if line.strip()]
+    start = min(record["timestamp"] for record in records)
+    return [(record["timestamp"] - start, record.get("prompt")) for record in records]
+
+
+class AdapterTarget:
+    """Serves requests in-process; max_concurrency worker threads share the adapter."""
+
+    def __init__(self, adapter, params, max_concurrency=1):
+        if max_concurrency > 1 and not adapter.thread_safe:
+            raise ValueError(f"{adapter.name} serves one request at a time; "
+                             f"run server.py and pass --endpoint for concurrency above 1")
+        self.adapter = adapter
+        self.params = params
+        self.name = adapter.name
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def _serve(self, prompt):
+        service_start_ns = time.perf_counter_ns()
+        result = measure_stream(self.adapter, prompt, self.params)
+        return service_start_ns, result
+
+    async def send(self, prompt):
+        loop = asyncio.get_running_loop()
+        service_start_ns, result = await loop.run_in_executor(self._executor, self._serve, prompt)
+        return {
+            "service_start_ns": service_start_ns,
+            "ttft_s": result["ttft_ms"] / 1000,
+            "output_tokens": result["output_token_count"],
+        }
+
+    async def close(self):
+        self._executor.shutdown()
+
+
+class OpenAITarget:
+    """Streams /v1/completions from an OpenAI-compatible server."""
+
+    def __init__(self, base_url, model, params, max_connections=256):
+        self.params = params
+        self.name = base_url
+        self._client = CompletionClient(base_url, model, max_connections, keep_text=False)
+
+    async def send(self, prompt):
+        result = await self._client.stream_completion(prompt, self.params)
+        if not result["ok"]:
+            raise RuntimeError(result["error"])
+        return {
+            "service_start_ns": result["start_ns"],
+            "ttft_s": ((result["first_token_ns"] or result["end_ns"]) - result["start_ns"]) / 1e9,
+            "output_tokens": result["output_token_count"],
+        }
+
+    async def close(self):
+        await self._client.close()
+
+
+async def _issue(target, prompt, arrival_ns):
+    record = {"arrival_ns": arrival_ns, "ok": False}
+    try:
+        record.update(await target.send(prompt))
+        record["ok"] = True
+    except Exception as exc:
+        record["error"] = repr(exc)
+    record["finish_ns"] = time.perf_counter_ns()
+    return record
+
+
+async def run_load(target, requests):
+    """Fire (offset_s, prompt) requests at their scheduled times, independent of completions."""
+    start_ns = time.perf_counter_ns()
+    tasks = []
+    for offset_s, prompt in requests:
+        delay = start_ns + offset_s * 1e9 - time.perf_counter_ns()
+        if delay > 0:
+            await asyncio.sleep(delay / 1e9)
+        tasks.append(asyncio.create_task(_issue(target, prompt, start_ns + int(offset_s * 1e9))))
+    records = await asyncio.gather(*tasks)
+    return records, (time.perf_counter_ns() - start_ns) / 1e9
+
+
+def summarize(records, duration_s, offered_rps, slo_ttft_ms=None, slo_e2e_s=None):
+    completed = [record for record in records if record["ok"]]
+    queue_delays = [(r["service_start_ns"] - r["arrival_ns"]) / 1e6 for r in completed]
+    ttfts = [(r["service_start_ns"] - r["arrival_ns"]) / 1e6 + r["ttft_s"] * 1000 for r in completed]
+    e2es = [(r["finish_ns"] - r["arrival_ns"]) / 1e9 for r in completed]
+
+    good = 0
+    for ttft_ms, e2e_s in zip(ttfts, e2es):
+        if slo_ttft_ms is not None and ttft_ms > slo_ttft_ms:
+            continue
+        if slo_e2e_s is not None and e2e_s > slo_e2e_s:
+            continue
+        good += 1
+
+    output_tokens = sum(r["output_tokens"] for r in completed)
+    return {
+        "offered_rps": offered_rps,
+        "requests": len(records),
+        "completed": len(completed),
+        "failed": len(records) - len(completed),
+        "duration_s": duration_s,
+        "achieved_rps": len(completed) / duration_s if duration_s > 0 else 0.0,
+        "output_tokens_per_sec": output_tokens / duration_s if duration_s > 0 else 0.0,
+        "goodput_rps": good / duration_s if duration_s > 0 else 0.0,
+        "queue_delay_p50_ms": percentile(queue_delays, 50),
+        "queue_delay_p99_ms": percentile(queue_delays, 99),
+        "ttft_p50_ms": percentile(ttfts, 50),
+        "ttft_p99_ms": percentile(ttfts, 99),
+        "e2e_p50_s": percentile(e2es, 50),
+        "e2e_p99_s": percentile(e2es, 99),
+    }
+
+
+def build_requests(prompts, schedule, rate, num_requests, seed=0, trace_path=None):
+    if schedule == "trace":
+        trace = load_trace(trace_path)
+        return [(offset, prompt or prompts[i % len(prompts)]) for i, (offset, prompt) in enumerate(trace)]
+    arrivals = ARRIVAL_SCHEDULES[schedule](rate, num_requests, seed=seed)
+    return [(offset, prompts[i % len(prompts)]) for i, offset in enumerate(arrivals)]
+
+
+async def sweep(target, prompts, schedule, rates, num_requests, seed=0, trace_path=None,
+                slo_ttft_ms=None, slo_e2e_s=None):
+    summaries = []
+    for rate in rates:
+        requests = build_requests(prompts, schedule, rate, num_requests, seed, trace_path)
+        span = requests[-1][0] if requests else 0.0
+        offered_rps = rate if schedule != "trace" else (len(requests) / span if span > 0 else 0.0)
+        print(f"Offering {offered_rps:.2f} req/s ({schedule}, {len(requests)} requests) to {target.name}...")
+        records, duration_s = await run_load(target, requests)
+        summary = summarize(records, duration_s, offered_rps, slo_ttft_ms, slo_e2e_s)
+        summary.update({"target": target.name, "schedule": schedule})
+        summaries.append(summary)
+        print(
+            f"  achieved {summary['achieved_rps']:.2f} req/s, goodput {summary['goodput_rps']:.2f} req/s, "
+            f"queue p99 {summary['queue_delay_p99_ms']:.1f} ms, TTFT p99 {summary['ttft_p99_ms']:.1f} ms"
+        )
+        if schedule == "trace":
+            break
+    return summaries
+
+
+def write_summary(summaries, output_csv_path):
+    with open(output_csv_path, "w", newline="", encoding="utf-8") as f_out:
+        writer = csv.DictWriter(f_out, fieldnames=SUMMARY_FIELDS, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        for summary in summaries:
+            writer.writerow({
+                key: f"{value:.4f}" if isinstance(value, float) else value
+                for key, value in summary.items()
+            })
+
+
+async def _run(args, prompts, params):
+    if args.endpoint:
+        target = OpenAITarget(args.endpoint, args.model, params)
+    else:
+        adapter = get_engine(args.engine, args.model, streaming=True, **parse_engine_args(args.engine_arg))
+        load_and_report(adapter)
+        adapter.warmup(params)
+        target = AdapterTarget(adapter, params, args.max_concurrency)
+    try:
+        return await sweep(
+            target, prompts, args.schedule, args.rates, args.num_requests, args.seed,
+            args.trace, args.slo_ttft_ms, args.slo_e2e_s,
+        )
+    finally:
+        await target.close()
+        if not args.endpoint:
+            target.adapter.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load generator for engine adapters or OpenAI endpoints.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--engine", choices=sorted(ENGINES))
+    target.add_argument("--endpoint", help="base URL of an OpenAI-compatible server")
+    parser.add_argument("--model", default="fake")
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE")
+    add_dataset_arguments(parser)
+    parser.add_argument("--schedule", choices=sorted(ARRIVAL_SCHEDULES) + ["trace"], default="poisson")
+    parser.add_argument("--trace", default=None, help="JSONL arrival trace for --schedule trace")
+    parser.add_argument("--rates", default="1", help="comma-separated offered loads in requests/sec")
+    parser.add_argument("--num-requests", type=int, default=100)
+    parser.add_argument("--max-concurrency", type=int, default=1,
+                        help="in-process worker threads when driving an engine adapter; above 1 needs an engine "
+                             "that accepts concurrent requests (vLLM, Aphrodite)")
+    parser.add_argument("--slo-ttft-ms", type=float, default=None)
+    parser.add_argument("--slo-e2e-s", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--output", default="loadgen_results.csv")
+    args = parser.parse_args(argv)
+    args.rates = [float(rate) for rate in args.rates.split(",") if rate]
+    if args.schedule == "trace" and not args.trace:
+        parser.error("--schedule trace requires --trace")
+    if args.engine and args.max_concurrency > 1 and not get_engine(args.engine, args.model, streaming=True).thread_safe:
+        parser.error(f"{args.engine} is not safe to share across threads; run server.py and pass --endpoint "
+                     f"for concurrency above 1")
+
+    prompts = [record.prompt for record in dataset_from_args(args)]
+
+    params = SamplingConfig(max_tokens=args.max_tokens)
+    summaries = asyncio.run(_run(args, prompts, params))
+    write_summary(summaries, args.output)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
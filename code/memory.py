@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+
+import psutil
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+MB = 1024 * 1024
+SAMPLE_FIELDS = ["t_s", "phase", "rss_mb", "uss_mb", "pss_mb", "gpu_tree_mb", "gpu_device_mb"]
+
+
+def get_process_memory_mb():
+    process = psutil.Process(os.getpid())
+    return process.memory_info().rss / (1024 * 1024)
+
+
+def get_gpu_memory_mb(device=0):
+    if torch is None or not torch.cuda.is_available():
+        return 0.0
+    torch.cuda.synchronize(device)
+    return torch.cuda.memory_allocated(device) / (1024 * 1024)
+
+
+def _init_nvml():
+    if pynvml is None:
+        return []
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return []
+    return [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+
+
+class MemorySampler:
+    """Samples memory of a process tree on a background thread.
+
+    Engine workers (vLLM/Aphrodite tensor-parallel workers, LMDeploy, SGLang
+    schedulers) run as child processes and allocate outside torch's caching
+    allocator, so RSS/USS/PSS are summed over the whole tree and device memory
+    comes from NVML: gpu_tree_mb is what the tree's processes hold, gpu_device_mb
+    is everything in use on the devices. Without NVML the GPU columns stay empty
+    and RSS sampling still works on CPU-only hosts.
+    """
+
+    def __init__(self, interval_s: float = 0.05, pid=None, full_info: bool = True):
+        self.interval_s = interval_s
+        self.full_info = full_info
+        self.root = psutil.Process(pid or os.getpid())
+        self.samples = []
+        self.phase = "init"
+        self._peaks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._failed_samples = 0
+        self._nvml_handles = _init_nvml()
+        self._nvml_per_process = True
+
+    def _tree(self):
+        try:
+            return [self.root] + self.root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return []
+
+    def _host_memory(self, processes):
+        rss = uss = pss = 0
+        for process in processes:
+            try:
+                if self.full_info:
+                    info = process.memory_full_info()
+                    uss += info.uss
+                    pss += getattr(info, "pss", 0)
+                else:
+                    info = process.memory_info()
+                rss += info.rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if not self.full_info:
+            return rss / MB, None, None
+        return rss / MB, uss / MB, pss / MB
+
+    def _device_memory(self, processes):
+        if not self._nvml_handles:
+            return None, None
+        pids = {process.pid for process in processes}
+        tree = device = 0
+        for handle in self._nvml_handles:
+            device += pynvml.nvmlDeviceGetMemoryInfo(handle).used
+            if not self._nvml_per_process:
+                continue
+            try:
+                running = pynvml.nvmlDeviceGetComputeRunningProcesses(handle)
+            except pynvml.NVMLError as exc:
+                # Some drivers, MIG slices and containers do not expose per-process usage; the device total remains.
+                print(f"WARNING: NVML per-process GPU memory unavailable ({exc}); gpu_tree_mb left empty")
+                self._nvml_per_process = False
+                continue
+            for proc in running:
+                if proc.pid in pids and proc.usedGpuMemory:
+                    tree += proc.usedGpuMemory
+        return (tree / MB if self._nvml_per_process else None), device / MB
+
+    def sample(self):
+        processes = self._tree()
+        rss_mb, uss_mb, pss_mb = self._host_memory(processes)
+        gpu_tree_mb, gpu_device_mb = self._device_memory(processes)
+        with self._lock:
+            sample = {
+                "t_s": time.perf_counter() - self._t0,
+                "phase": self.phase,
+                "rss_mb": rss_mb,
+                "uss_mb": uss_mb,
+                "pss_mb": pss_mb,
+                "gpu_tree_mb": gpu_tree_mb,
+                "gpu_device_mb": gpu_device_mb,
+            }
+            self.samples.append(sample)
+            peaks = self._peaks.setdefault(self.phase, {})
+            for field in SAMPLE_FIELDS[2:]:
+                if sample[field] is not None:
+                    peaks[field] = max(peaks.get(field, 0.0), sample[field])
+        return sample
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            # One failed reading must not end the thread and leave the peaks silently short.
+            try:
+                self.sample()
+            except Exception as exc:
+                self._failed_samples += 1
+                if self._failed_samples == 1:
+                    print(f"WARNING: memory sample failed ({exc!r}); sampling continues")
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def set_phase(self, phase: str):
+        # Close out the previous phase with a sample so short phases are not missed.
+        self.sample()
+        with self._lock:
+            self.phase = phase
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def peak(self, field: str, phase=None) -> float:
+        with self._lock:
+            phases = [phase] if phase else list(self._peaks)
+            return max((self._peaks.get(name, {}).get(field, 0.0) for name in phases), default=0.0)
+
+    def peaks(self):
+        with self._lock:
+            return {phase: dict(values) for phase, values in self._peaks.items()}
+
+    def print_report(self):
+        print("Peak Memory by Phase (MB):")
+        print(f"  {'phase':<10} {'rss':>10} {'uss':>10} {'pss':>10} {'gpu_tree':>10} {'gpu_device':>10}")
+        for phase, values in self.peaks().items():
+            cells = [
+                f"{values[field]:>10.2f}" if field in values else f"{'-':>10}"
+                for field in SAMPLE_FIELDS[2:]
+            ]
+            print(f"  {phase:<10} " + " ".join(cells))
+        if self._failed_samples:
+            print(f"  {self._failed_samples} samples failed; peaks may be understated")
@@ -0,0 +1,238 @@
+import argparse
+import os
+import sys
+import uuid
+
+from benchmark import finish_memory_sampler, load_and_report, measure_stream, parse_engine_args
+from engines import SamplingConfig, get_engine
+from memory import MemorySampler
+from metrics import percentile
+from prompt_datasets import add_dataset_arguments, as_records, dataset_from_args, dataset_hash_of
+from results import load_memory_peaks, load_results, load_runs, open_result_writer, run_metadata
+from sweep import run_isolated
+
+DEFAULT_DATASET = "prefix_v1"
+MIN_PREFIX_CHARS = 256
+
+# Engine kwargs that turn prefix caching off and on.
+PREFIX_CACHE_ARGS = {
+    "vllm": ({"enable_prefix_caching": False}, {"enable_prefix_caching": True}),
+    "aphrodite": ({"enable_prefix_caching": False}, {"enable_prefix_caching": True}),
+    "sglang": ({"disable_radix_cache": True}, {"disable_radix_cache": False}),
+    "lmdeploy": ({"enable_prefix_caching": False}, {"enable_prefix_caching": True}),
+    "llama_cpp": ({"prefix_cache_bytes": 0}, {"prefix_cache_bytes": 2 << 30}),
+    "fake": ({"enable_prefix_caching": False}, {"enable_prefix_caching": True}),
+}
+
+PREFIX_RESULT_FIELDS = [
+    "engine",
+    "dataset_hash",
+    "prompt_id",
+    "category",
+    "prompt",
+    "output",
+    "prefix_group",
+    "prefix_position",
+    "prompt_token_count",
+    "prefix_token_count",
+    "reusable_prefix_tokens",
+    "cached_tokens",
+    "output_token_count",
+    "ttft_ms",
+    "prefill_tokens_per_sec",
+    "decode_tokens_per_sec",
+    "e2e_latency_s",
+]
+
+
+def _common_prefix(a, b):
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return a[:n]
+
+
+def group_by_prefix(records, min_prefix_chars=MIN_PREFIX_CHARS):
+    """Group prompts that share at least min_prefix_chars of leading text.
+
+    Sorting puts prompts with a common prefix next to each other; the group
+    prefix is cut back to a line boundary so it ends where a template block does.
+    """
+    groups = []
+    for record in sorted(records, key=lambda record: record.prompt):
+        if groups:
+            prefix = _common_prefix(groups[-1]["prefix"], record.prompt)
+            if len(prefix) >= min_prefix_chars:
+                groups[-1]["prefix"] = prefix
+                groups[-1]["records"].append(record)
+                continue
+        groups.append({"prefix": record.prompt, "records": [record]})
+    for group in groups:
+        if len(group["records"]) > 1 and "\n" in group["prefix"]:
+            group["prefix"] = group["prefix"][:group["prefix"].rindex("\n") + 1]
+    return groups
+
+
+def request_order(groups, order="grouped"):
+    """(group index, position in group, record) in the order requests are sent.
+
+    grouped sends each group back to back (best case for any cache); interleaved
+    round-robins across groups so caches have to hold several prefixes at once.
+    """
+    if order == "grouped":
+        return [(g, i, record) for g, group in enumerate(groups) for i, record in enumerate(group["records"])]
+    longest = max(len(group["records"]) for group in groups)
+    return [
+        (g, i, group["records"][i])
+        for i in range(longest)
+        for g, group in enumerate(groups)
+        if i < len(group["records"])
+    ]
+
+
+def run_prefix_benchmark(adapter, prompts, output_path, params, cache, order="grouped",
+                         min_prefix_chars=MIN_PREFIX_CHARS, tags=None):
+    records = as_records(prompts)
+    groups = group_by_prefix(records, min_prefix_chars)
+    shared = [group for group in groups if len(group["records"]) > 1]
+    print(f"{len(records)} prompts in {len(groups)} prefix groups ({len(shared)} shared). Prefix cache: {cache}")
+
+    sampler = MemorySampler().start()
+    sampler.set_phase("load")
+    load_and_report(adapter)
+    sampler.set_phase("warmup")
+    adapter.warmup(params)
+    sampler.set_phase("run")
+
+    prefix_tokens = [adapter.count_tokens(group["prefix"]) if len(group["records"]) > 1 else 0 for group in groups]
+    run_meta = run_metadata(adapter, "prefix_cache", params, dataset_hash_of(prompts),
+                            prefix_cache=cache, order=order, **(tags or {}))
+    with open_result_writer(output_path, PREFIX_RESULT_FIELDS, run_meta) as writer:
+        for g, position, record in request_order(groups, order):
+            result = measure_stream(adapter, record.prompt, params)
+            writer.write({
+                "engine": adapter.name,
+                "dataset_hash": run_meta["dataset_hash"],
+                "prompt_id": record.id,
+                "category": record.category,
+                "prompt": record.prompt,
+                "output": result["text"],
+                "prefix_group": g,
+                "prefix_position": position,
+                "prompt_token_count": result["prompt_token_count"],
+                "prefix_token_count": prefix_tokens[g],
+                # Only prefixes already sent can be served from a cache.
+                "reusable_prefix_tokens": prefix_tokens[g] if position > 0 else 0,
+                "cached_tokens": result["cached_tokens"],
+                "output_token_count": result["output_token_count"],
+                "ttft_ms": result["ttft_ms"],
+                "prefill_tokens_per_sec": result["prefill_tokens_per_sec"],
+                "decode_tokens_per_sec": result["decode_tokens_per_sec"],
+                "e2e_latency_s": result["e2e_latency_s"],
+            })
+            cached = f", {result['cached_tokens']} cached tokens" if result["cached_tokens"] is not None else ""
+            print(f"  group {g} #{position}: TTFT {result['ttft_ms']:.1f} ms{cached}")
+        adapter.close()
+        finish_memory_sampler(sampler, writer)
+    return sampler.peaks()
+
+
+def summarize_prefix_run(rows, peaks):
+    cold = [row["ttft_ms"] for row in rows if row["prefix_position"] == 0]
+    warm = [row["ttft_ms"] for row in rows if row["prefix_position"] > 0]
+    prompt_tokens = sum(row["prompt_token_count"] or 0 for row in rows)
+    reusable = sum(row["reusable_prefix_tokens"] or 0 for row in rows)
+    # Only rows the engine reported on count towards the hit ratio.
+    reported = [row for row in rows if row.get("cached_tokens") is not None]
+    reported_prompt_tokens = sum(row["prompt_token_count"] or 0 for row in reported)
+    run_peaks = peaks.get("run", {})
+    return {
+        "requests": len(rows),
+        "ttft_p50_ms": percentile([row["ttft_ms"] for row in rows], 50),
+        "cold_ttft_p50_ms": percentile(cold, 50),
+        "warm_ttft_p50_ms": percentile(warm, 50),
+        "warm_ttft_p99_ms": percentile(warm, 99),
+        # Engine-reported share of prompt tokens served from the cache; None if the engine does not report it.
+        "cache_hit_ratio": (
+            sum(row["cached_tokens"] for row in reported) / reported_prompt_tokens if reported_prompt_tokens else None
+        ),
+        "cache_hit_rows_reported": len(reported),
+        # Estimate from prefix lengths: an upper bound on what a perfect prefix cache could skip.
+        "estimated_reusable_prefix_ratio": reusable / prompt_tokens if prompt_tokens else 0.0,
+        "peak_rss_mb": run_peaks.get("rss_mb"),
+        "peak_gpu_device_mb": run_peaks.get("gpu_device_mb"),
+    }
+
+
+def compare(output_path, comparison_id):
+    summaries = {}
+    for run in load_runs(output_path):
+        if run["metadata"].get("comparison") != comparison_id or run["status"] != "complete":
+            continue
+        rows = load_results(output_path, run["run_id"])
+        peaks = load_memory_peaks(output_path, run["run_id"])
+        summaries[run["metadata"]["prefix_cache"]] = summarize_prefix_run(rows, peaks)
+
+    print("-" * 50)
+    print("Prefix Cache Comparison:")
+    for cache, summary in summaries.items():
+        print(f"  cache {cache}:")
+        for key, value in summary.items():
+            if key == "cache_hit_ratio" and value is None:
+                print(f"    {key}: not reported by the engine (see estimated_reusable_prefix_ratio)")
+                continue
+            print(f"    {key}: {value:.2f}" if isinstance(value, float) else f"    {key}: {value}")
+    off, on = summaries.get("off"), summaries.get("on")
+    if off and on:
+        def reduction(key):
+            return (off[key] - on[key]) / off[key] * 100 if off[key] else 0.0
+        print(f"  Warm TTFT reduction: {reduction('warm_ttft_p50_ms'):.1f}% (p50)")
+        print(f"  Overall TTFT reduction: {reduction('ttft_p50_ms'):.1f}% (p50)")
+        for key in ("peak_rss_mb", "peak_gpu_device_mb"):
+            if off[key] is not None and on[key] is not None:
+                print(f"  Memory cost ({key}): {on[key] - off[key]:+.2f} MB")
+    print("-" * 50)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure prefix caching on prompts that share long preambles.")
+    parser.add_argument("--engine", choices=sorted(PREFIX_CACHE_ARGS), required=True)
+    parser.add_argument("--model", default="fake")
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE")
+    add_dataset_arguments(parser)
+    parser.add_argument("--cache", choices=["both", "off", "on"], default="both",
+                        help="both runs off and on in separate processes and compares them")
+    parser.add_argument("--order", choices=["grouped", "interleaved"], default="grouped")
+    parser.add_argument("--min-prefix-chars", type=int, default=MIN_PREFIX_CHARS)
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--output", default="benchmark_results.sqlite")
+    parser.add_argument("--tag", action="append", metavar="KEY=VALUE", help=argparse.SUPPRESS)
+    parser.add_argument("--timeout-s", type=float, default=3600)
+    args = parser.parse_args(argv)
+    args.dataset = args.dataset or [DEFAULT_DATASET]
+
+    if args.cache == "both":
+        comparison_id = uuid.uuid4().hex[:12]
+        base = list(argv if argv is not None else sys.argv[1:])
+        for cache in ("off", "on"):
+            command = [sys.executable, os.path.abspath(__file__), *base, "--cache", cache,
+                       "--tag", f"comparison={comparison_id!r}"]
+            status, elapsed = run_isolated(command, args.timeout_s)
+            print(f"Prefix cache {cache}: {status} in {elapsed:.1f}s")
+        compare(args.output, comparison_id)
+        return
+
+    off_args, on_args = PREFIX_CACHE_ARGS[args.engine]
+    engine_kwargs = {**parse_engine_args(args.engine_arg), **(on_args if args.cache == "on" else off_args)}
+    adapter = get_engine(args.engine, args.model, streaming=True, **engine_kwargs)
+    run_prefix_benchmark(
+        adapter, dataset_from_args(args), args.output, SamplingConfig(max_tokens=args.max_tokens),
+        args.cache, args.order, args.min_prefix_chars, parse_engine_args(args.tag),
+    )
+
+
+if __name__ == "__main__":
+    main()
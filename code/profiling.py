@@ -0,0 +1,153 @@
+import cProfile
+import io
+import os
+import pstats
+import signal
+import subprocess
+import time
+
+from metrics import percentile
+
+PROFILER_TOOLS = ("cprofile", "torch", "py-spy")
+# Phases that are the engine's own work; everything else the loop times is harness overhead.
+ENGINE_PHASES = ("generate", "prefill", "decode")
+PROFILE_TOP_N = 25
+PHASE_FIELDS = ["phase", "kind", "count", "total_s", "mean_ms", "p50_ms", "p99_ms", "share"]
+
+
+class RequestProfiler:
+    """Per-phase timers for the benchmark loop plus an optional profiler over a request window.
+
+    Phases are timed as laps: lap() starts the clock and record(name, lap)
+    books the time since the previous boundary to name and returns the new
+    boundary, so consecutive phases cost one perf_counter_ns call each. When
+    disabled every call returns immediately.
+
+    tool attaches cProfile, the torch profiler or py-spy to requests
+    [window_start, window_end) and writes its output under output_prefix.
+    """
+
+    def __init__(self, enabled=True, tool=None, window=(0, 1), output_prefix="profile"):
+        if tool is not None and tool not in PROFILER_TOOLS:
+            raise ValueError(f"Unknown profiler {tool!r}; available: {', '.join(PROFILER_TOOLS)}")
+        self.enabled = enabled
+        self.tool = tool
+        self.window_start, self.window_end = window
+        self.output_prefix = output_prefix
+        self.phases = {}
+        self.loop_ns = 0
+        self._loop_start = None
+        self._active = None
+        self._torch_sort = "cpu_time_total"
+
+    def lap(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def record(self, name, lap, exclude_ns=0):
+        """Book the time since lap (minus exclude_ns already booked elsewhere) to name."""
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+        self.phases.setdefault(name, []).append(now - lap - exclude_ns)
+        return now
+
+    def add(self, name, ns):
+        if self.enabled:
+            self.phases.setdefault(name, []).append(ns)
+
+    def before_request(self, index):
+        if self.enabled and self._loop_start is None:
+            self._loop_start = time.perf_counter_ns()
+        if self.tool is not None and index == self.window_start:
+            self._start_tool()
+
+    def after_request(self, index):
+        if self.tool is not None and self._active is not None and index + 1 >= self.window_end:
+            self._stop_tool()
+
+    def finish(self):
+        if self._active is not None:
+            self._stop_tool()
+        if self.enabled and self._loop_start is not None:
+            self.loop_ns = time.perf_counter_ns() - self._loop_start
+
+    def _start_tool(self):
+        print(f"  Profiling requests {self.window_start}-{self.window_end - 1} with {self.tool}...")
+        if self.tool == "cprofile":
+            self._active = cProfile.Profile()
+            self._active.enable()
+        elif self.tool == "torch":
+            import torch
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+                self._torch_sort = "cuda_time_total"
+            self._active = torch.profiler.profile(activities=activities, record_shapes=True)
+            self._active.__enter__()
+        else:
+            try:
+                self._active = subprocess.Popen(
+                    ["py-spy", "record", "--pid", str(os.getpid()), "--subprocesses", "--native",
+                     "-o", self.output_prefix + ".svg"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+            except FileNotFoundError:
+                print("  py-spy is not installed; skipping the profile")
+                self.tool = None
+                return
+            time.sleep(1.0)  # let py-spy attach before the window starts
+
+    def _stop_tool(self):
+        active, self._active = self._active, None
+        if self.tool == "cprofile":
+            active.disable()
+            active.dump_stats(self.output_prefix + ".prof")
+            out = io.StringIO()
+            pstats.Stats(active, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+            print(out.getvalue())
+            print(f"  cProfile stats saved to {self.output_prefix}.prof")
+        elif self.tool == "torch":
+            active.__exit__(None, None, None)
+            active.export_chrome_trace(self.output_prefix + ".trace.json")
+            print(active.key_averages().table(sort_by=self._torch_sort, row_limit=PROFILE_TOP_N))
+            print(f"  torch profiler trace saved to {self.output_prefix}.trace.json")
+        else:
+            # py-spy writes its output when interrupted.
+            active.send_signal(signal.SIGINT)
+            active.wait()
+            print(f"  py-spy flame graph saved to {self.output_prefix}.svg")
+
+    def breakdown(self):
+        """Per-phase rows: count, total, mean/p50/p99 per request and share of the loop's wall time."""
+        rows = []
+        for name, samples in self.phases.items():
+            samples_ms = [ns / 1e6 for ns in samples]
+            total_s = sum(samples) / 1e9
+            rows.append({
+                "phase": name,
+                "kind": "engine" if name in ENGINE_PHASES else "harness",
+                "count": len(samples),
+                "total_s": total_s,
+                "mean_ms": total_s * 1000 / len(samples),
+                "p50_ms": percentile(samples_ms, 50),
+                "p99_ms": percentile(samples_ms, 99),
+                "share": total_s / (self.loop_ns / 1e9) if self.loop_ns else None,
+            })
+        return rows
+
+    def print_report(self):
+        if not self.enabled or not self.phases:
+            return
+        rows = self.breakdown()
+        print("Phase Breakdown (per request):")
+        print(f"  {'phase':<14} {'kind':<8} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10} {'share':>8}")
+        for row in rows:
+            share = f"{row['share']:.1%}" if row["share"] is not None else "-"
+            print(f"  {row['phase']:<14} {row['kind']:<8} {row['mean_ms']:>10.3f} {row['p50_ms']:>10.3f} "
+                  f"{row['p99_ms']:>10.3f} {share:>8}")
+        harness_s = sum(row["total_s"] for row in rows if row["kind"] == "harness")
+        timed_s = sum(row["total_s"] for row in rows)
+        if self.loop_ns:
+            untimed_s = self.loop_ns / 1e9 - timed_s
+            print(f"  Harness overhead: {harness_s:.3f}s timed + {untimed_s:.3f}s untimed "
+                  f"of {self.loop_ns / 1e9:.3f}s loop wall time")
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "prompts")
+DEFAULT_DATASET = "core_v1"
+
+
+@dataclass
+class PromptRecord:
+    id: str
+    prompt: str
+    category: Optional[str] = None
+    input_words: Optional[int] = None
+    # Set by prompt_prep once the chat template is applied; prompt then holds the rendered text.
+    token_ids: Optional[List[int]] = None
+
+
+def resolve_dataset_path(name_or_path):
+    if os.path.exists(name_or_path):
+        return name_or_path
+    for ext in (".jsonl", ".parquet"):
+        path = os.path.join(DATA_DIR, name_or_path + ext)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No prompt dataset named {name_or_path!r} in {DATA_DIR}")
+
+
+def _record(raw):
+    return PromptRecord(
+        id=str(raw["id"]),
+        prompt=raw["prompt"],
+        category=raw.get("category"),
+        input_words=raw.get("input_words"),
+    )
+
+
+def iter_records(path) -> Iterator[PromptRecord]:
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches():
+            for raw in batch.to_pylist():
+                yield _record(raw)
+        return
+    with open(path, encoding="utf-8") as f_in:
+        for line in f_in:
+            if line.strip():
+                yield _record(json.loads(line))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f_in:
+        for block in iter(lambda: f_in.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PromptDataset:
+    """Lazily streamed prompt set built from one or more dataset files.
+
+    categories filters by record category, shard=(index, count) keeps every
+    count-th record starting at index, sample draws a seeded reservoir sample
+    and limit truncates. content_hash identifies the source files plus the
+    selection, so results from different engines can be matched exactly.
+    """
+
+    def __init__(self, sources=DEFAULT_DATASET, categories=None, shard=None, sample=None, seed=0, limit=None):
+        if isinstance(sources, str):
+            sources = [sources]
+        self.paths = [resolve_dataset_path(source) for source in sources]
+        self.categories = set(categories) if categories else None
+        self.shard = shard
+        self.sample = sample
+        self.seed = seed
+        self.limit = limit
+        self._content_hash = None
+
+    def _selected(self):
+        index = -1
+        for path in self.paths:
+            for record in iter_records(path):
+                if self.categories is not None and record.category not in self.categories:
+                    continue
+                index += 1
+                if self.shard is not None and index % self.shard[1] != self.shard[0]:
+                    continue
+                yield record
+
+    def __iter__(self) -> Iterator[PromptRecord]:
+        records = self._selected()
+        if self.sample is not None:
+            records = iter(self._reservoir(records))
+        for i, record in enumerate(records):
+            if self.limit is not None and i >= self.limit:
+                return
+            yield record
+
+    def _reservoir(self, records):
+        rng = random.Random(self.seed)
+        reservoir = []
+        for i, record in enumerate(records):
+            if i < self.sample:
+                reservoir.append(record)
+            else:
+                j = rng.randint(0, i)
+                if j < self.sample:
+                    reservoir[j] = record
+        return reservoir
+
+    @property
+    def content_hash(self):
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            for path in self.paths:
+                digest.update(file_hash(path).encode())
+            selection = {
+                "categories": sorted(self.categories) if self.categories else None,
+                "shard": list(self.shard) if self.shard else None,
+                "sample": self.sample,
+                "seed": self.seed,
+                "limit": self.limit,
+            }
+            digest.update(json.dumps(selection, sort_keys=True).encode())
+            self._content_hash = digest.hexdigest()[:16]
+        return self._content_hash
+
+
+def as_records(prompts):
+    """Normalize a PromptDataset, PromptRecords or plain strings into a list of PromptRecords."""
+    records = []
+    for i, prompt in enumerate(prompts):
+        if isinstance(prompt, PromptRecord):
+            records.append(prompt)
+        else:
+            records.append(PromptRecord(id=f"inline-{i:03d}", prompt=prompt, input_words=len(prompt.split())))
+    return records
+
+
+def dataset_hash_of(prompts):
+    if isinstance(prompts, PromptDataset):
+        return prompts.content_hash
+    digest = hashlib.sha256()
+    for record in as_records(prompts):
+        digest.update(record.prompt.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def parse_shard(value):
+    index, count = value.split("/")
+    return int(index), int(count)
+
+
+def add_dataset_arguments(parser):
+    parser.add_argument("--dataset", action="append", default=None,
+                        help=f"dataset name in data/prompts or a .jsonl/.parquet path (default {DEFAULT_DATASET})")
+    parser.add_argument("--category", action="append", default=None, help="keep only these categories")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="INDEX/COUNT")
+    parser.add_argument("--sample", type=int, default=None, help="seeded random sample size")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--dataset-seed", type=int, default=0)
+
+
+def dataset_from_args(args):
+    return PromptDataset(
+        args.dataset or DEFAULT_DATASET,
+        categories=args.category,
+        shard=args.shard,
+        sample=args.sample,
+        seed=args.dataset_seed,
+        limit=args.limit,
+    )
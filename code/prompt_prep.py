@@ -0,0 +1,187 @@
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import replace
+
+from prompt_datasets import DATA_DIR, as_records, dataset_hash_of
+
+PREPARED_DIR = os.path.join(os.path.dirname(DATA_DIR), "prepared")
+# Bumped whenever the stored prompt text changes meaning, so stale caches are not reused.
+PREPARED_FORMAT = 2
+
+
+class ChatTemplate:
+    """Renders prompts with a model's chat template and tokenizes them with its tokenizer.
+
+    tokenizer_path is a Hugging Face tokenizer or a .gguf file, whose template
+    comes from the tokenizer.chat_template metadata. Models without a template
+    (base models) get the raw prompt, still tokenized once. The rendered text
+    already carries BOS and the other special tokens, so encoding never adds them;
+    engine_text drops that BOS again for engines that only take text and add
+    their own.
+    """
+
+    def __init__(self, tokenizer_path, system_prompt=None):
+        self.tokenizer_path = tokenizer_path
+        self.system_prompt = system_prompt
+        self._tokenizer = None
+        self._llama = None
+        self._formatter = None
+        self.template = None
+
+    def _load(self):
+        if self._tokenizer is not None or self._llama is not None:
+            return
+        if self.tokenizer_path.endswith(".gguf"):
+            from llama_cpp import Llama
+            from llama_cpp.llama_chat_format import Jinja2ChatFormatter
+            self._llama = Llama(model_path=self.tokenizer_path, vocab_only=True, verbose=False)
+            self.template = self._llama.metadata.get("tokenizer.chat_template")
+            if self.template:
+                self._formatter = Jinja2ChatFormatter(
+                    template=self.template,
+                    eos_token=self._token_text(self._llama.token_eos()),
+                    bos_token=self._token_text(self._llama.token_bos()),
+                    add_generation_prompt=True,
+                )
+        else:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_path)
+            self.template = self._tokenizer.chat_template
+        if not self.template:
+            print(f"WARNING: {self.tokenizer_path} has no chat template; prompts are tokenized as-is")
+
+    def _token_text(self, token_id):
+        return self._llama.detokenize([token_id], special=True).decode("utf-8", errors="replace")
+
+    @property
+    def bos_text(self):
+        self._load()
+        if self._llama is not None:
+            return self._token_text(self._llama.token_bos())
+        return self._tokenizer.bos_token or ""
+
+    def engine_text(self, rendered):
+        """Rendered prompt as text-only engines should receive it: their tokenizer adds BOS itself."""
+        bos = self.bos_text
+        return rendered[len(bos):] if bos and rendered.startswith(bos) else rendered
+
+    @property
+    def fingerprint(self):
+        """Identifies the template, system prompt and vocabulary, so a tokenizer change misses the cache."""
+        self._load()
+        digest = hashlib.sha256()
+        digest.update((self.template or "").encode("utf-8"))
+        digest.update((self.system_prompt or "").encode("utf-8"))
+        if self._llama is not None:
+            digest.update(str(self._llama.n_vocab()).encode())
+            for token_id in (self._llama.token_bos(), self._llama.token_eos()):
+                digest.update(self._token_text(token_id).encode("utf-8"))
+        else:
+            digest.update(json.dumps(sorted(self._tokenizer.get_vocab().items())).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def messages(self, prompt):
+        messages = [{"role": "user", "content": prompt}]
+        if self.system_prompt:
+            messages.insert(0, {"role": "system", "content": self.system_prompt})
+        return messages
+
+    @property
+    def has_template(self):
+        self._load()
+        return bool(self.template)
+
+    def render_messages(self, messages):
+        self._load()
+        if self._formatter is not None:
+            return self._formatter(messages=messages).prompt
+        return self._tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+
+    def render(self, prompt):
+        if not self.has_template:
+            return prompt
+        return self.render_messages(self.messages(prompt))
+
+    def encode_batch(self, texts):
+        self._load()
+        if self._llama is not None:
+            # Without a template the raw prompt still needs the BOS the engine would add.
+            return [
+                self._llama.tokenize(text.encode("utf-8"), add_bos=not self.template, special=True)
+                for text in texts
+            ]
+        return self._tokenizer(list(texts), add_special_tokens=not self.template)["input_ids"]
+
+
+def prepared_path(cache_dir, dataset_hash, template):
+    return os.path.join(cache_dir, f"{dataset_hash}_{template.fingerprint}_v{PREPARED_FORMAT}.jsonl.gz")
+
+
+def _read_prepared(path):
+    prepared = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f_in:
+        for line in f_in:
+            entry = json.loads(line)
+            prepared[entry["id"]] = (entry["prompt"], entry["token_ids"])
+    return prepared
+
+
+def _write_prepared(path, records):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f_out:
+        for record in records:
+            f_out.write(json.dumps({"id": record.id, "prompt": record.prompt, "token_ids": record.token_ids}) + "\n")
+    os.replace(tmp_path, path)
+
+
+def prepare_prompts(prompts, template, cache_dir=PREPARED_DIR):
+    """Records with the chat template applied and token_ids filled in.
+
+    token_ids are the full rendered prompt; prompt is the same text without a
+    leading BOS, which is what engines given text must see to end up with the
+    same ids. Rendered prompts and ids are cached on disk keyed by the source dataset hash
+    and the template fingerprint, so repeated runs skip templating and
+    tokenization entirely; the benchmark never does either inside a timed region.
+    """
+    records = as_records(prompts)
+    path = prepared_path(cache_dir, dataset_hash_of(prompts), template)
+    if os.path.exists(path):
+        prepared = _read_prepared(path)
+        if all(record.id in prepared for record in records):
+            print(f"Loaded {len(records)} pre-tokenized prompts from {path}")
+            return [
+                replace(record, prompt=prepared[record.id][0], token_ids=prepared[record.id][1])
+                for record in records
+            ]
+
+    print(f"Applying chat template from {template.tokenizer_path} and tokenizing {len(records)} prompts...")
+    rendered = [template.render(record.prompt) for record in records]
+    token_ids = template.encode_batch(rendered)
+    records = [
+        replace(record, prompt=template.engine_text(text), token_ids=list(ids))
+        for record, text, ids in zip(records, rendered, token_ids)
+    ]
+    _write_prepared(path, records)
+    print(f"Pre-tokenized prompts saved to {path}")
+    return records
+
+
+def engine_prompt(adapter, record):
+    """Token ids for engines that take them, so tokenization stays out of the timed call; else the text."""
+    if record.token_ids is not None and adapter.accepts_token_ids:
+        return record.token_ids
+    return record.prompt
+
+
+def prompt_format(template):
+    """Run metadata describing how prompts were prepared."""
+    if template is None:
+        return {"chat_template": None}
+    return {
+        "chat_template": template.tokenizer_path,
+        "chat_template_fingerprint": template.fingerprint,
+        "system_prompt": template.system_prompt,
+    }
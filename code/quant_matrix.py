@@ -0,0 +1,287 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import uuid
+
+from benchmark import parse_engine_args
+from metrics import percentile
+from results import engine_version, host_info, load_memory_peaks, load_results, load_runs, open_result_writer
+from sweep import benchmark_command, config_id_of, run_isolated
+
+RESULT_PREFIX = "PERPLEXITY_RESULT "
+HELDOUT_TEXT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "perplexity",
+                            "heldout_v1.txt")
+DEFAULT_QUANTS = ("Q4_0", "Q4_K_M", "Q5_K_M", "Q8_0", "F16")
+DEFAULT_MAX_PPL_INCREASE = 0.05
+PERPLEXITY_CTX = 512
+
+# Quantization label at the end of a GGUF file name, e.g. gemma-3-1b-it-Q4_K_M.gguf.
+QUANT_PATTERN = re.compile(r"[-_.]((?:I?Q\d+(?:_[A-Z0-9]+)*)|BF16|F16|F32)\.gguf$", re.IGNORECASE)
+
+QUANT_MATRIX_FIELDS = [
+    "quant",
+    "model",
+    "file_mb",
+    "status",
+    "load_s",
+    "peak_rss_mb",
+    "decode_tokens_per_sec",
+    "ttft_p50_ms",
+    "e2e_p50_s",
+    "perplexity",
+    "perplexity_tokens",
+    "ppl_increase",
+    "meets_quality",
+    "run_id",
+]
+
+
+def quant_label(path):
+    match = QUANT_PATTERN.search(os.path.basename(path))
+    return match.group(1).upper() if match else os.path.splitext(os.path.basename(path))[0]
+
+
+def parse_variant(value):
+    """QUANT=PATH, or a bare .gguf path whose file name carries the quantization."""
+    label, sep, path = value.partition("=")
+    if not sep:
+        label, path = quant_label(value), value
+    if not path.endswith(".gguf"):
+        raise argparse.ArgumentTypeError(f"expected a .gguf path, got {path!r}")
+    return label, path
+
+
+def discover_variants(model_dir, quants=None):
+    variants = [(quant_label(path), path) for path in sorted(glob.glob(os.path.join(model_dir, "*.gguf")))]
+    return [(label, path) for label, path in variants if quants is None or label in quants]
+
+
+def download_variants(repo_id, quants):
+    """Fetch the requested quantizations of one model from a Hugging Face GGUF repo."""
+    from huggingface_hub import hf_hub_download, list_repo_files
+    from engines import hf_login
+    hf_login()
+    variants = []
+    for filename in sorted(list_repo_files(repo_id)):
+        if filename.endswith(".gguf") and quant_label(filename) in quants:
+            print(f"Fetching {repo_id}/{filename}...")
+            variants.append((quant_label(filename), hf_hub_download(repo_id=repo_id, filename=filename)))
+    return variants
+
+
+def perplexity(model_path, text, n_ctx=PERPLEXITY_CTX, **engine_kwargs):
+    """Perplexity of text under a GGUF model, as a cheap quality proxy.
+
+    The text is split into n_ctx windows and only the second half of each is
+    scored, so every scored token sees at least n_ctx/2 tokens of context (the
+    same scheme as llama.cpp's perplexity tool).
+    """
+    import numpy as np
+    from llama_cpp import Llama
+    llm = Llama(model_path=model_path, n_ctx=n_ctx, logits_all=True, verbose=False, **engine_kwargs)
+    tokens = llm.tokenize(text.encode("utf-8"), add_bos=False)
+    nll = 0.0
+    scored = 0
+    for start in range(0, len(tokens) - 1, n_ctx - 1):
+        window = [llm.token_bos()] + tokens[start:start + n_ctx - 1]
+        if len(window) < 4:
+            break
+        llm.reset()
+        llm.eval(window)
+        first = len(window) // 2
+        logits = np.asarray(llm.scores[first - 1:len(window) - 1], dtype=np.float64)
+        targets = np.asarray(window[first:])
+        peak = logits.max(axis=1)
+        log_norm = peak + np.log(np.exp(logits - peak[:, None]).sum(axis=1))
+        nll += float((log_norm - logits[np.arange(len(targets)), targets]).sum())
+        scored += len(targets)
+    llm.close()
+    return {"perplexity": float(np.exp(nll / scored)) if scored else None, "perplexity_tokens": scored}
+
+
+def measure_perplexity(model_path, text_path, engine_args, timeout_s):
+    """Score perplexity in a fresh process so its full-vocabulary logits never share memory with the benchmark."""
+    with tempfile.NamedTemporaryFile(prefix="perplexity_", suffix=".log", delete=False) as log:
+        log_path = log.name
+    command = [sys.executable, os.path.abspath(__file__), "--child-perplexity", model_path, "--perplexity-text",
+               text_path]
+    for arg in engine_args:
+        command += ["--engine-arg", arg]
+    status, _ = run_isolated(command, timeout_s, log_path)
+    with open(log_path, encoding="utf-8", errors="replace") as f_in:
+        lines = f_in.read().splitlines()
+    os.remove(log_path)
+    for line in lines:
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    print(f"  perplexity {status}:\n  " + "\n  ".join(lines[-10:]))
+    return {"perplexity": None, "perplexity_tokens": None}
+
+
+def summarize_variant(output_path, config_id, comparison_id):
+    """Throughput, latency, load time and peak RSS of the variant's benchmark run."""
+    runs = [run for run in load_runs(output_path)
+            if run["config_id"] == config_id and run["metadata"].get("comparison") == comparison_id]
+    if not runs:
+        return {"status": "missing"}
+    run = runs[-1]
+    if run["status"] != "complete":
+        return {"status": run["status"], "run_id": run["run_id"]}
+    rows = load_results(output_path, run["run_id"])
+    peaks = load_memory_peaks(output_path, run["run_id"])
+    rss = [phase_peaks["rss_mb"] for phase_peaks in peaks.values() if phase_peaks.get("rss_mb") is not None]
+    return {
+        "status": "complete",
+        "run_id": run["run_id"],
+        "load_s": run["metadata"].get("load_s"),
+        "peak_rss_mb": max(rss) if rss else None,
+        "decode_tokens_per_sec": percentile([row["decode_tokens_per_sec"] for row in rows], 50),
+        "ttft_p50_ms": percentile([row["ttft_ms"] for row in rows], 50),
+        "e2e_p50_s": percentile([row["e2e_latency_s"] for row in rows], 50),
+    }
+
+
+def judge_quality(rows, max_increase):
+    """Compare every variant's perplexity with the largest (highest precision) file that has one."""
+    scored = [row for row in rows if row.get("perplexity") is not None]
+    if not scored:
+        return None
+    reference = max(scored, key=lambda row: row["file_mb"])
+    for row in rows:
+        if row.get("perplexity") is None:
+            row["ppl_increase"] = None
+            row["meets_quality"] = None
+        else:
+            row["ppl_increase"] = row["perplexity"] / reference["perplexity"] - 1
+            row["meets_quality"] = row["ppl_increase"] <= max_increase
+    return reference
+
+
+def cheapest_passing(rows):
+    """Variant with the lowest peak RSS (file size when RSS is missing) that meets quality and completed."""
+    passing = [row for row in rows if row.get("meets_quality") and row["status"] == "complete"]
+    if not passing:
+        return None
+    return min(passing, key=lambda row: (row.get("peak_rss_mb") or row["file_mb"],
+                                         -(row.get("decode_tokens_per_sec") or 0)))
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else format("-", ">" + spec.split(".")[0])
+
+
+def print_matrix(rows, reference, choice, max_increase):
+    print("-" * 50)
+    print("Quantization Matrix:")
+    print(f"  {'quant':<8} {'file MB':>8} {'load s':>7} {'RSS MB':>8} {'decode tok/s':>13} {'TTFT p50':>9} "
+          f"{'ppl':>8} {'vs ref':>7}  ok")
+    for row in sorted(rows, key=lambda row: row["file_mb"]):
+        ok = {True: "yes", False: "no", None: "-"}[row.get("meets_quality")]
+        increase = f"{row['ppl_increase']:+.1%}" if row.get("ppl_increase") is not None else "-"
+        print(f"  {row['quant']:<8} {row['file_mb']:>8.0f} {_fmt(row.get('load_s'), '7.2f')} "
+              f"{_fmt(row.get('peak_rss_mb'), '8.0f')} {_fmt(row.get('decode_tokens_per_sec'), '13.2f')} "
+              f"{_fmt(row.get('ttft_p50_ms'), '9.1f')} {_fmt(row.get('perplexity'), '8.3f')} {increase:>7}  {ok}")
+    if reference is not None:
+        print(f"  Reference: {reference['quant']}; quality threshold {max_increase:.0%} perplexity increase")
+    if choice is not None:
+        print(f"  Cheapest variant meeting quality: {choice['quant']} ({choice['model']})")
+    else:
+        print("  No variant both completed and met the quality threshold.")
+    print("-" * 50)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the same dataset through GGUF quantizations of one model and compare speed, memory and quality."
+    )
+    parser.add_argument("--variant", action="append", type=parse_variant, default=[], metavar="[QUANT=]PATH",
+                        help="GGUF file to include; may be repeated")
+    parser.add_argument("--model-dir", default=None, help="directory of GGUF variants of one model")
+    parser.add_argument("--hf-repo", default=None, help="Hugging Face GGUF repo to download the variants from")
+    parser.add_argument("--quants", default=",".join(DEFAULT_QUANTS),
+                        help="quantizations to take from --model-dir or --hf-repo")
+    parser.add_argument("--engine", default="llama_cpp", help=argparse.SUPPRESS)
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE", default=[],
+                        help="Llama() argument applied to every variant, e.g. n_threads=8")
+    parser.add_argument("--dataset", action="append", default=None)
+    parser.add_argument("--sample", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--perplexity-text", default=HELDOUT_TEXT, help="held-out text scored for perplexity")
+    parser.add_argument("--max-ppl-increase", type=float, default=DEFAULT_MAX_PPL_INCREASE,
+                        help="largest relative perplexity increase over the reference that still meets quality")
+    parser.add_argument("--output", default="benchmark_results.sqlite")
+    parser.add_argument("--timeout-s", type=float, default=3600)
+    parser.add_argument("--child-perplexity", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child_perplexity:
+        with open(args.perplexity_text, encoding="utf-8") as f_in:
+            text = f_in.read()
+        result = perplexity(args.child_perplexity, text, **parse_engine_args(args.engine_arg))
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+        return
+
+    quants = {quant.strip().upper() for quant in args.quants.split(",") if quant.strip()}
+    variants = list(args.variant)
+    if args.model_dir:
+        variants += discover_variants(args.model_dir, quants)
+    if args.hf_repo:
+        variants += download_variants(args.hf_repo, quants)
+    if not variants:
+        parser.error("no GGUF variants; pass --variant, --model-dir or --hf-repo")
+
+    comparison_id = uuid.uuid4().hex[:12]
+    spec = {"sweep_name": "quant_matrix", "sample": args.sample, "limit": args.limit}
+    rows = []
+    for label, path in variants:
+        print(f"Variant {label}: {path}")
+        # Identical dataset, sampling and engine args for every variant; only the weights change.
+        config = {
+            "engine": args.engine,
+            "model": path,
+            "mode": "stream",
+            "batch_sizes": None,
+            "dataset": args.dataset or ["core_v1"],
+            "engine_args": parse_engine_args(args.engine_arg),
+            "sampling": {"max_tokens": args.max_tokens, "temperature": 0.0},
+        }
+        config_id = config_id_of(config)
+        command = benchmark_command(config, config_id, spec, args.output)
+        command += ["--tag", f"comparison={comparison_id!r}", "--tag", f"quant={label!r}"]
+        status, elapsed = run_isolated(command, args.timeout_s)
+        print(f"  benchmark {status} in {elapsed:.1f}s")
+        row = {"quant": label, "model": path, "file_mb": os.path.getsize(path) / (1024 * 1024),
+               **summarize_variant(args.output, config_id, comparison_id)}
+        row.update(measure_perplexity(path, args.perplexity_text, args.engine_arg, args.timeout_s))
+        if row["perplexity"] is not None:
+            print(f"  perplexity {row['perplexity']:.3f} over {row['perplexity_tokens']} tokens")
+        rows.append(row)
+
+    reference = judge_quality(rows, args.max_ppl_increase)
+    choice = cheapest_passing(rows)
+    run_meta = {
+        "engine": args.engine,
+        "engine_version": engine_version(args.engine),
+        "model": os.path.commonprefix([path for _, path in variants]),
+        "mode": "quant_matrix",
+        "engine_kwargs": parse_engine_args(args.engine_arg),
+        "host": host_info(),
+        "comparison": comparison_id,
+        "reference": reference["quant"] if reference else None,
+        "max_ppl_increase": args.max_ppl_increase,
+        "choice": choice["quant"] if choice else None,
+    }
+    with open_result_writer(args.output, QUANT_MATRIX_FIELDS, run_meta) as writer:
+        for row in rows:
+            writer.write(row)
+    print_matrix(rows, reference, choice, args.max_ppl_increase)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
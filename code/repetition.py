@@ -0,0 +1,83 @@
+TEXT_MAX_PERIOD = 64
+TEXT_MIN_SPAN = 64
+TOKEN_MAX_PERIOD = 16
+TOKEN_MIN_SPAN = 24
+MIN_REPEATS = 4
+
+
+def find_loop(seq, max_period, min_span, min_repeats=MIN_REPEATS):
+    """Period of the loop the end of seq is stuck in, or None.
+
+    seq is a string or a list of token ids. The tail counts as a loop when it
+    repeats a unit of at most max_period items min_repeats times and spans at
+    least min_span items. Each candidate period is one slice comparison, so
+    this is cheap enough to run after every token.
+    """
+    n = len(seq)
+    for period in range(1, max_period + 1):
+        span = max(period * min_repeats, min_span)
+        if span > n:
+            break
+        if seq[n - span:n - period] == seq[n - span + period:]:
+            return period
+    return None
+
+
+def loop_start(seq, period):
+    """Index where the trailing loop of the given period begins."""
+    start = len(seq) - period
+    while start > 0 and seq[start - 1] == seq[start - 1 + period]:
+        start -= 1
+    return start
+
+
+class RepetitionDetector:
+    """Watches a text stream and trips once the output has fallen into a loop.
+
+    Works on characters so it catches loops with no whitespace to split on
+    ("expenses.expenses.", "**and**and") as well as "and, and, and,".
+    """
+
+    def __init__(self, max_period=TEXT_MAX_PERIOD, min_span=TEXT_MIN_SPAN, min_repeats=MIN_REPEATS):
+        self.max_period = max_period
+        self.min_span = min_span
+        self.min_repeats = min_repeats
+        self._keep = 2 * max(max_period * min_repeats, min_span)
+        self._tail = ""
+        self.period = None
+
+    @property
+    def triggered(self):
+        return self.period is not None
+
+    def feed(self, text):
+        if self.period is None and text:
+            self._tail = (self._tail + text)[-self._keep:]
+            self.period = find_loop(self._tail, self.max_period, self.min_span, self.min_repeats)
+        return self.period is not None
+
+
+def token_stop_condition(max_period=TOKEN_MAX_PERIOD, min_span=TOKEN_MIN_SPAN, min_repeats=MIN_REPEATS):
+    """Callable(token_ids) -> bool for engines that can stop a sequence from inside the sampler."""
+    def looping(token_ids):
+        return find_loop(list(token_ids[-2 * max(max_period * min_repeats, min_span):]),
+                         max_period, min_span, min_repeats) is not None
+    return looping
+
+
+def repetition_columns(text, output_tokens, max_tokens, stopped_early=False, engine_stop=False):
+    """Result columns: whether the output ends in a loop, whether it was cut, and decode tokens saved.
+
+    stopped_early is set when the harness cut the stream itself. With
+    engine_stop the engine ran a token_stop_condition, so a looping output
+    shorter than max_tokens was cut there. Without the cut the loop would have
+    run to the cap, so the difference is what was saved.
+    """
+    looping = RepetitionDetector()
+    looping.feed(text)
+    stopped = stopped_early or (engine_stop and looping.triggered and output_tokens < max_tokens)
+    return {
+        "repetition_loop": looping.triggered or stopped_early,
+        "repetition_stopped": stopped,
+        "decode_tokens_saved": max_tokens - output_tokens if stopped else 0,
+    }
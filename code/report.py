@@ -0,0 +1,494 @@
+import argparse
+import csv
+import html
+import os
+import re
+
+from metrics import mean, percentile
+from prompt_datasets import DATA_DIR, iter_records
+from results import load_phase_timings, load_results, load_runs
+from stats import bootstrap_ci, mad_outliers, paired_ratio
+
+SHORT_PROMPT_MAX_WORDS = 20
+REGRESSION_THRESHOLD_PCT = 5.0
+# Modes that write one row per prompt; cold_start, quant_matrix and the like have nothing to align.
+PER_PROMPT_MODES = ("closed_loop", "stream", "batch")
+
+# (column, higher is better) pairs compared against the baseline run.
+DELTA_METRICS = [
+    ("tps_p50", True),
+    ("tps_mean", True),
+    ("latency_p50_s", False),
+    ("latency_p99_s", False),
+    ("ttft_p50_ms", False),
+    ("peak_mem_mb", False),
+]
+
+
+def _number(value):
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def prompt_key(text):
+    # Some legacy CSVs re-indented multi-line prompts, so whitespace is not significant.
+    return " ".join(text.split())
+
+
+def prompt_index(data_dir=DATA_DIR):
+    """Map prompt text to its dataset record so legacy CSVs without prompt ids can be aligned."""
+    index = {}
+    for name in sorted(os.listdir(data_dir)):
+        if name.endswith(".jsonl"):
+            for record in iter_records(os.path.join(data_dir, name)):
+                index.setdefault(prompt_key(record.prompt), record)
+    return index
+
+
+def normalize_row(raw, index):
+    row = {key: _number(raw.get(key)) for key in (
+        "prompt_word_count", "prompt_token_count", "true_prompt_tokens", "output_token_count",
+        "true_output_tokens", "tokens_per_sec", "ttft_ms", "peak_gpu_mem_during_run_mb",
+        "total_gpu_mem_after_load_mb", "cpu_memory_used_mb",
+    )}
+    prompt_id = raw.get("prompt_id")
+    category = raw.get("category")
+    if not prompt_id and raw.get("prompt"):
+        record = index.get(prompt_key(raw["prompt"]))
+        if record is not None:
+            prompt_id, category = record.id, category or record.category
+    row["prompt_id"] = prompt_id or None
+    row["category"] = category or None
+    row["cache_hit"] = str(raw.get("cache_hit")) in ("1", "True")
+
+    output_tokens = row["true_output_tokens"] or row["output_token_count"]
+    latency = next(
+        (_number(raw.get(key)) for key in ("duration_s", "latency_s", "e2e_latency_s") if _number(raw.get(key))),
+        None,
+    )
+    if latency is None and output_tokens and row["tokens_per_sec"]:
+        # Legacy CSVs only kept tokens/sec; recover the request latency from it.
+        latency = output_tokens / row["tokens_per_sec"]
+    if row["tokens_per_sec"] is None and latency:
+        row["tokens_per_sec"] = _number(raw.get("decode_tokens_per_sec")) or (output_tokens or 0) / latency
+    row["latency_s"] = latency
+    row["output_tokens"] = output_tokens
+    row["prompt_tokens"] = row["true_prompt_tokens"] or row["prompt_token_count"] or row["prompt_word_count"]
+
+    # vLLM's old CSVs report 0.00 GPU memory, so a zero reading counts as missing.
+    gpu_mem = max(row["peak_gpu_mem_during_run_mb"] or 0.0, row["total_gpu_mem_after_load_mb"] or 0.0)
+    if gpu_mem > 0:
+        row["peak_mem_mb"], row["mem_source"] = gpu_mem, "gpu"
+    elif row["cpu_memory_used_mb"]:
+        row["peak_mem_mb"], row["mem_source"] = row["cpu_memory_used_mb"], "cpu"
+    else:
+        row["peak_mem_mb"], row["mem_source"] = None, None
+    return row
+
+
+def engine_from_filename(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"_(stream_|batch_)?benchmark_results\d*$", "", stem)
+
+
+def load_csv_run(path, index):
+    with open(path, newline="", encoding="utf-8") as f_in:
+        raw_rows = list(csv.DictReader(f_in))
+    engine = (raw_rows[0].get("engine") if raw_rows else None) or engine_from_filename(path)
+    return {
+        "label": engine,
+        "engine": engine,
+        "source": path,
+        "rows": [normalize_row(raw, index) for raw in raw_rows],
+    }
+
+
+def load_store_runs(path, index, mode=None):
+    """Runs from a result store; by default only the modes that write one row per prompt.
+
+    A batch run becomes one run per batch size, so a prompt's rows are trials
+    at one batch size rather than a mix of them.
+    """
+    runs = []
+    for run in load_runs(path):
+        if run["mode"] not in ((mode,) if mode is not None else PER_PROMPT_MODES):
+            continue
+        rows = load_results(path, run["run_id"])
+        if not rows:
+            continue
+        label = f"{run['engine']}:{run['mode']}:{run['run_id'][:6]}"
+        if run["mode"] == "batch":
+            groups = {}
+            for raw in rows:
+                groups.setdefault(raw.get("batch_size"), []).append(raw)
+            groups = {f"{label}:bs{size}": groups[size] for size in sorted(groups, key=lambda size: size or 0)}
+        else:
+            groups = {label: rows}
+        for group_label, group in groups.items():
+            runs.append({
+                "label": group_label,
+                "engine": run["engine"],
+                "source": path,
+                "rows": [normalize_row(raw, index) for raw in group],
+                "warmup": run["metadata"].get("warmup"),
+                "phases": load_phase_timings(path, run["run_id"]),
+            })
+    return runs
+
+
+def load_inputs(paths, mode=None):
+    index = prompt_index()
+    runs = []
+    for path in paths:
+        if path.endswith(".csv"):
+            runs.append(load_csv_run(path, index))
+        else:
+            runs.extend(load_store_runs(path, index, mode))
+
+    seen = {}
+    for run in runs:
+        # Response cache hits never reached the engine, so they stay out of every statistic.
+        run["cache_hits"] = sum(1 for row in run["rows"] if row["cache_hit"])
+        run["rows"] = [row for row in run["rows"] if not row["cache_hit"]]
+        seen[run["label"]] = seen.get(run["label"], 0) + 1
+        if seen[run["label"]] > 1:
+            run["label"] = f"{run['label']}#{seen[run['label']]}"
+    return runs
+
+
+def align(runs):
+    """Keep only prompts every run answered, so percentiles compare the same work.
+
+    run["aligned"] maps prompt id to that prompt's rows, one per trial.
+    """
+    common = None
+    for run in runs:
+        ids = {row["prompt_id"] for row in run["rows"] if row["prompt_id"]}
+        # A run with no prompt ids at all cannot be aligned; it must not empty the intersection.
+        if ids:
+            common = ids if common is None else common & ids
+    common = common or set()
+    for run in runs:
+        by_id = {}
+        for row in run["rows"]:
+            if row["prompt_id"] in common:
+                by_id.setdefault(row["prompt_id"], []).append(row)
+        run["aligned"] = by_id
+    return sorted(common)
+
+
+def length_bucket(row):
+    if row["category"]:
+        return row["category"]
+    words = row["prompt_word_count"] or 0
+    return "short" if words <= SHORT_PROMPT_MAX_WORDS else "long"
+
+
+def per_prompt_tps(rows):
+    by_prompt = {}
+    for row in rows:
+        if row["tokens_per_sec"] is not None:
+            by_prompt.setdefault(row["prompt_id"], []).append(row["tokens_per_sec"])
+    return by_prompt
+
+
+def summarize_rows(rows):
+    tps = [row["tokens_per_sec"] for row in rows if row["tokens_per_sec"] is not None]
+    by_prompt = per_prompt_tps(rows)
+    # Trials of one prompt are not independent, so the interval is over per-prompt medians.
+    _, tps_ci_low, tps_ci_high = bootstrap_ci([percentile(values, 50) for values in by_prompt.values()])
+    latencies = [row["latency_s"] for row in rows if row["latency_s"] is not None]
+    ttfts = [row["ttft_ms"] for row in rows if row["ttft_ms"] is not None]
+    output_tokens = [row["output_tokens"] for row in rows if row["output_tokens"] is not None]
+    mems = [row for row in rows if row["peak_mem_mb"] is not None]
+    peak_mem = max((row["peak_mem_mb"] for row in mems), default=None)
+    contexts = [(row["prompt_tokens"] or 0) + (row["output_tokens"] or 0) for row in rows]
+    growth = [
+        row["peak_gpu_mem_during_run_mb"] - row["total_gpu_mem_after_load_mb"]
+        for row in rows
+        if row["peak_gpu_mem_during_run_mb"] and row["total_gpu_mem_after_load_mb"]
+    ]
+    mem_growth_mb = max(growth, default=None)
+    return {
+        "n": len(rows),
+        "tps_mean": mean(tps) if tps else None,
+        "tps_p10": percentile(tps, 10) if tps else None,
+        "tps_p50": percentile(tps, 50) if tps else None,
+        "tps_p90": percentile(tps, 90) if tps else None,
+        "tps_ci": (tps_ci_low, tps_ci_high) if tps_ci_low is not None else None,
+        "outlier_trials": sum(int(mad_outliers(values).sum()) for values in by_prompt.values()),
+        "latency_p50_s": percentile(latencies, 50) if latencies else None,
+        "latency_p90_s": percentile(latencies, 90) if latencies else None,
+        "latency_p99_s": percentile(latencies, 99) if latencies else None,
+        "ttft_p50_ms": percentile(ttfts, 50) if ttfts else None,
+        "ttft_p99_ms": percentile(ttfts, 99) if ttfts else None,
+        "output_tokens_mean": mean(output_tokens) if output_tokens else None,
+        "aggregate_tps": sum(output_tokens) / sum(latencies) if latencies and output_tokens else None,
+        "peak_mem_mb": peak_mem,
+        "mem_source": mems[0]["mem_source"] if mems else None,
+        # Memory the run added after loading, over the largest context in flight (closed loop runs one
+        # request at a time). Engines that preallocate their KV pool show no growth, so this stays empty.
+        "mem_kb_per_token": (
+            mem_growth_mb * 1024 / max(contexts) if mem_growth_mb and mem_growth_mb > 0 and max(contexts, default=0)
+            else None
+        ),
+    }
+
+
+def pct_delta(value, baseline):
+    if value is None or not baseline:
+        return None
+    return (value - baseline) / baseline * 100
+
+
+def paired_speedup(run, baseline, prompt_ids):
+    """Median per-prompt tok/s ratio against the baseline, with a bootstrap CI and significance flag."""
+    a, b = [], []
+    for prompt_id in prompt_ids:
+        run_tps = [row["tokens_per_sec"] for row in run["aligned"].get(prompt_id, []) if row["tokens_per_sec"]]
+        base_tps = [row["tokens_per_sec"] for row in baseline["aligned"].get(prompt_id, []) if row["tokens_per_sec"]]
+        if run_tps and base_tps:
+            a.append(percentile(run_tps, 50))
+            b.append(percentile(base_tps, 50))
+    return paired_ratio(a, b) if a else None
+
+
+def build_report(runs, baseline_label=None, threshold_pct=REGRESSION_THRESHOLD_PCT):
+    prompt_ids = align(runs)
+    overall = {}
+    buckets = {}
+    for run in runs:
+        rows = [row for prompt_id in prompt_ids for row in run["aligned"][prompt_id]]
+        overall[run["label"]] = summarize_rows(rows)
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(length_bucket(row), []).append(row)
+        buckets[run["label"]] = {bucket: summarize_rows(group) for bucket, group in sorted(grouped.items())}
+
+    deltas = []
+    baseline = next((run for run in runs if run["label"] == baseline_label), None)
+    if baseline is not None:
+        base = overall[baseline["label"]]
+        for run in runs:
+            if run is baseline:
+                continue
+            delta = {"label": run["label"], "paired": paired_speedup(run, baseline, prompt_ids)}
+            regressions = []
+            noise = []
+            for metric, higher_is_better in DELTA_METRICS:
+                change = pct_delta(overall[run["label"]][metric], base[metric])
+                delta[metric] = change
+                if change is not None and (-change if higher_is_better else change) > threshold_pct:
+                    # A throughput change whose paired CI includes 1 is indistinguishable from noise.
+                    if metric.startswith("tps_") and delta["paired"] and not delta["paired"]["significant"]:
+                        noise.append(metric)
+                    else:
+                        regressions.append(metric)
+            delta["regressions"] = regressions
+            delta["within_noise"] = noise
+            deltas.append(delta)
+
+    ranked = [label for label in overall if overall[label]["tps_p50"] is not None]
+    return {
+        "runs": runs,
+        "prompt_count": len(prompt_ids),
+        "overall": overall,
+        "buckets": buckets,
+        "baseline": baseline["label"] if baseline is not None else None,
+        "deltas": deltas,
+        "best_throughput": max(ranked, key=lambda label: overall[label]["tps_p50"], default=None),
+        "best_latency": min(
+            (label for label in overall if overall[label]["latency_p99_s"] is not None),
+            key=lambda label: overall[label]["latency_p99_s"],
+            default=None,
+        ),
+    }
+
+
+def _fmt(value, digits=2):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    if isinstance(value, tuple):
+        return " - ".join(_fmt(part, digits) for part in value)
+    return str(value)
+
+
+def _signed(value):
+    return "-" if value is None else f"{value:+.1f}%"
+
+
+OVERALL_COLUMNS = [
+    ("run", None),
+    ("n", "n"),
+    ("tok/s mean", "tps_mean"),
+    ("tok/s p10", "tps_p10"),
+    ("tok/s p50", "tps_p50"),
+    ("tok/s p90", "tps_p90"),
+    ("tok/s p50 95% CI", "tps_ci"),
+    ("outlier trials", "outlier_trials"),
+    ("aggregate tok/s", "aggregate_tps"),
+    ("latency p50 (s)", "latency_p50_s"),
+    ("latency p90 (s)", "latency_p90_s"),
+    ("latency p99 (s)", "latency_p99_s"),
+    ("TTFT p50 (ms)", "ttft_p50_ms"),
+    ("TTFT p99 (ms)", "ttft_p99_ms"),
+    ("output tokens mean", "output_tokens_mean"),
+    ("peak mem (MB)", "peak_mem_mb"),
+    ("mem source", "mem_source"),
+    ("KB/token (growth)", "mem_kb_per_token"),
+]
+
+BUCKET_COLUMNS = [
+    ("run", None),
+    ("bucket", None),
+    ("n", "n"),
+    ("tok/s p50", "tps_p50"),
+    ("tok/s p90", "tps_p90"),
+    ("latency p50 (s)", "latency_p50_s"),
+    ("latency p99 (s)", "latency_p99_s"),
+    ("TTFT p50 (ms)", "ttft_p50_ms"),
+    ("output tokens mean", "output_tokens_mean"),
+]
+
+
+def report_tables(report):
+    """Return (title, header, rows) tables shared by the Markdown and HTML renderers."""
+    tables = []
+    header = [name for name, _ in OVERALL_COLUMNS]
+    rows = [
+        [label] + [_fmt(summary[key]) for _, key in OVERALL_COLUMNS[1:]]
+        for label, summary in report["overall"].items()
+    ]
+    tables.append(("Per-engine summary", header, rows))
+
+    header = [name for name, _ in BUCKET_COLUMNS]
+    rows = []
+    for label, buckets in report["buckets"].items():
+        for bucket, summary in buckets.items():
+            rows.append([label, bucket] + [_fmt(summary[key]) for _, key in BUCKET_COLUMNS[2:]])
+    tables.append(("By prompt length", header, rows))
+
+    phase_names = list(dict.fromkeys(phase for run in report["runs"] for phase in run.get("phases") or {}))
+    if phase_names:
+        header = ["run"] + [f"{phase} (ms)" for phase in phase_names]
+        rows = [
+            [run["label"]] + [_fmt((run["phases"].get(phase) or {}).get("mean_ms"), 3) for phase in phase_names]
+            for run in report["runs"] if run.get("phases")
+        ]
+        tables.append(("Phase breakdown (mean per request)", header, rows))
+
+    if report["deltas"]:
+        header = (["run", "paired tok/s ratio p50", "95% CI", "significant"]
+                  + [metric for metric, _ in DELTA_METRICS] + ["regressions", "within noise"])
+        rows = []
+        for delta in report["deltas"]:
+            paired = delta["paired"] or {}
+            rows.append(
+                [delta["label"], _fmt(paired.get("ratio"), 3),
+                 _fmt((paired["ci_low"], paired["ci_high"]), 3) if paired else "-",
+                 ("yes" if paired["significant"] else "no") if paired else "-"]
+                + [_signed(delta[metric]) for metric, _ in DELTA_METRICS]
+                + [", ".join(delta["regressions"]) or "none", ", ".join(delta["within_noise"]) or "-"]
+            )
+        tables.append((f"Change vs baseline {report['baseline']}", header, rows))
+    return tables
+
+
+def report_notes(report):
+    notes = [f"{report['prompt_count']} prompts answered by every run."]
+    for run in report["runs"]:
+        unmatched = sum(1 for row in run["rows"] if not row["prompt_id"])
+        dropped = len(run["rows"]) - sum(len(rows) for rows in run["aligned"].values()) - unmatched
+        notes.append(f"{run['label']}: {run['source']} ({len(run['rows'])} rows, {unmatched} without a prompt id, "
+                     f"{dropped} not answered by every run)")
+        if run["cache_hits"]:
+            notes.append(f"{run['label']}: {run['cache_hits']} response cache hits left out of the statistics.")
+        warmup = run.get("warmup")
+        if warmup is None or warmup.get("strategy") == "single":
+            notes.append(f"{run['label']}: single warmup request; its first prompts may include compilation.")
+        elif not warmup["converged"]:
+            notes.append(f"{run['label']}: warmup did not reach steady state in {warmup['rounds']} rounds.")
+    baseline = next((run for run in report["runs"] if run["label"] == report["baseline"]), None)
+    if baseline is not None and baseline.get("phases"):
+        for run in report["runs"]:
+            if run is baseline or not run.get("phases"):
+                continue
+            changes = {
+                phase: run["phases"][phase]["mean_ms"] - baseline["phases"][phase]["mean_ms"]
+                for phase in run["phases"] if phase in baseline["phases"]
+            }
+            if changes:
+                phase = max(changes, key=lambda name: abs(changes[name]))
+                notes.append(f"{run['label']}: largest phase change vs baseline is {phase} "
+                             f"({changes[phase]:+.3f} ms per request)")
+    if report["best_throughput"]:
+        notes.append(f"Highest median throughput: {report['best_throughput']}")
+    if report["best_latency"]:
+        notes.append(f"Lowest p99 latency: {report['best_latency']}")
+    return notes
+
+
+def render_markdown(report):
+    lines = ["# Engine comparison", ""]
+    lines += [f"- {note}" for note in report_notes(report)]
+    for title, header, rows in report_tables(report):
+        lines += ["", f"## {title}", "", "| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+        lines += ["| " + " | ".join(row) + " |" for row in rows]
+    return "\n".join(lines) + "\n"
+
+
+def render_html(report):
+    parts = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset=\"utf-8\"><title>Engine comparison</title>",
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:2em}"
+        "th,td{border:1px solid #ccc;padding:4px 8px;text-align:right}th:first-child,td:first-child{text-align:left}"
+        "</style></head><body>",
+        "<h1>Engine comparison</h1>",
+        "<ul>" + "".join(f"<li>{html.escape(note)}</li>" for note in report_notes(report)) + "</ul>",
+    ]
+    for title, header, rows in report_tables(report):
+        parts.append(f"<h2>{html.escape(title)}</h2><table>")
+        parts.append("<tr>" + "".join(f"<th>{html.escape(cell)}</th>" for cell in header) + "</tr>")
+        for row in rows:
+            parts.append("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>")
+        parts.append("</table>")
+    parts.append("</body></html>")
+    return "\n".join(parts) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results across engines.")
+    parser.add_argument("inputs", nargs="+", help="result CSVs (legacy or current) and/or SQLite result stores")
+    parser.add_argument("--mode", default=None,
+                        help="only use runs of this mode from result stores (default: closed_loop, stream and batch)")
+    parser.add_argument("--baseline", default=None, help="run label to compute regression deltas against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD_PCT,
+                        help="percent change that counts as a regression")
+    parser.add_argument("--output", default="engine_report.md", help=".md or .html")
+    args = parser.parse_args(argv)
+
+    runs = load_inputs(args.inputs, args.mode)
+    if not runs:
+        parser.error("no runs found in the given inputs")
+    if args.baseline and args.baseline not in {run["label"] for run in runs}:
+        parser.error(f"unknown baseline {args.baseline!r}; runs are: {', '.join(run['label'] for run in runs)}")
+
+    report = build_report(runs, args.baseline, args.threshold)
+    render = render_html if args.output.endswith((".html", ".htm")) else render_markdown
+    with open(args.output, "w", encoding="utf-8") as f_out:
+        f_out.write(render(report))
+
+    for note in report_notes(report):
+        print(note)
+    print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
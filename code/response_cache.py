@@ -0,0 +1,222 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+
+from engines import Generation, StreamChunk
+
+# Rough per-entry bookkeeping cost on top of the stored text.
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def normalize_prompt(prompt):
+    if isinstance(prompt, list):
+        return prompt
+    return " ".join(prompt.split())
+
+
+def cache_key(model, prompt, params):
+    payload = {"model": model, "prompt": normalize_prompt(prompt), "params": params.to_dict()}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Exact-match cache of completions with an in-memory LRU tier and optional SQLite tier.
+
+    Only deterministic requests are cached: greedy ones (temperature at or below
+    max_temperature) and seeded ones. The memory tier is bounded by both entry
+    count and approximate bytes; entries older than ttl_s are dropped on lookup
+    in either tier. Disk entries survive restarts and are promoted to memory on hit.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=256 * 1024 * 1024, ttl_s=None, disk_path=None,
+                 max_disk_entries=1000000, max_temperature=0.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.max_disk_entries = max_disk_entries
+        self.max_temperature = max_temperature
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "uncacheable": 0,
+            "stores": 0, "evictions": 0, "expirations": 0,
+        }
+        self._disk = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created_at REAL, accessed_at REAL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self._disk.commit()
+
+    def cacheable(self, params):
+        return params.seed is not None or params.temperature <= self.max_temperature
+
+    def _expired(self, created_at):
+        return self.ttl_s is not None and time.time() - created_at > self.ttl_s
+
+    def _insert_memory(self, key, value, created_at):
+        size = len(value["text"].encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[2]
+        self._entries[key] = (value, created_at, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    def get(self, model, prompt, params):
+        """Cached Generation for this request, or None."""
+        if not self.cacheable(params):
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return None
+        key = cache_key(model, prompt, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created_at, size = entry
+                if self._expired(created_at):
+                    del self._entries[key]
+                    self._bytes -= size
+                    self._stats["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return Generation(**{**value, "cache_hit": True})
+
+            if self._disk is not None:
+                row = self._disk.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if self._expired(row[1]):
+                        self._disk.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._disk.commit()
+                        self._stats["expirations"] += 1
+                    else:
+                        self._disk.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                        self._disk.commit()
+                        value = json.loads(row[0])
+                        self._insert_memory(key, value, row[1])
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return Generation(**{**value, "cache_hit": True})
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, model, prompt, params, generation):
+        if not self.cacheable(params):
+            return
+        key = cache_key(model, prompt, params)
+        # Timings describe the original run, not the cache hit.
+        value = {**asdict(generation), "latency_s": None, "ttft_s": None}
+        now = time.time()
+        with self._lock:
+            self._insert_memory(key, value, now)
+            self._stats["stores"] += 1
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, json.dumps(value), now, now)
+                )
+                count = self._disk.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_disk_entries:
+                    self._disk.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                        (count - self.max_disk_entries,),
+                    )
+                    self._stats["evictions"] += count - self.max_disk_entries
+                self._disk.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+    def print_report(self):
+        stats = self.stats()
+        print("Response Cache:")
+        print(
+            f"  hits {stats['hits']} (memory {stats['memory_hits']}, disk {stats['disk_hits']}), "
+            f"misses {stats['misses']}, uncacheable {stats['uncacheable']}, hit ratio {stats['hit_ratio']:.2%}"
+        )
+        print(
+            f"  stores {stats['stores']}, evictions {stats['evictions']}, expirations {stats['expirations']}, "
+            f"{stats['entries']} entries / {stats['bytes'] / (1024 * 1024):.2f} MB in memory"
+        )
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+
+class CachedAdapter:
+    """Wraps an EngineAdapter so repeated deterministic requests skip the engine.
+
+    Everything except generate/generate_batch/stream is delegated, so the
+    wrapper drops into the benchmark harness and the server unchanged.
+    """
+
+    def __init__(self, adapter, cache):
+        self.adapter = adapter
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.adapter, name)
+
+    def __setattr__(self, name, value):
+        # Harness settings such as adapter.streaming belong to the wrapped adapter.
+        if name in ("adapter", "cache"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.adapter, name, value)
+
+    def generate(self, prompt, params):
+        generation = self.cache.get(self.adapter.model_path, prompt, params)
+        if generation is None:
+            generation = self.adapter.generate(prompt, params)
+            self.cache.put(self.adapter.model_path, prompt, params, generation)
+        return generation
+
+    def generate_batch(self, prompts, params):
+        results = [self.cache.get(self.adapter.model_path, prompt, params) for prompt in prompts]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            generated = self.adapter.generate_batch([prompts[i] for i in missing], params)
+            for i, generation in zip(missing, generated):
+                self.cache.put(self.adapter.model_path, prompts[i], params, generation)
+                results[i] = generation
+        return results
+
+    def stream(self, prompt, params):
+        generation = self.cache.get(self.adapter.model_path, prompt, params)
+        if generation is not None:
+            yield StreamChunk(generation.text, generation.output_token_count, cache_hit=True)
+            return
+        texts, output_tokens = [], 0
+        for chunk in self.adapter.stream(prompt, params):
+            texts.append(chunk.text)
+            output_tokens += chunk.num_tokens
+            yield chunk
+        self.cache.put(
+            self.adapter.model_path, prompt, params,
+            Generation(text="".join(texts), output_token_count=output_tokens),
+        )
+
+    def close(self):
+        self.adapter.close()
@@ -0,0 +1,351 @@
+import csv
+import gzip
+import json
+import os
+import platform
+import socket
+import sqlite3
+import time
+import uuid
+from importlib import metadata
+
+import psutil
+
+from memory import SAMPLE_FIELDS
+from profiling import PHASE_FIELDS
+
+TEXT_FIELDS = ("prompt", "output")
+
+ENGINE_PACKAGES = {
+    "vllm": "vllm",
+    "aphrodite": "aphrodite-engine",
+    "llama_cpp": "llama_cpp_python",
+    "lmdeploy": "lmdeploy",
+    "sglang": "sglang",
+    "mii": "deepspeed-mii",
+}
+
+
+def engine_version(engine_name):
+    package = ENGINE_PACKAGES.get(engine_name)
+    if package is None:
+        return None
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def host_info():
+    info = {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "processor": platform.processor(),
+        "cpu_count": psutil.cpu_count(logical=True),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "total_memory_mb": psutil.virtual_memory().total / (1024 * 1024),
+        "gpus": [],
+    }
+    try:
+        import pynvml
+        pynvml.nvmlInit()
+        for i in range(pynvml.nvmlDeviceGetCount()):
+            name = pynvml.nvmlDeviceGetName(pynvml.nvmlDeviceGetHandleByIndex(i))
+            info["gpus"].append(name.decode() if isinstance(name, bytes) else name)
+    except Exception:
+        pass
+    return info
+
+
+def run_metadata(adapter, mode, params, dataset_hash, **extra):
+    return {
+        "engine": adapter.name,
+        "engine_version": engine_version(adapter.name),
+        "model": adapter.model_path,
+        "mode": mode,
+        "sampling_params": params.to_dict(),
+        "engine_kwargs": adapter.engine_kwargs,
+        "dataset_hash": dataset_hash,
+        "host": host_info(),
+        **extra,
+    }
+
+
+def _sqlite_type(value):
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+
+class SQLiteResultWriter:
+    """Appends one run to a SQLite result store.
+
+    Metrics go to typed columns of the results table (new columns are added as
+    they first appear), run metadata to the runs table, and prompt/output text
+    to a gzip JSONL sidecar next to the database. Every row is committed as it
+    is written, so an interrupted run keeps its partial results and its runs
+    row stays at status 'running'.
+    """
+
+    def __init__(self, path, run_meta):
+        self.path = path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.texts_path = texts_path_for(path)
+        self._row_index = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT PRIMARY KEY, started_at REAL, finished_at REAL, status TEXT, "
+            "engine TEXT, engine_version TEXT, model TEXT, mode TEXT, dataset_hash TEXT, metadata TEXT, "
+            "config_id TEXT)"
+        )
+        if "config_id" not in {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN config_id TEXT")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS results (run_id TEXT, row_index INTEGER)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory_samples (run_id TEXT, "
+            + ", ".join(f"{field} {'TEXT' if field == 'phase' else 'REAL'}" for field in SAMPLE_FIELDS)
+            + ")"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS phase_timings (run_id TEXT, "
+            + ", ".join(f"{field} {'TEXT' if field in ('phase', 'kind') else 'REAL'}" for field in PHASE_FIELDS)
+            + ")"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_run ON results (run_id)")
+        self._columns = {row[1] for row in self.conn.execute("PRAGMA table_info(results)")}
+        self.conn.execute(
+            "INSERT INTO runs (run_id, started_at, status, engine, engine_version, model, mode, "
+            "dataset_hash, metadata, config_id) VALUES (?, ?, 'running', ?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.run_id,
+                time.time(),
+                run_meta.get("engine"),
+                run_meta.get("engine_version"),
+                run_meta.get("model"),
+                run_meta.get("mode"),
+                run_meta.get("dataset_hash"),
+                json.dumps(run_meta, default=str),
+                str(run_meta["config_id"]) if run_meta.get("config_id") is not None else None,
+            ),
+        )
+        self.conn.commit()
+
+    def _ensure_columns(self, row):
+        for key, value in row.items():
+            if key not in self._columns and value is not None:
+                self.conn.execute(f'ALTER TABLE results ADD COLUMN "{key}" {_sqlite_type(value)}')
+                self._columns.add(key)
+
+    def write(self, row):
+        texts = {field: row[field] for field in TEXT_FIELDS if field in row}
+        metrics = {
+            key: value
+            for key, value in row.items()
+            if key not in TEXT_FIELDS and key not in ("engine", "dataset_hash")
+        }
+        metrics.update({"run_id": self.run_id, "row_index": self._row_index})
+        self._ensure_columns(metrics)
+        present = {key: value for key, value in metrics.items() if key in self._columns}
+        columns = ", ".join(f'"{key}"' for key in present)
+        placeholders = ", ".join("?" for _ in present)
+        self.conn.execute(f"INSERT INTO results ({columns}) VALUES ({placeholders})", list(present.values()))
+        self.conn.commit()
+
+        if texts:
+            line = json.dumps(
+                {"run_id": self.run_id, "row_index": self._row_index, "prompt_id": row.get("prompt_id"), **texts},
+                ensure_ascii=False,
+            )
+            # One gzip member per row: a crash can only lose the row being written.
+            with open(self.texts_path, "ab") as f_out:
+                f_out.write(gzip.compress((line + "\n").encode("utf-8")))
+        self._row_index += 1
+
+    def write_memory_samples(self, samples):
+        self.conn.executemany(
+            f"INSERT INTO memory_samples VALUES (?, {', '.join('?' for _ in SAMPLE_FIELDS)})",
+            [[self.run_id] + [sample[field] for field in SAMPLE_FIELDS] for sample in samples],
+        )
+        self.conn.commit()
+
+    def write_phase_timings(self, rows):
+        self.conn.executemany(
+            f"INSERT INTO phase_timings VALUES (?, {', '.join('?' for _ in PHASE_FIELDS)})",
+            [[self.run_id] + [row[field] for field in PHASE_FIELDS] for row in rows],
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close("complete" if exc_type is None else "failed")
+
+    def close(self, status="complete"):
+        self.conn.execute(
+            "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+            (status, time.time(), self.run_id),
+        )
+        self.conn.commit()
+        self.conn.close()
+
+
+class CsvResultWriter:
+    """Legacy quoted-CSV output, kept for quick looks at a single run."""
+
+    def __init__(self, path, fields, run_meta):
+        self.path = path
+        self.run_id = None
+        self._f_out = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f_out, fieldnames=fields, quoting=csv.QUOTE_ALL, extrasaction="ignore")
+        self._writer.writeheader()
+
+    @staticmethod
+    def _format(key, value):
+        if value is None:
+            return ""
+        if key == "output":
+            return value.replace("\n", " \\n ")
+        if isinstance(value, float):
+            return f"{value:.4f}" if key.endswith("_s") else f"{value:.2f}"
+        return value
+
+    def write(self, row):
+        self._writer.writerow({key: self._format(key, value) for key, value in row.items()})
+        self._f_out.flush()
+
+    def write_memory_samples(self, samples):
+        with open(os.path.splitext(self.path)[0] + "_memory.csv", "w", newline="", encoding="utf-8") as f_out:
+            writer = csv.DictWriter(f_out, fieldnames=SAMPLE_FIELDS)
+            writer.writeheader()
+            writer.writerows(samples)
+
+    def write_phase_timings(self, rows):
+        with open(os.path.splitext(self.path)[0] + "_phases.csv", "w", newline="", encoding="utf-8") as f_out:
+            writer = csv.DictWriter(f_out, fieldnames=PHASE_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self, status="complete"):
+        self._f_out.close()
+
+
+def open_result_writer(path, fields, run_meta):
+    if path.endswith(".csv"):
+        return CsvResultWriter(path, fields, run_meta)
+    return SQLiteResultWriter(path, run_meta)
+
+
+def texts_path_for(path):
+    return os.path.splitext(path)[0] + ".texts.jsonl.gz"
+
+
+def load_runs(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    runs = []
+    for row in conn.execute("SELECT * FROM runs ORDER BY started_at"):
+        run = dict(row)
+        run["metadata"] = json.loads(run["metadata"])
+        runs.append(run)
+    conn.close()
+    return runs
+
+
+def load_results(path, run_id=None):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    query = (
+        "SELECT runs.engine, runs.dataset_hash, results.* FROM results "
+        "JOIN runs ON runs.run_id = results.run_id"
+    )
+    args = ()
+    if run_id is not None:
+        query += " WHERE results.run_id = ?"
+        args = (run_id,)
+    rows = [dict(row) for row in conn.execute(query + " ORDER BY results.run_id, results.row_index", args)]
+    conn.close()
+    return rows
+
+
+def load_texts(path, run_id=None):
+    texts = {}
+    texts_path = texts_path_for(path)
+    if not os.path.exists(texts_path):
+        return texts
+    with gzip.open(texts_path, "rt", encoding="utf-8") as f_in:
+        try:
+            for line in f_in:
+                record = json.loads(line)
+                if run_id is None or record["run_id"] == run_id:
+                    texts[(record["run_id"], record["row_index"])] = record
+        except (EOFError, json.JSONDecodeError):
+            # A crash mid-write leaves a truncated final member; keep what precedes it.
+            pass
+    return texts
+
+
+def load_memory_peaks(path, run_id):
+    conn = sqlite3.connect(path)
+    peaks = {}
+    query = (
+        "SELECT phase, " + ", ".join(f"MAX({field})" for field in SAMPLE_FIELDS[2:])
+        + " FROM memory_samples WHERE run_id = ? GROUP BY phase"
+    )
+    for row in conn.execute(query, (run_id,)):
+        peaks[row[0]] = {field: value for field, value in zip(SAMPLE_FIELDS[2:], row[1:]) if value is not None}
+    conn.close()
+    return peaks
+
+
+def load_phase_timings(path, run_id):
+    """{phase: breakdown row} for a run, or {} when it was not profiled."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("SELECT * FROM phase_timings WHERE run_id = ?", (run_id,)).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    conn.close()
+    return {row["phase"]: {field: row[field] for field in PHASE_FIELDS} for row in rows}
+
+
+def config_statuses(path, config_id):
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT status FROM runs WHERE config_id = ?", (config_id,))]
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+
+def mark_unfinished_runs(path, config_id, status):
+    """Close out runs of a config whose process died before it could; returns how many were updated."""
+    if not os.path.exists(path):
+        return 0
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.execute(
+            "UPDATE runs SET status = ?, finished_at = ? WHERE config_id = ? AND status = 'running'",
+            (status, time.time(), config_id),
+        )
+        conn.commit()
+        return cursor.rowcount
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
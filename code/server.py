@@ -1,4 +1,371 @@
-from mii import pipeline
-pipe = pipeline('/home/mihir/data/engines/Qwen2-7B')
-output = pipe(["Hello, my name is", "DeepSpeed is"], max_new_tokens=128)
-print(output)
\ No newline at end of file
+import argparse
+import asyncio
+import contextlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from benchmark import parse_engine_args
+from engines import ENGINES, SamplingConfig, get_engine
+from prompt_prep import ChatTemplate
+from repetition import RepetitionDetector
+from response_cache import CachedAdapter, ResponseCache
+
+DEFAULT_MAX_TOKENS = 256
+
+
+class RequestError(Exception):
+    def __init__(self, message, status=400, error_type="invalid_request_error"):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
+def error_response(message, status=400, error_type="invalid_request_error"):
+    return web.json_response({"error": {"message": message, "type": error_type, "code": status}}, status=status)
+
+
+def sampling_from_body(body):
+    if body.get("n", 1) != 1:
+        raise RequestError("only n=1 is supported")
+    defaults = SamplingConfig()
+
+    def value(key, default):
+        return body[key] if body.get(key) is not None else default
+
+    try:
+        params = SamplingConfig(
+            max_tokens=int(value("max_tokens", value("max_completion_tokens", DEFAULT_MAX_TOKENS))),
+            temperature=float(value("temperature", defaults.temperature)),
+            top_p=float(value("top_p", defaults.top_p)),
+            repetition_penalty=float(value("repetition_penalty", defaults.repetition_penalty)),
+            seed=int(body["seed"]) if body.get("seed") is not None else None,
+        )
+    except (TypeError, ValueError) as exc:
+        raise RequestError(f"invalid sampling parameter: {exc}")
+    if params.max_tokens < 1:
+        raise RequestError("max_tokens must be at least 1")
+    if params.temperature < 0:
+        raise RequestError("temperature must be non-negative")
+    if not 0 < params.top_p <= 1:
+        raise RequestError("top_p must be in (0, 1]")
+    return params
+
+
+def render_chat_prompt(messages, template=None, token_ids=False):
+    """Turn chat messages into a prompt with the model's chat template when one is loaded.
+
+    A templated prompt goes out as token ids when token_ids is set, else as
+    text without its leading BOS, since the engine's tokenizer adds one.
+    """
+    if not isinstance(messages, list) or not messages:
+        raise RequestError("messages must be a non-empty list")
+    for i, message in enumerate(messages):
+        if not isinstance(message, dict):
+            raise RequestError(f"messages[{i}] must be an object")
+        for key in ("role", "content"):
+            if not isinstance(message.get(key), str):
+                raise RequestError(f"messages[{i}].{key} must be a string")
+    if template is not None and template.has_template:
+        rendered = template.render_messages(messages)
+        return template.encode_batch([rendered])[0] if token_ids else template.engine_text(rendered)
+    lines = [f"{message['role']}: {message['content']}" for message in messages]
+    return "\n".join(lines) + "\nassistant:"
+
+
+class EngineServer:
+    """OpenAI-compatible front-end over one engine adapter.
+
+    Adapters are synchronous, so generation runs on a pool of max_concurrency
+    threads and an asyncio semaphore hands out those slots. Up to max_queue
+    requests may wait for a slot; beyond that requests are rejected with 429.
+    A client disconnect sets the request's cancel flag, which stops reading
+    the engine's stream and closes it so the engine can drop the request.
+    With stop_repetition the same happens when the output falls into a
+    repetition loop, freeing the slot for another request.
+    """
+
+    def __init__(self, adapter, model_name, max_concurrency=1, max_queue=256, queue_timeout_s=None,
+                 template=None, response_cache=None, stop_repetition=False):
+        self.adapter = adapter
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.template = template
+        self.response_cache = response_cache
+        self.stop_repetition = stop_repetition
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="engine")
+        self._slots = None
+        self.stats = {
+            "queued": 0, "in_flight": 0, "completed": 0, "rejected": 0, "cancelled": 0, "failed": 0,
+            "repetition_stopped": 0, "decode_tokens_saved": 0,
+        }
+
+    async def on_startup(self, app):
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def on_cleanup(self, app):
+        self._executor.shutdown(wait=True)
+        self.adapter.close()
+
+    def _count_repetition_stop(self, tokens_saved):
+        self.stats["repetition_stopped"] += 1
+        self.stats["decode_tokens_saved"] += tokens_saved
+
+    def _produce(self, loop, queue, prompt, params, cancelled):
+        chunks = self.adapter.stream(prompt, params)
+        detector = RepetitionDetector() if self.stop_repetition else None
+        output_tokens = 0
+        try:
+            for chunk in chunks:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, chunk)
+                output_tokens += chunk.num_tokens
+                if detector is not None and detector.feed(chunk.text):
+                    loop.call_soon_threadsafe(self._count_repetition_stop, params.max_tokens - output_tokens)
+                    break
+        except Exception as exc:
+            loop.call_soon_threadsafe(queue.put_nowait, exc)
+        finally:
+            chunks.close()
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    async def _acquire_slot(self):
+        if self.stats["queued"] >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise RequestError("server queue is full", status=429, error_type="rate_limit_error")
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise RequestError("timed out waiting for a free engine slot", status=503, error_type="server_error")
+        finally:
+            self.stats["queued"] -= 1
+
+    async def generate_chunks(self, prompt, params, cancelled):
+        """Yield StreamChunks for one request while holding an engine slot."""
+        await self._acquire_slot()
+        self.stats["in_flight"] += 1
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        producer = loop.run_in_executor(self._executor, self._produce, loop, queue, prompt, params, cancelled)
+        try:
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            await asyncio.shield(producer)
+            self.stats["in_flight"] -= 1
+            self._slots.release()
+
+    async def _run(self, request, prompt, params, stream, chat):
+        request_id = ("chatcmpl-" if chat else "cmpl-") + uuid.uuid4().hex
+        created = int(time.time())
+        cancelled = threading.Event()
+        output_tokens = 0
+        texts = []
+
+        if not stream:
+            try:
+                async with contextlib.aclosing(self.generate_chunks(prompt, params, cancelled)) as chunks:
+                    async for chunk in chunks:
+                        texts.append(chunk.text)
+                        output_tokens += chunk.num_tokens
+            except asyncio.CancelledError:
+                self.stats["cancelled"] += 1
+                raise
+            self.stats["completed"] += 1
+            text = "".join(texts)
+            choice = {"index": 0, "finish_reason": self._finish_reason(output_tokens, params)}
+            if chat:
+                choice["message"] = {"role": "assistant", "content": text}
+            else:
+                choice["text"] = text
+            return web.json_response({
+                "id": request_id,
+                "object": "chat.completion" if chat else "text_completion",
+                "created": created,
+                "model": self.model_name,
+                "choices": [choice],
+                "usage": self._usage(prompt, output_tokens),
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        started = False
+        object_name = "chat.completion.chunk" if chat else "text_completion"
+
+        async def send(choice, usage=None):
+            event = {"id": request_id, "object": object_name, "created": created, "model": self.model_name,
+                     "choices": [choice] if choice else []}
+            if usage is not None:
+                event["usage"] = usage
+            await response.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+
+        try:
+            async with contextlib.aclosing(self.generate_chunks(prompt, params, cancelled)) as chunks:
+                async for chunk in chunks:
+                    if not started:
+                        await response.prepare(request)
+                        started = True
+                        if chat:
+                            await send({"index": 0, "delta": {"role": "assistant"}, "finish_reason": None})
+                    output_tokens += chunk.num_tokens
+                    if chunk.text:
+                        delta = {"delta": {"content": chunk.text}} if chat else {"text": chunk.text}
+                        await send({"index": 0, **delta, "finish_reason": None})
+            if not started:
+                await response.prepare(request)
+            finish = {"index": 0, "finish_reason": self._finish_reason(output_tokens, params)}
+            finish.update({"delta": {}} if chat else {"text": ""})
+            await send(finish)
+            if (request.get("stream_options") or {}).get("include_usage"):
+                await send(None, self._usage(prompt, output_tokens))
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        except (ConnectionResetError, asyncio.CancelledError):
+            cancelled.set()
+            self.stats["cancelled"] += 1
+            raise
+        except RequestError:
+            raise
+        except Exception as exc:
+            if not started:
+                raise
+            # Headers are already sent, so report the failure in-band and end the stream.
+            self.stats["failed"] += 1
+            error = {"error": {"message": f"generation failed: {exc!r}", "type": "server_error", "code": 500}}
+            await response.write(f"data: {json.dumps(error)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            await response.write_eof()
+            return response
+        self.stats["completed"] += 1
+        return response
+
+    @staticmethod
+    def _finish_reason(output_tokens, params):
+        return "length" if output_tokens >= params.max_tokens else "stop"
+
+    def _usage(self, prompt, output_tokens):
+        prompt_tokens = len(prompt) if isinstance(prompt, list) else self.adapter.count_tokens(prompt)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        }
+
+    async def _handle(self, request, chat):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return error_response("request body must be JSON")
+        try:
+            if not isinstance(body, dict):
+                raise RequestError("request body must be a JSON object")
+            if chat:
+                prompt = render_chat_prompt(body.get("messages"), self.template, self.adapter.accepts_token_ids)
+            else:
+                prompt = body.get("prompt")
+                if isinstance(prompt, list) and len(prompt) == 1:
+                    prompt = prompt[0]
+                if not isinstance(prompt, str):
+                    raise RequestError("prompt must be a string")
+            params = sampling_from_body(body)
+            if not isinstance(body.get("stream_options") or {}, dict):
+                raise RequestError("stream_options must be an object")
+            # aiohttp requests are mutable mappings; stash stream options for _run.
+            request["stream_options"] = body.get("stream_options")
+            return await self._run(request, prompt, params, bool(body.get("stream")), chat)
+        except RequestError as exc:
+            return error_response(str(exc), exc.status, exc.error_type)
+        except (ConnectionResetError, asyncio.CancelledError):
+            raise
+        except Exception as exc:
+            self.stats["failed"] += 1
+            return error_response(f"generation failed: {exc!r}", 500, "server_error")
+
+    async def completions(self, request):
+        return await self._handle(request, chat=False)
+
+    async def chat_completions(self, request):
+        return await self._handle(request, chat=True)
+
+    async def models(self, request):
+        return web.json_response({
+            "object": "list",
+            "data": [{"id": self.model_name, "object": "model", "owned_by": self.adapter.name}],
+        })
+
+    async def health(self, request):
+        return web.json_response({"status": "ok"})
+
+    async def metrics(self, request):
+        metrics = dict(self.stats)
+        if self.response_cache is not None:
+            metrics["response_cache"] = self.response_cache.stats()
+        return web.json_response(metrics)
+
+    def app(self):
+        app = web.Application()
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        app.router.add_post("/v1/completions", self.completions)
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_get("/v1/models", self.models)
+        app.router.add_get("/health", self.health)
+        app.router.add_get("/metrics", self.metrics)
+        return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible HTTP server over an engine adapter.")
+    parser.add_argument("--engine", choices=sorted(ENGINES), required=True)
+    parser.add_argument("--model", default="fake")
+    parser.add_argument("--served-model-name", default=None)
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-concurrency", type=int, default=1,
+                        help="requests generating at once; keep 1 for single-stream engines such as llama.cpp")
+    parser.add_argument("--max-queue", type=int, default=256, help="requests allowed to wait for a slot")
+    parser.add_argument("--queue-timeout-s", type=float, default=None)
+    parser.add_argument("--chat-template", default=None,
+                        help="HF tokenizer or .gguf file whose chat template renders /v1/chat/completions messages")
+    parser.add_argument("--stop-repetition", action="store_true",
+                        help="end generations that fall into a repetition loop")
+    parser.add_argument("--response-cache", action="store_true")
+    parser.add_argument("--response-cache-disk", default=None)
+    parser.add_argument("--response-cache-ttl-s", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    adapter = get_engine(args.engine, args.model, streaming=True, **parse_engine_args(args.engine_arg))
+    print(f"Loading model ({adapter.name}): {args.model}...")
+    adapter.load()
+    adapter.warmup(SamplingConfig(max_tokens=16))
+    response_cache = None
+    if args.response_cache:
+        response_cache = ResponseCache(ttl_s=args.response_cache_ttl_s, disk_path=args.response_cache_disk)
+        adapter = CachedAdapter(adapter, response_cache)
+
+    template = None
+    if args.chat_template:
+        template = ChatTemplate(args.chat_template)
+        # Chat prompts arrive rendered, so engines must not apply their own template on top.
+        adapter.templated_prompts = template.has_template
+
+    server = EngineServer(
+        adapter, args.served_model_name or args.model, args.max_concurrency, args.max_queue,
+        args.queue_timeout_s, template, response_cache, args.stop_repetition,
+    )
+    web.run_app(server.app(), host=args.host, port=args.port, handler_cancellation=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import os
+import sys
+import time
+import uuid
+
+from benchmark import finish_memory_sampler, load_and_report, parse_engine_args
+from engines import SamplingConfig, get_engine
+from memory import MemorySampler
+from prompt_datasets import add_dataset_arguments, as_records, dataset_from_args, dataset_hash_of
+from prompt_prep import engine_prompt
+from results import load_results, load_runs, load_texts, open_result_writer, run_metadata
+from stats import paired_ratio
+from sweep import run_isolated
+
+SPECULATION_MODES = ("off", "ngram", "draft")
+DEFAULT_DRAFT_TOKENS = 5
+NGRAM_MAX = 4
+NGRAM_MIN = 1
+
+SPECULATIVE_RESULT_FIELDS = [
+    "engine",
+    "dataset_hash",
+    "prompt_id",
+    "category",
+    "prompt",
+    "output",
+    "speculation",
+    "prompt_token_count",
+    "output_token_count",
+    "duration_s",
+    "tokens_per_sec",
+    "draft_steps",
+    "draft_tokens",
+    "accepted_tokens",
+    "acceptance_rate",
+    "tokens_per_step",
+]
+
+
+def speculative_engine_args(engine, mode, draft_model=None, draft_tokens=DEFAULT_DRAFT_TOKENS):
+    """Engine kwargs that turn on draft-model or n-gram (prompt lookup) speculation."""
+    if mode == "off":
+        return {}
+    if mode == "draft" and not draft_model:
+        raise ValueError("draft speculation needs --draft-model")
+    if engine == "vllm":
+        if mode == "draft":
+            config = {"model": draft_model}
+        else:
+            config = {"method": "ngram", "prompt_lookup_max": NGRAM_MAX, "prompt_lookup_min": NGRAM_MIN}
+        # Stats logging feeds the spec decode counters read back through LLM.get_metrics().
+        return {"speculative_config": {**config, "num_speculative_tokens": draft_tokens}, "disable_log_stats": False}
+    if engine == "aphrodite":
+        args = {"num_speculative_tokens": draft_tokens}
+        if mode == "draft":
+            return {**args, "speculative_model": draft_model}
+        return {**args, "speculative_model": "[ngram]", "ngram_prompt_lookup_max": NGRAM_MAX,
+                "ngram_prompt_lookup_min": NGRAM_MIN}
+    if engine == "llama_cpp":
+        if mode == "draft":
+            return {"draft_model_path": draft_model, "draft_tokens": draft_tokens}
+        return {"prompt_lookup": True, "draft_tokens": draft_tokens}
+    if engine == "fake":
+        if mode == "draft":
+            return {"draft_tokens": draft_tokens, "draft_acceptance": 0.7, "draft_ms_per_token": 0.2}
+        return {"draft_tokens": draft_tokens, "draft_acceptance": 0.4}
+    raise ValueError(f"speculative decoding is not wired up for {engine}")
+
+
+def speculation_columns(before, after, output_tokens):
+    """Per-request draft counters from the adapter's cumulative stats.
+
+    Engines that do not report accepted tokens emit one token of their own per
+    step, so the rest of the output was accepted from the draft.
+    """
+    if before is None or after is None:
+        return {key: None for key in ("draft_steps", "draft_tokens", "accepted_tokens", "acceptance_rate",
+                                      "tokens_per_step")}
+    steps = after["draft_steps"] - before["draft_steps"]
+    drafted = after["draft_tokens"] - before["draft_tokens"]
+    if after.get("accepted_tokens") is not None:
+        accepted = after["accepted_tokens"] - before["accepted_tokens"]
+    else:
+        accepted = max(output_tokens - steps, 0)
+    return {
+        "draft_steps": steps,
+        "draft_tokens": drafted,
+        "accepted_tokens": accepted,
+        "acceptance_rate": accepted / drafted if drafted else None,
+        "tokens_per_step": 1 + accepted / steps if steps else None,
+    }
+
+
+def run_speculative_benchmark(adapter, prompts, output_path, params, speculation, tags=None):
+    records = as_records(prompts)
+    print(f"{len(records)} prompts, speculation: {speculation}")
+
+    sampler = MemorySampler().start()
+    sampler.set_phase("load")
+    load_and_report(adapter)
+    sampler.set_phase("warmup")
+    adapter.warmup(params)
+    sampler.set_phase("run")
+
+    run_meta = run_metadata(adapter, "speculative", params, dataset_hash_of(prompts),
+                            speculation=speculation, **(tags or {}))
+    with open_result_writer(output_path, SPECULATIVE_RESULT_FIELDS, run_meta) as writer:
+        for n, record in enumerate(records):
+            before = adapter.speculation_stats()
+            start = time.perf_counter_ns()
+            gen = adapter.generate(engine_prompt(adapter, record), params)
+            duration = (time.perf_counter_ns() - start) / 1e9
+            row = {
+                "engine": adapter.name,
+                "dataset_hash": run_meta["dataset_hash"],
+                "prompt_id": record.id,
+                "category": record.category,
+                "prompt": record.prompt,
+                "output": gen.text,
+                "speculation": speculation,
+                "prompt_token_count": gen.prompt_token_count,
+                "output_token_count": gen.output_token_count,
+                "duration_s": duration,
+                "tokens_per_sec": gen.output_token_count / duration if duration > 0 else 0.0,
+                **speculation_columns(before, adapter.speculation_stats(), gen.output_token_count),
+            }
+            writer.write(row)
+            accepted = f", {row['tokens_per_step']:.2f} tokens/step" if row["tokens_per_step"] else ""
+            print(f"  Processed prompt {n+1}/{len(records)}... ({row['tokens_per_sec']:.2f} tokens/sec{accepted})")
+        adapter.close()
+        finish_memory_sampler(sampler, writer)
+
+
+def summarize_speculation(baseline, rows):
+    """Speedup over the baseline (paired per prompt) plus draft acceptance for one group of prompts."""
+    base_by_prompt = {row["prompt_id"]: row for row in baseline}
+    pairs = [(base_by_prompt[row["prompt_id"]], row) for row in rows if row["prompt_id"] in base_by_prompt]
+    speedup = paired_ratio([base["duration_s"] for base, _ in pairs], [row["duration_s"] for _, row in pairs])
+    steps = sum(row["draft_steps"] or 0 for row in rows)
+    drafted = sum(row["draft_tokens"] or 0 for row in rows)
+    accepted = sum(row["accepted_tokens"] or 0 for row in rows)
+    return {
+        "prompts": len(pairs),
+        "speedup": speedup,
+        "acceptance_rate": accepted / drafted if drafted else None,
+        "tokens_per_step": 1 + accepted / steps if steps else None,
+        # Greedy speculation is lossless, so outputs should match the baseline token for token.
+        "output_match": sum(base["output"] == row["output"] for base, row in pairs) / len(pairs) if pairs else None,
+    }
+
+
+def compare(output_path, comparison_id):
+    runs = {}
+    for run in load_runs(output_path):
+        if run["metadata"].get("comparison") == comparison_id and run["status"] == "complete":
+            rows = load_results(output_path, run["run_id"])
+            texts = load_texts(output_path, run["run_id"])
+            for row in rows:
+                row["output"] = texts.get((row["run_id"], row["row_index"]), {}).get("output")
+            runs[run["metadata"]["speculation"]] = rows
+    baseline = runs.get("off")
+    print("-" * 50)
+    if not baseline:
+        print("No completed baseline run to compare against.")
+        return {}
+
+    summaries = {}
+    categories = sorted({row["category"] or "-" for row in baseline})
+    print("Speculative Decoding Comparison (speedup = baseline latency / speculative latency, per prompt):")
+    print(f"  {'mode':<6} {'category':<14} {'n':>4} {'speedup':>8} {'95% CI':>15} {'accept':>7} "
+          f"{'tok/step':>9} {'match':>6}")
+    for mode in SPECULATION_MODES[1:]:
+        if mode not in runs:
+            continue
+        for category in ["all", *categories]:
+            rows = [row for row in runs[mode] if category == "all" or (row["category"] or "-") == category]
+            summary = summarize_speculation(baseline, rows)
+            summaries[(mode, category)] = summary
+            speedup = summary["speedup"]
+            if speedup is None:
+                continue
+            ci = f"{speedup['ci_low']:.2f}-{speedup['ci_high']:.2f}"
+            accept = f"{summary['acceptance_rate']:.1%}" if summary["acceptance_rate"] is not None else "-"
+            per_step = f"{summary['tokens_per_step']:.2f}" if summary["tokens_per_step"] is not None else "-"
+            print(f"  {mode:<6} {category:<14} {summary['prompts']:>4} {speedup['ratio']:>7.2f}x {ci:>15} "
+                  f"{accept:>7} {per_step:>9} {summary['output_match']:>6.0%}")
+    print("-" * 50)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare draft-model and n-gram (prompt lookup) speculative decoding against plain decoding."
+    )
+    parser.add_argument("--engine", choices=["vllm", "aphrodite", "llama_cpp", "fake"], required=True)
+    parser.add_argument("--model", default="fake")
+    parser.add_argument("--engine-arg", action="append", metavar="KEY=VALUE")
+    add_dataset_arguments(parser)
+    parser.add_argument("--speculation", choices=["all", *SPECULATION_MODES], default="all",
+                        help="all runs the baseline and every configured mode in separate processes and compares them")
+    parser.add_argument("--draft-model", default=None,
+                        help="smaller model of the same family (e.g. the 1B GGUF for a 4B target)")
+    parser.add_argument("--draft-tokens", type=int, default=DEFAULT_DRAFT_TOKENS, help="tokens proposed per step")
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--temperature", type=float, default=0.0,
+                        help="greedy by default so speculative outputs can be checked against the baseline")
+    parser.add_argument("--output", default="benchmark_results.sqlite")
+    parser.add_argument("--tag", action="append", metavar="KEY=VALUE", help=argparse.SUPPRESS)
+    parser.add_argument("--timeout-s", type=float, default=3600)
+    args = parser.parse_args(argv)
+
+    if args.speculation == "all":
+        comparison_id = uuid.uuid4().hex[:12]
+        base = list(argv if argv is not None else sys.argv[1:])
+        modes = ["off", "ngram"] + (["draft"] if args.draft_model else [])
+        for mode in modes:
+            command = [sys.executable, os.path.abspath(__file__), *base, "--speculation", mode,
+                       "--tag", f"comparison={comparison_id!r}"]
+            status, elapsed = run_isolated(command, args.timeout_s)
+            print(f"Speculation {mode}: {status} in {elapsed:.1f}s")
+        compare(args.output, comparison_id)
+        return
+
+    engine_kwargs = {
+        **parse_engine_args(args.engine_arg),
+        **speculative_engine_args(args.engine, args.speculation, args.draft_model, args.draft_tokens),
+    }
+    adapter = get_engine(args.engine, args.model, **engine_kwargs)
+    tags = parse_engine_args(args.tag)
+    if args.speculation != "off":
+        tags.update({"draft_model": args.draft_model if args.speculation == "draft" else None,
+                     "draft_tokens": args.draft_tokens})
+    params = SamplingConfig(max_tokens=args.max_tokens, temperature=args.temperature)
+    run_speculative_benchmark(adapter, dataset_from_args(args), args.output, params, args.speculation, tags)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import numpy as np
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_CONFIDENCE = 0.95
+OUTLIER_Z = 3.5
+
+
+def bootstrap_ci(values, statistic=np.median, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE, seed=0):
+    """(estimate, low, high) of a statistic with a percentile bootstrap interval.
+
+    All resamples are drawn as one (n_resamples, n) index matrix and reduced
+    along axis 1, so statistic must accept an axis argument.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return None, None, None
+    estimate = float(statistic(values))
+    if values.size == 1:
+        return estimate, estimate, estimate
+    rng = np.random.default_rng(seed)
+    samples = values[rng.integers(0, values.size, size=(n_resamples, values.size))]
+    stats = statistic(samples, axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(stats, [alpha, 1 - alpha])
+    return estimate, float(low), float(high)
+
+
+def mad_outliers(values, threshold=OUTLIER_Z):
+    """Boolean mask of values whose modified z-score (median/MAD based) exceeds threshold."""
+    values = np.asarray(values, dtype=float)
+    if values.size < 3:
+        return np.zeros(values.shape, dtype=bool)
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return np.zeros(values.shape, dtype=bool)
+    return np.abs(0.6745 * (values - median) / mad) > threshold
+
+
+def summarize_trials(values, confidence=DEFAULT_CONFIDENCE):
+    values = np.asarray([value for value in values if value is not None], dtype=float)
+    if values.size == 0:
+        return None
+    median, low, high = bootstrap_ci(values, confidence=confidence)
+    p10, p90 = np.percentile(values, [10, 90])
+    return {
+        "n": int(values.size),
+        "median": median,
+        "ci_low": low,
+        "ci_high": high,
+        "p10": float(p10),
+        "p90": float(p90),
+        "cv": float(values.std(ddof=1) / values.mean()) if values.size > 1 and values.mean() else 0.0,
+        "outliers": int(mad_outliers(values).sum()),
+    }
+
+
+def paired_ratio(a, b, confidence=DEFAULT_CONFIDENCE, seed=0):
+    """Median ratio a/b over paired observations (e.g. per-prompt medians) with a bootstrap CI.
+
+    The bootstrap runs on log ratios so speedups and slowdowns are symmetric.
+    The difference counts as significant only when the interval excludes 1.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    keep = (a > 0) & (b > 0)
+    if not keep.any():
+        return None
+    log_ratios = np.log(a[keep] / b[keep])
+    estimate, low, high = bootstrap_ci(log_ratios, confidence=confidence, seed=seed)
+    return {
+        "ratio": float(np.exp(estimate)),
+        "ci_low": float(np.exp(low)),
+        "ci_high": float(np.exp(high)),
+        "pairs": int(keep.sum()),
+        "significant": bool(keep.sum() > 1 and (low > 0 or high < 0)),
+    }
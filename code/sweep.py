@@ -0,0 +1,190 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from results import SQLiteResultWriter, config_statuses, mark_unfinished_runs
+
+BENCHMARK_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark.py")
+DEFAULT_TIMEOUT_S = 3600
+SAMPLING_ARGS = {
+    "max_tokens": "--max-tokens",
+    "temperature": "--temperature",
+    "top_p": "--top-p",
+    "repetition_penalty": "--repetition-penalty",
+}
+
+
+def _expand(grid):
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def expand_configs(spec):
+    """Turn a sweep spec into concrete configs.
+
+    "grid" holds {"engine_args": {name: [values]}, "sampling": {name: [values]}}
+    and is expanded as a cartesian product; "configs" is an explicit list of
+    {"engine_args": {...}, "sampling": {...}}. Both are layered over "base".
+    """
+    base = spec.get("base", {})
+    configs = []
+    grid = spec.get("grid")
+    if grid:
+        for engine_args in _expand(grid.get("engine_args", {})):
+            for sampling in _expand(grid.get("sampling", {})):
+                configs.append({"engine_args": engine_args, "sampling": sampling})
+    configs.extend(spec.get("configs", []))
+    if not configs:
+        configs.append({})
+
+    expanded = []
+    for config in configs:
+        expanded.append({
+            "engine": config.get("engine", spec["engine"]),
+            "model": config.get("model", spec["model"]),
+            "mode": config.get("mode", spec.get("mode", "closed_loop")),
+            "batch_sizes": config.get("batch_sizes", spec.get("batch_sizes")),
+            "dataset": config.get("dataset", spec.get("dataset")),
+            "engine_args": {**base.get("engine_args", {}), **config.get("engine_args", {})},
+            "sampling": {**base.get("sampling", {}), **config.get("sampling", {})},
+        })
+    return expanded
+
+
+def config_id_of(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def benchmark_command(config, config_id, spec, output_path):
+    command = [
+        spec.get("python", sys.executable), BENCHMARK_SCRIPT,
+        "--engine", config["engine"],
+        "--model", config["model"],
+        "--output", output_path,
+        "--tag", f"config_id={config_id!r}",
+    ]
+    if spec.get("sweep_name"):
+        command += ["--tag", f"sweep={spec['sweep_name']!r}"]
+    datasets = config["dataset"]
+    for dataset in [datasets] if isinstance(datasets, str) else datasets or []:
+        command += ["--dataset", dataset]
+    for flag in ("limit", "sample", "tokenizer"):
+        if spec.get(flag) is not None:
+            command += [f"--{flag}", str(spec[flag])]
+    for key, value in config["engine_args"].items():
+        command += ["--engine-arg", f"{key}={value!r}"]
+    for key, value in config["sampling"].items():
+        command += [SAMPLING_ARGS[key], str(value)]
+    if config["mode"] == "stream":
+        command.append("--stream")
+    elif config["mode"] == "batch":
+        command += ["--batch-sizes", ",".join(str(size) for size in config["batch_sizes"] or [1, 4, 8, 16, 32])]
+    return command
+
+
+def run_isolated(command, timeout_s, log_path=None):
+    """Run one configuration in its own process group so engine workers die with it."""
+    start = time.perf_counter()
+    log = open(log_path, "w", encoding="utf-8") if log_path else None
+    process = subprocess.Popen(command, start_new_session=True, stdout=log, stderr=subprocess.STDOUT if log else None)
+    try:
+        returncode = process.wait(timeout=timeout_s)
+        status = "complete" if returncode == 0 else f"failed (exit {returncode})"
+    except subprocess.TimeoutExpired:
+        status = "timeout"
+    except KeyboardInterrupt:
+        status = "interrupted"
+    finally:
+        if process.poll() is None:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+        if log is not None:
+            log.close()
+    return status, time.perf_counter() - start
+
+
+def record_failure(output_path, config, config_id, status):
+    # Mark the run the child opened, or add one so the config still shows up in the store.
+    if mark_unfinished_runs(output_path, config_id, status):
+        return
+    if "complete" in config_statuses(output_path, config_id):
+        return
+    writer = SQLiteResultWriter(output_path, {
+        "engine": config["engine"],
+        "model": config["model"],
+        "mode": config["mode"],
+        "sampling_params": config["sampling"],
+        "engine_kwargs": config["engine_args"],
+        "config_id": config_id,
+    })
+    writer.close(status)
+
+
+def run_sweep(spec, output_path, timeout_s=None, resume=False, dry_run=False, cooldown_s=0.0):
+    configs = expand_configs(spec)
+    # An explicit --timeout-s wins; otherwise the spec's own timeout, then the default.
+    if timeout_s is None:
+        timeout_s = spec.get("timeout_s", DEFAULT_TIMEOUT_S)
+    print(f"Sweep of {len(configs)} configurations into {output_path}")
+    print("-" * 50)
+    outcomes = []
+    for i, config in enumerate(configs):
+        config_id = config_id_of(config)
+        command = benchmark_command(config, config_id, spec, output_path)
+        label = f"[{i+1}/{len(configs)}] {config_id} {json.dumps(config['engine_args'])} {json.dumps(config['sampling'])}"
+        if resume and "complete" in config_statuses(output_path, config_id):
+            print(f"{label}: already complete, skipping")
+            outcomes.append((config_id, "skipped"))
+            continue
+        print(label)
+        if dry_run:
+            print("  " + " ".join(command))
+            continue
+
+        status, elapsed = run_isolated(command, timeout_s)
+        if status != "complete":
+            record_failure(output_path, config, config_id, status)
+        print(f"  {status} in {elapsed:.1f}s")
+        outcomes.append((config_id, status))
+        if status == "interrupted":
+            break
+        if cooldown_s and i + 1 < len(configs):
+            time.sleep(cooldown_s)
+
+    print("-" * 50)
+    for config_id, status in outcomes:
+        print(f"  {config_id}: {status}")
+    return outcomes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a benchmark parameter sweep, one subprocess per configuration.")
+    parser.add_argument("spec", help="JSON sweep spec")
+    parser.add_argument("--output", default=None, help="SQLite result store (default: spec 'output' or sweep.sqlite)")
+    parser.add_argument("--timeout-s", type=float, default=None,
+                        help=f"per-configuration timeout; overrides the spec's timeout_s (default {DEFAULT_TIMEOUT_S:.0f})")
+    parser.add_argument("--cooldown-s", type=float, default=5.0,
+                        help="pause between configurations so the driver releases memory")
+    parser.add_argument("--resume", action="store_true", help="skip configurations already complete in the store")
+    parser.add_argument("--dry-run", action="store_true", help="print the commands without running them")
+    args = parser.parse_args(argv)
+
+    with open(args.spec, encoding="utf-8") as f_in:
+        spec = json.load(f_in)
+    output_path = args.output or spec.get("output", "sweep.sqlite")
+    run_sweep(spec, output_path, args.timeout_s, args.resume, args.dry_run, args.cooldown_s)
+
+
+if __name__ == "__main__":
+    main()
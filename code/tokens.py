@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+
+class TokenCounter:
+    """Counts tokens with the model's own tokenizer: the GGUF vocab for .gguf files,
+    otherwise the Hugging Face tokenizer at tokenizer_path.
+
+    Counts are memoized in a bounded LRU so repeated prompts are tokenized once,
+    and count_batch() sends every uncached text through the tokenizer in one call.
+    """
+
+    def __init__(self, tokenizer_path: str, cache_size: int = 65536):
+        self.tokenizer_path = tokenizer_path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._tokenizer = None
+        self._llama = None
+
+    def _load(self):
+        if self._tokenizer is not None or self._llama is not None:
+            return
+        if self.tokenizer_path.endswith(".gguf"):
+            from llama_cpp import Llama
+            self._llama = Llama(model_path=self.tokenizer_path, vocab_only=True, verbose=False)
+        else:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_path)
+
+    def _encode_batch(self, texts, add_special_tokens):
+        self._load()
+        if self._llama is not None:
+            return [
+                len(self._llama.tokenize(text.encode("utf-8"), add_bos=add_special_tokens, special=True))
+                for text in texts
+            ]
+        encoded = self._tokenizer(texts, add_special_tokens=add_special_tokens)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def count_batch(self, texts, add_special_tokens: bool = False):
+        counts = [None] * len(texts)
+        missing = {}
+        for i, text in enumerate(texts):
+            key = (add_special_tokens, text)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                counts[i] = self._cache[key]
+            else:
+                missing.setdefault(text, []).append(i)
+
+        if missing:
+            unique = list(missing)
+            for text, count in zip(unique, self._encode_batch(unique, add_special_tokens)):
+                self._cache[(add_special_tokens, text)] = count
+                for i in missing[text]:
+                    counts[i] = count
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return counts
+
+    def count(self, text: str, add_special_tokens: bool = False) -> int:
+        return self.count_batch([text], add_special_tokens)[0]
+
+    def count_prompt(self, prompt: str) -> int:
+        # Prompts are counted the way engines see them, including BOS.
+        return self.count(prompt, add_special_tokens=True)
+
+
+def counts_mismatch(engine_count, true_count, rel_tolerance=0.02, abs_tolerance=1):
+    """True when an engine-reported count is off from the tokenizer count by more than
+    the tolerance; re-tokenizing decoded text legitimately drifts by a token or two."""
+    if engine_count is None or true_count is None:
+        return False
+    return abs(engine_count - true_count) > max(abs_tolerance, rel_tolerance * true_count)
@@ -0,0 +1,117 @@
+import time
+from dataclasses import replace
+
+from metrics import percentile
+from prompt_prep import engine_prompt
+from response_cache import CachedAdapter
+
+DEFAULT_TOLERANCE = 0.05
+DEFAULT_WINDOW = 3
+DEFAULT_MAX_ROUNDS = 20
+WARMUP_MAX_TOKENS = 64
+
+
+def length_buckets(records, num_buckets=4):
+    """Split records into input-length quantile buckets, shortest first."""
+    ordered = sorted(records, key=lambda record: len(record.prompt.split()))
+    num_buckets = max(1, min(num_buckets, len(ordered)))
+    size = len(ordered) / num_buckets
+    return [ordered[round(i * size):round((i + 1) * size)] for i in range(num_buckets)]
+
+
+def window_drift(values, window):
+    """Relative change between the medians of the last two windows; None until both are full."""
+    if len(values) < 2 * window:
+        return None
+    previous = percentile(values[-2 * window:-window], 50)
+    current = percentile(values[-window:], 50)
+    return abs(current - previous) / previous if previous else 0.0
+
+
+class WarmupController:
+    """Warms an engine until per-token latency stops moving.
+
+    Each round sends one prompt from every input-length bucket of the dataset
+    (rotating within a bucket so prefix caches do not flatter later rounds) and
+    records seconds per output token. The engine counts as steady once, for
+    every bucket, the median of the last `window` rounds is within `tolerance`
+    of the median of the window before it; medians keep a single scheduler
+    hiccup from resetting the count. If that never happens within max_rounds
+    the run is still measured but the summary says it did not converge.
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE, window=DEFAULT_WINDOW, max_rounds=DEFAULT_MAX_ROUNDS,
+                 num_buckets=4, max_tokens=WARMUP_MAX_TOKENS):
+        self.tolerance = tolerance
+        self.window = window
+        self.max_rounds = max_rounds
+        self.num_buckets = num_buckets
+        self.max_tokens = max_tokens
+
+    def _converged(self, latencies):
+        drifts = [window_drift(values, self.window) for values in latencies]
+        return all(drift is not None and drift <= self.tolerance for drift in drifts)
+
+    def run(self, adapter, records, params):
+        # Cache hits would look like a perfectly stable engine.
+        if isinstance(adapter, CachedAdapter):
+            adapter = adapter.adapter
+        params = replace(params, max_tokens=min(params.max_tokens, self.max_tokens))
+        buckets = length_buckets(records, self.num_buckets)
+        latencies = [[] for _ in buckets]
+        start = time.perf_counter()
+        converged = False
+        rounds = 0
+        print(f"Warming up over {len(buckets)} input-length buckets (tolerance {self.tolerance:.0%}, "
+              f"window {self.window}, up to {self.max_rounds} rounds)...")
+        while rounds < self.max_rounds and not converged:
+            for b, bucket in enumerate(buckets):
+                record = bucket[rounds % len(bucket)]
+                request_start = time.perf_counter()
+                gen = adapter.generate(engine_prompt(adapter, record), params)
+                elapsed = time.perf_counter() - request_start
+                latencies[b].append(elapsed / max(gen.output_token_count, 1))
+            rounds += 1
+            converged = self._converged(latencies)
+            drifts = [window_drift(values, self.window) for values in latencies]
+            drift = "" if None in drifts else f" (max drift {max(drifts):.1%})"
+            print(f"  round {rounds}: ms/token " + ", ".join(f"{values[-1] * 1000:.2f}" for values in latencies) + drift)
+
+        summary = {
+            "strategy": "adaptive",
+            "converged": converged,
+            "rounds": rounds,
+            "requests": rounds * len(buckets),
+            "duration_s": time.perf_counter() - start,
+            "tolerance": self.tolerance,
+            "window": self.window,
+            # Wall-clock boundary: anything measured after this is steady state.
+            "steady_state_epoch_ns": time.time_ns() if converged else None,
+            "bucket_max_words": [len(bucket[-1].prompt.split()) for bucket in buckets],
+            "first_ms_per_token": [values[0] * 1000 for values in latencies],
+            "steady_ms_per_token": [percentile(values[-self.window:], 50) * 1000 for values in latencies],
+        }
+        if converged:
+            print(f"Steady state after {rounds} rounds ({summary['duration_s']:.1f}s).")
+        else:
+            print(f"WARNING: latency did not settle within {self.max_rounds} rounds; early prompts may be skewed.")
+        return summary
+
+
+def warm_up(adapter, records, params, controller=None):
+    """Run the adaptive controller, or a single warmup request when controller is None.
+
+    The single request is the adapter's own warmup prompt, unless the prompts
+    were prepared with a chat template: then the first prompt goes in the same
+    form as the timed requests, so the engine warms up on what it will see.
+    """
+    if controller is None:
+        start = time.perf_counter()
+        if records and records[0].token_ids is not None:
+            engine = adapter.adapter if isinstance(adapter, CachedAdapter) else adapter
+            engine.generate(engine_prompt(engine, records[0]),
+                            replace(params, max_tokens=min(params.max_tokens, WARMUP_MAX_TOKENS)))
+        else:
+            adapter.warmup(params)
+        return {"strategy": "single", "requests": 1, "duration_s": time.perf_counter() - start}
+    return controller.run(adapter, records, params)